@@ -0,0 +1,136 @@
+"""離線批次處理：不開 Tk 視窗，直接對多個影片檔或串流跑手部偵測與辨識
+
+用法 (在專案根目錄執行)：
+    python batch_process.py clip1.mp4 clip2.mp4 rtsp://... -o batch_results --mode gesture --workers 4
+
+每個來源輸出一個 JSONL (或 Parquet) 檔，每列為一隻手的結果：
+    {"source", "frame", "timestamp", "hand", "value", "confidence"}
+結果是每一幀各自的偵測結果 (HandDetection.detect_raw)：每幀都以整張影像偵測，
+不套用設定檔的縮圖 / 跳幀 / ROI，也不做畫面上使用的平滑與靜止沿用。
+timestamp 為影片內的時間 (秒)，沒有時間戳記時以 幀號 / FPS 計算。
+"""
+import argparse, json, os, re, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+
+# 每個工作程序各自擁有一個 HandDetection (也就是一個 Mediapipe Hands 實例)
+detector = None
+
+def init_worker(is_advanced_mode):
+    global detector
+    from cogs.hand_detection import HandDetection
+    from cogs import model_registry
+    detector = HandDetection(detector_backend="solutions", draw=False)  # 離線處理每一幀都要有自己的結果，不使用非同步後端
+    if is_advanced_mode:
+        model_registry.get_model()  # 離線處理不需要背景載入，直接等模型載好
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf8")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+class ParquetWriter:
+    """累積一批資料後寫入一個 row group，不必把整段結果留在記憶體中"""
+    def __init__(self, path, batch_size=1000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([("source", pa.string()), ("frame", pa.int64()), ("timestamp", pa.float64()),
+                                 ("hand", pa.string()), ("value", pa.string()), ("confidence", pa.float64())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write(self, record):
+        self.rows.append(dict(record, value=None if record["value"] is None else str(record["value"])))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+WRITERS = {"jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+def output_path(output_dir, index, source, fmt):
+    name = re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.basename(str(source).rstrip("/")))[0]) or "stream"
+    return os.path.join(output_dir, f"{index:03d}_{name}.{fmt}")
+
+def frame_timestamp(cap, frame_index, fps, start):
+    """影片內的時間 (秒)：優先使用 POS_MSEC，沒有 (或為 0，例如第一幀) 時以 幀號 / FPS 計算；
+    連 FPS 都沒有的即時串流才改用處理時間
+    """
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0:
+        return msec / 1000
+    if fps > 0:
+        return frame_index / fps
+    return time.perf_counter() - start
+
+def process_source(index, source, output_dir, fmt, is_advanced_mode, max_frames):
+    """(工作程序) 處理單一來源，邊處理邊寫出結果，回傳 (來源, 幀數, 秒數)"""
+    detector.reset()
+    cap = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if not cap.isOpened():
+        raise ValueError(f"無法開啟影像來源: {source}")
+    writer = WRITERS[fmt](output_path(output_dir, index, source, fmt))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames, start = 0, time.perf_counter()
+    try:
+        while max_frames is None or frames < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = frame_timestamp(cap, frames, fps, start)
+            hand_results = detector.detect_raw(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), is_advanced_mode)
+            for hand in hand_results:
+                writer.write({"source": str(source), "frame": frames, "timestamp": timestamp, "hand": hand["hand"],
+                              "value": hand["value"], "confidence": hand["confidence"]})
+            frames += 1
+    finally:
+        writer.close()
+        cap.release()
+    return source, frames, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="離線批次手勢辨識")
+    parser.add_argument("sources", nargs="+", help="影片檔路徑或串流網址")
+    parser.add_argument("-o", "--output", default="batch_results", help="輸出資料夾")
+    parser.add_argument("--format", choices=WRITERS, default="jsonl", help="輸出格式")
+    parser.add_argument("--mode", choices=["number", "gesture"], default="number", help="數字辨識或 AI 手勢識別")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="工作程序數量")
+    parser.add_argument("--max-frames", type=int, default=None, help="每個來源最多處理幾幀 (即時串流用)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    is_advanced_mode = args.mode == "gesture"
+    workers = max(1, min(args.workers, len(args.sources)))
+
+    total_frames, start = 0, time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(is_advanced_mode,)) as pool:
+        futures = [pool.submit(process_source, i, source, args.output, args.format, is_advanced_mode, args.max_frames)
+                   for i, source in enumerate(args.sources)]
+        for future in as_completed(futures):
+            try:
+                source, frames, seconds = future.result()
+            except Exception as e:
+                print(f"❌ 處理時發生錯誤: {e}")
+                continue
+            total_frames += frames
+            print(f"✅ {source}: {frames} 幀，{frames / seconds if seconds else 0:.1f} fps")
+
+    elapsed = time.perf_counter() - start
+    print(f"📊 總計 {total_frames} 幀，{elapsed:.1f} 秒，整體 {total_frames / elapsed:.1f} fps (使用 {workers} 個程序)")
+
+if __name__ == '__main__':
+    main()
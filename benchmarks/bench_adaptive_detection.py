@@ -0,0 +1,52 @@
+"""比較各偵測預設組合的 FPS 與準確度 (以 quality 組合為基準)
+
+用法 (在專案根目錄執行)：python benchmarks/bench_adaptive_detection.py clip.mp4
+"""
+import os, sys, time
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.adaptive_detection import AdaptiveDetector, PRESETS
+
+def run(video_path, options):
+    """以指定設定跑完整段影片，回傳 (每幀 {手別: 關鍵點陣列}, FPS)"""
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    detector = AdaptiveDetector(hands, **options)
+    cap = cv2.VideoCapture(video_path)
+    frames, elapsed = [], 0.0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        start = time.perf_counter()
+        results = detector.process(image)
+        elapsed += time.perf_counter() - start
+        found = {}
+        if results.multi_hand_landmarks:
+            for handLms, handLabel in zip(results.multi_hand_landmarks, results.multi_handedness):
+                found[handLabel.classification[0].label] = np.array([(lm.x, lm.y) for lm in handLms.landmark])
+        frames.append(found)
+    cap.release()
+    detector.close()
+    hands.close()
+    return frames, len(frames) / elapsed if elapsed else 0.0
+
+def compare(reference, frames):
+    """回傳 (手數一致比例, 平均關鍵點誤差)"""
+    same_count = np.mean([len(r) == len(f) for r, f in zip(reference, frames)])
+    errors = [np.linalg.norm(r[label] - f[label], axis=1).mean()
+              for r, f in zip(reference, frames) for label in r if label in f]
+    return same_count, np.mean(errors) if errors else float("nan")
+
+if __name__ == '__main__':
+    video_path = sys.argv[1]
+    reference, _ = run(video_path, PRESETS["quality"])
+    print(f"{'preset':<9} | {'FPS':>7} | {'hand count match':>16} | {'landmark error':>14}")
+    for name, options in PRESETS.items():
+        frames, fps = run(video_path, options)
+        same_count, error = compare(reference, frames)
+        print(f"{name:<9} | {fps:>7.1f} | {same_count*100:>15.1f}% | {error:>14.4f}")
@@ -0,0 +1,41 @@
+"""比較「逐手推論」與「批次推論」每幀的手勢辨識延遲 (請在專案根目錄執行)"""
+import os, sys, time
+from types import SimpleNamespace
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.hand_detection import HandDetection
+from cogs import model_registry
+
+ROUNDS = 200  # 每種情境量測的幀數
+
+def fake_hand(rng):
+    """產生與 Mediapipe 相同結構的假關鍵點 (21 點)"""
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.0) for x, y in rng.random((21, 2))])
+
+def measure(func, hands):
+    """回傳每幀延遲 (毫秒) 的陣列"""
+    func(hands)  # 暖機
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(hands)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+if __name__ == '__main__':
+    detector = HandDetection()
+    model_registry.get_model()  # 先載入模型，避免量到載入時間
+    rng = np.random.default_rng(0)
+
+    # 修改前：每隻手各呼叫一次模型
+    per_hand = lambda hands: [detector.predict_gestures([h]) for h in hands]
+    # 修改後：所有手合併成一次推論
+    batched = lambda hands: detector.predict_gestures(hands)
+
+    print(f"{'hands':>5} | {'mode':<8} | {'mean (ms)':>9} | {'p50 (ms)':>8} | {'p95 (ms)':>8}")
+    for n in (1, 2):
+        hands = [fake_hand(rng) for _ in range(n)]
+        for name, func in (("per-hand", per_hand), ("batched", batched)):
+            t = measure(func, hands)
+            print(f"{n:>5} | {name:<8} | {t.mean():>9.2f} | {np.percentile(t, 50):>8.2f} | {np.percentile(t, 95):>8.2f}")
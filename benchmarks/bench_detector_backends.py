@@ -0,0 +1,82 @@
+"""比較手部偵測後端：mp.solutions.hands (同步) 與 Tasks HandLandmarker (LIVE_STREAM 非同步)
+
+同一段影片先解碼到記憶體，分別以「依影片幀率播放」(模擬攝影機) 與「盡快送入」兩種方式跑過，量測：
+    blocked:   每幀呼叫 process 時推論執行緒被卡住的時間
+    loop fps:  推論執行緒每秒能處理幾幀 (越高代表越有時間做擷取 / 顯示)
+    det/s:     每秒實際完成的偵測次數 (非同步後端忙不過來時會丟掉影像)
+    latency:   影像送出到拿到偵測結果的時間
+    match/err: 與 solutions 後端 (依幀率播放) 相比的手數一致比例與平均關鍵點誤差
+
+用法 (在專案根目錄執行)：python benchmarks/bench_detector_backends.py clip.mp4 [clip2.mp4 ...]
+"""
+import os, sys, time
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.detector_backend import DETECTOR_BACKENDS, create_hands
+from cogs.profiler import profiler
+
+def read_clip(video_path):
+    """回傳 (RGB 影像列表, 影片幀率)"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"無法開啟影片: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames, fps
+
+def run(backend, frames, fps=None):
+    """fps 為 None 時盡快送入；回傳每幀 {手別: 關鍵點} 與各項數據"""
+    hands = create_hands(backend)
+    profiler.samples.pop("landmarker", None)
+    interval = 1 / fps if fps else 0.0
+    blocked, found = [], []
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        t = time.perf_counter()
+        results = hands.process(frame)
+        blocked.append((time.perf_counter() - t) * 1000)
+        hand_points = {}
+        if results.multi_hand_landmarks:
+            for handLms, handLabel in zip(results.multi_hand_landmarks, results.multi_handedness):
+                hand_points[handLabel.classification[0].label] = np.array([(lm.x, lm.y) for lm in handLms.landmark])
+        found.append(hand_points)
+        if interval:
+            time.sleep(max(0.0, start + (i + 1) * interval - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    completed = getattr(hands, "completed", len(frames))
+    latency = profiler.summary().get("landmarker", {}).get("p50", float(np.percentile(blocked, 50)))
+    hands.close()
+    return found, {"blocked_p50": np.percentile(blocked, 50), "blocked_p95": np.percentile(blocked, 95),
+                   "loop_fps": len(frames) / (sum(blocked) / 1000), "det_per_s": completed / elapsed,
+                   "latency_p50": latency}
+
+def compare(reference, frames):
+    """回傳 (手數一致比例, 平均關鍵點誤差)"""
+    same_count = np.mean([len(r) == len(f) for r, f in zip(reference, frames)])
+    errors = [np.linalg.norm(r[label] - f[label], axis=1).mean()
+              for r, f in zip(reference, frames) for label in r if label in f]
+    return same_count, np.mean(errors) if errors else float("nan")
+
+if __name__ == '__main__':
+    print(f"{'clip':<16} | {'backend':<9} | {'feed':<8} | {'blocked p50/p95 (ms)':>20} | {'loop fps':>8} | "
+          f"{'det/s':>6} | {'latency (ms)':>12} | {'match':>6} | {'err':>7}")
+    for video_path in sys.argv[1:]:
+        frames, clip_fps = read_clip(video_path)
+        reference = None
+        for backend in DETECTOR_BACKENDS:
+            for feed, fps in (("realtime", clip_fps), ("max", None)):
+                found, s = run(backend, frames, fps)
+                if reference is None:
+                    reference = found  # solutions / 依幀率播放
+                same_count, error = compare(reference, found)
+                print(f"{os.path.basename(video_path):<16} | {backend:<9} | {feed:<8} | "
+                      f"{s['blocked_p50']:>9.2f} / {s['blocked_p95']:>8.2f} | {s['loop_fps']:>8.1f} | "
+                      f"{s['det_per_s']:>6.1f} | {s['latency_p50']:>12.1f} | {same_count*100:>5.1f}% | {error:>7.4f}")
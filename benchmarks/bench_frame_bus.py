@@ -0,0 +1,59 @@
+"""共享記憶體影像匯流排：量測偵測程序數量 1 ~ N 時的吞吐量
+
+擷取程序重複播放同一段影片 (預先解碼)，主程序收到結果後立刻歸還格子，量測每秒完成的偵測數。
+也列出每筆結果經由佇列傳遞的大小，與整張影像的大小比較。
+用法 (在專案根目錄執行)：python benchmarks/bench_frame_bus.py clip.mp4 [--max-detectors 4] [--seconds 10] [--mode gesture]
+"""
+import argparse, os, pickle, sys, time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.frame_bus import FrameBus
+
+def run(video_path, detectors, seconds, frame_size, is_advanced_mode):
+    """回傳 (每秒偵測數, 偵測耗時中位數 ms, 每筆結果的平均位元組數)"""
+    bus = FrameBus(detectors=detectors, frame_size=frame_size, replay=video_path, draw=False)
+    bus.mode.value = is_advanced_mode
+    bus.start()
+    try:
+        # 暖機：等每個偵測程序都建立好 Mediapipe 圖 (手勢模式還要載入模型)
+        warmup_end = time.perf_counter() + 60
+        while bus.received < detectors * 5 and time.perf_counter() < warmup_end:
+            record = bus.poll(timeout=1)
+            if record is not None:
+                bus.release_slot(record["slot"])
+
+        detect_ms, sizes, count = [], [], 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            record = bus.poll(timeout=1)
+            if record is None:
+                continue
+            bus.release_slot(record["slot"])
+            count += 1
+            detect_ms.append(record["detect_ms"])
+            sizes.append(len(pickle.dumps(record)))
+        elapsed = time.perf_counter() - start
+    finally:
+        bus.release()
+    return count / elapsed, float(np.median(detect_ms)) if detect_ms else float("nan"), np.mean(sizes) if sizes else 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="共享記憶體影像匯流排吞吐量")
+    parser.add_argument("video")
+    parser.add_argument("--max-detectors", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--mode", choices=("number", "gesture"), default="number")
+    args = parser.parse_args()
+
+    frame_bytes = args.width * args.height * 3
+    print(f"影像 {args.width}x{args.height}，每張 {frame_bytes / 1024:.0f} KB (只在共享記憶體中，不經過佇列)")
+    print(f"{'detectors':>9} | {'fps':>7} | {'speedup':>7} | {'detect p50 (ms)':>15} | {'record (bytes)':>14}")
+    base = None
+    for detectors in range(1, args.max_detectors + 1):
+        fps, detect_p50, record_size = run(args.video, detectors, args.seconds, (args.width, args.height),
+                                           args.mode == "gesture")
+        base = base or fps
+        print(f"{detectors:>9} | {fps:>7.1f} | {fps / base:>6.2f}x | {detect_p50:>15.1f} | {record_size:>14.0f}")
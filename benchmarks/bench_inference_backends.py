@@ -0,0 +1,30 @@
+"""比較 keras / numpy / tflite 推論後端的每手推論時間 (請在專案根目錄執行)"""
+import os, sys, time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.gesture_backend import load_backend, MODEL_PATHS
+
+ROUNDS = 500  # 每種情境量測次數
+
+def measure(backend, data):
+    """回傳每次推論的延遲 (微秒) 陣列"""
+    backend.predict(data)  # 暖機
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        backend.predict(data)
+        times.append((time.perf_counter() - start) * 1e6)
+    return np.array(times)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    print(f"{'backend':<7} | {'hands':>5} | {'mean (us)':>10} | {'p50 (us)':>10} | {'p95 (us)':>10}")
+    for name, path in MODEL_PATHS.items():
+        if not os.path.exists(path):
+            print(f"⚠️ 找不到 {path}，略過 {name} (請先執行 export_gesture_model.py)")
+            continue
+        backend = load_backend(name)
+        for n in (1, 2):
+            t = measure(backend, rng.random((n, 42), dtype=np.float32))
+            print(f"{name:<7} | {n:>5} | {t.mean():>10.1f} | {np.percentile(t, 50):>10.1f} | {np.percentile(t, 95):>10.1f}")
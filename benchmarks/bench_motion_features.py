@@ -0,0 +1,68 @@
+"""動態手勢的每幀成本：MotionHistory 累計 + 推論，與靜態手勢 MLP 比較 (請在專案根目錄執行)
+
+兩種模型都以預設架構的隨機權重建立 numpy 後端 (延遲與權重數值無關)，不需要先訓練。
+另外列出每幀重算整個視窗 (sequence_features) 的成本，對照增量更新的效果。
+"""
+import os, sys, tempfile, time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.gesture_backend import NumpyBackend
+from cogs.landmark_features import extract_features
+from cogs.motion_features import DEFAULT_WINDOW, LEAD_FRAMES, SEQUENCE_POINTS, FRAME_TIME, MotionHistory, motion_input_size, sequence_features
+
+ROUNDS = 2000  # 每種情境量測幀數
+
+def random_backend(folder, name, sizes, rng):
+    """以隨機權重建立 Dense 網路 (relu 隱藏層 + softmax 輸出) 的 numpy 後端"""
+    arrays = {"num_layers": np.array(len(sizes) - 1)}
+    for i, (n_in, n_out) in enumerate(zip(sizes[:-1], sizes[1:])):
+        arrays[f"W{i}"] = rng.standard_normal((n_in, n_out)).astype(np.float32) * 0.1
+        arrays[f"b{i}"] = np.zeros(n_out, dtype=np.float32)
+        arrays[f"act{i}"] = np.array("softmax" if i == len(sizes) - 2 else "relu")
+    path = os.path.join(folder, name + ".npz")
+    np.savez(path, **arrays)
+    return NumpyBackend(path)
+
+def measure(step, frames):
+    """回傳每幀延遲 (微秒) 陣列"""
+    step(frames[0])  # 暖機
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        step(frame)
+        times.append((time.perf_counter() - start) * 1e6)
+    return np.array(times)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    # 模擬兩隻手緩慢移動的關鍵點軌跡
+    frames = (rng.random((1, 2, 21, 3)) + np.cumsum(rng.normal(0, 0.005, (ROUNDS, 2, 1, 3)), axis=0)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as folder:
+        static = random_backend(folder, "static", [42, 128, 64, 10], rng)
+        motion = random_backend(folder, "motion", [motion_input_size(), 64, 32, 6], rng)
+        histories = [MotionHistory(), MotionHistory()]
+        batch = np.zeros((2, motion_input_size()), dtype=np.float32)
+        window = np.zeros((2, LEAD_FRAMES + DEFAULT_WINDOW, SEQUENCE_POINTS, 3), dtype=np.float32)
+        window[:, :, 21, 0] = np.arange(LEAD_FRAMES + DEFAULT_WINDOW) * FRAME_TIME  # 固定幀間隔的時間列
+
+        def static_step(landmarks):
+            static.predict(extract_features(landmarks, "xy"))
+
+        def motion_step(landmarks):
+            for i, history in enumerate(histories):
+                history.push(landmarks[i])
+                batch[i] = history.model_input()
+            motion.predict(batch)
+
+        def recompute_step(landmarks):
+            window[:, :-1, :21] = window[:, 1:, :21]
+            window[:, -1, :21] = landmarks
+            motion.predict(sequence_features(window))
+
+        print(f"{'case (2 hands)':<24} | {'mean (us)':>10} | {'p50 (us)':>10} | {'p95 (us)':>10}")
+        for name, step in (("static MLP", static_step), ("motion incremental", motion_step),
+                           ("motion full recompute", recompute_step)):
+            t = measure(step, frames)
+            print(f"{name:<24} | {t.mean():>10.1f} | {np.percentile(t, 50):>10.1f} | {np.percentile(t, 95):>10.1f}")
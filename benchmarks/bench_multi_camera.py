@@ -0,0 +1,65 @@
+"""多攝影機工作池：量測工作執行緒數量 1 ~ N 時的總吞吐量與平均批次大小
+
+同一段影片當作多個來源同時送入，每輪每個來源交付一張影像並等待全部處理完。
+用法 (在專案根目錄執行)：python benchmarks/bench_multi_camera.py clip.mp4 [--sources 4] [--max-workers 4] [--mode gesture]
+"""
+import argparse, os, sys, time
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs import model_registry
+from cogs.multi_camera import MultiCameraEngine
+
+def read_frames(video_path, max_frames):
+    """先把影片解碼到記憶體，解碼時間不計入"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"無法開啟影片: {video_path}")
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def run(frames, num_sources, workers, is_advanced_mode):
+    """回傳 (每秒處理的影像數, 平均批次大小)"""
+    engine = MultiCameraEngine(num_sources, workers=workers, scene_filter=False)  # 每一幀都要偵測
+    engine.start()
+    engine.is_advanced_mode = is_advanced_mode
+    for source in range(num_sources):  # 暖機 (每條工作執行緒第一次建立 Mediapipe 圖)
+        engine.submit(source, frames[0])
+    engine.wait_idle()
+    start, processed = time.perf_counter(), engine.processed
+    for frame in frames:
+        for source in range(num_sources):
+            engine.submit(source, frame)
+        engine.wait_idle()
+    elapsed = time.perf_counter() - start
+    fps = (engine.processed - processed) / elapsed
+    mean_batch = engine.batcher.mean_batch
+    engine.stop()
+    return fps, mean_batch
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="多攝影機工作池吞吐量")
+    parser.add_argument("video")
+    parser.add_argument("--sources", type=int, default=4, help="模擬的攝影機數量")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--frames", type=int, default=200, help="每個來源處理的幀數")
+    parser.add_argument("--mode", choices=("number", "gesture"), default="number")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    is_advanced_mode = args.mode == "gesture"
+    if is_advanced_mode:
+        model_registry.get_model()  # 先載入模型，避免量到載入時間
+
+    print(f"{'workers':>7} | {'total fps':>9} | {'per source':>10} | {'speedup':>7} | {'mean batch':>10}")
+    base = None
+    for workers in range(1, args.max_workers + 1):
+        fps, mean_batch = run(frames, args.sources, workers, is_advanced_mode)
+        base = base or fps
+        print(f"{workers:>7} | {fps:>9.1f} | {fps / args.sources:>10.1f} | {fps / base:>6.2f}x | {mean_batch:>10.2f}")
@@ -0,0 +1,66 @@
+"""比較 mp_draw.draw_landmarks (每隻手一次) 與 OverlayRenderer (所有手一次) 的畫圖時間 (請在專案根目錄執行)
+
+也列出在縮小後的顯示影像上畫 (多攝影機格子) 的時間。
+"""
+import os, sys, time
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.overlay import OverlayRenderer
+
+ROUNDS = 1000  # 每種情境量測次數
+
+def fake_hands(rng, n):
+    """畫面中大小接近真實手的 (n, 21, 3) 正規化關鍵點"""
+    landmarks = rng.random((n, 21, 3)).astype(np.float32) * 0.15
+    landmarks[:, :, 0] += np.linspace(0.2, 0.6, n)[:, None]
+    landmarks[:, :, 1] += 0.4
+    return landmarks
+
+def measure(func, image):
+    """回傳每次畫圖的延遲 (微秒) 陣列 (含複製底圖的時間，兩種做法相同)"""
+    base = image.copy()
+    times = []
+    for _ in range(ROUNDS):
+        np.copyto(image, base)
+        start = time.perf_counter()
+        func(image)
+        times.append((time.perf_counter() - start) * 1e6)
+    return np.array(times)
+
+def mediapipe_draw():
+    """回傳以 mp_draw 畫 (n, 21, 3) 關鍵點的函數，沒有安裝 mediapipe 時回傳 None"""
+    try:
+        import mediapipe as mp
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return None
+    mp_hands, mp_draw = mp.solutions.hands, mp.solutions.drawing_utils
+
+    def draw(image, landmarks):
+        for hand in landmarks:
+            hand_landmarks = landmark_pb2.NormalizedLandmarkList()
+            hand_landmarks.landmark.extend(landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in hand)
+            mp_draw.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+    return draw
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    overlay = OverlayRenderer()
+    mp_draw = mediapipe_draw()
+    if mp_draw is None:
+        print("⚠️ 沒有安裝 mediapipe，只量測 OverlayRenderer")
+
+    print(f"{'renderer':<8} | {'image':>9} | {'hands':>5} | {'mean (us)':>10} | {'p50 (us)':>10} | {'p95 (us)':>10}")
+    for size in ((1280, 720), (480, 360)):
+        image = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        for n in (1, 2):
+            landmarks = fake_hands(rng, n)
+            cases = [("overlay", lambda img: overlay.draw(img, landmarks))]
+            if mp_draw is not None:
+                cases.insert(0, ("mp_draw", lambda img: mp_draw(img, landmarks)))
+            for name, func in cases:
+                t = measure(func, image)
+                print(f"{name:<8} | {size[0]:>4}x{size[1]:<4} | {n:>5} | {t.mean():>10.1f} | "
+                      f"{np.percentile(t, 50):>10.1f} | {np.percentile(t, 95):>10.1f}")
@@ -0,0 +1,105 @@
+"""辨識結果服務壓力測試：模擬數百個訂閱者 (其中一部分讀得很慢)
+
+量測發布端 publish 的耗時 (不可拖慢推論執行緒)、正常訂閱者收到事件的延遲，
+以及慢速訂閱者被合併掉的事件數。
+用法 (在專案根目錄執行)：python benchmarks/load_test_result_server.py [--clients 300] [--slow 0.2] [--rate 120]
+"""
+import argparse, asyncio, json, os, socket, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.result_server import ResultServer
+
+async def subscriber(port, slow, latencies, counts, index, stop):
+    if slow:
+        # 慢速訂閱者的接收緩衝區也設小 (模擬網路上真的讀不動的訂閱者)，否則事件全堆在本機的緩衝區裡
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(("127.0.0.1", port))
+        reader, writer = await asyncio.open_connection(sock=sock, limit=1024)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while not stop.is_set():
+            try:
+                line = await asyncio.wait_for(reader.readline(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            if not line:
+                break
+            event = json.loads(line)
+            counts[index] += 1
+            if slow:
+                await asyncio.sleep(0.05)  # 慢速訂閱者：每筆處理 50 ms
+            else:
+                latencies.append((time.time() - event["time"]) * 1000)
+    finally:
+        writer.close()
+
+def publisher(server, rate, seconds, publish_times):
+    """模擬推論執行緒：雙手的結果以固定頻率改變"""
+    interval = 1 / rate
+    end = time.perf_counter() + seconds
+    value = 0
+    while time.perf_counter() < end:
+        for hand in ("Left", "Right"):
+            start = time.perf_counter()
+            server.publish({"time": time.time(), "mode": "number", "hand": hand, "value": value, "confidence": 1.0})
+            publish_times.append((time.perf_counter() - start) * 1000)
+        value = (value + 1) % 6
+        time.sleep(interval)
+
+async def run_subscribers(port, num_clients, num_slow, seconds):
+    """(獨立程序) 連上服務並讀取 seconds 秒，回傳 (正常訂閱者延遲, 每個訂閱者收到的筆數)"""
+    counts = [0] * num_clients
+    latencies = []
+    stop = asyncio.Event()
+    tasks = [asyncio.ensure_future(subscriber(port, i < num_slow, latencies, counts, i, stop))
+             for i in range(num_clients)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return latencies, counts
+
+def subscriber_process(port, num_clients, num_slow, seconds):
+    return asyncio.run(run_subscribers(port, num_clients, num_slow, seconds))
+
+def main(args):
+    server = ResultServer(port=0).start()
+    # 訂閱者分散到多個程序，避免測試端自己讀不完而量到測試端的延遲
+    processes = args.processes or os.cpu_count() or 4
+    per_process = [len(chunk) for chunk in np.array_split(np.arange(args.clients), processes)]
+    slow_per_process = [int(n * args.slow) for n in per_process]
+    run_seconds = args.seconds + 3
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(subscriber_process, server.port, n, slow, run_seconds)
+                   for n, slow in zip(per_process, slow_per_process)]
+        while server.stats()["clients"] < args.clients:
+            time.sleep(0.05)
+        publish_times = []
+        publisher(server, args.rate, args.seconds, publish_times)
+        stats = server.stats()
+        results = [future.result() for future in futures]
+    server.stop()
+
+    latencies = [latency for process_latencies, _ in results for latency in process_latencies]
+    fast_counts = [c for (_, counts), slow in zip(results, slow_per_process) for c in counts[slow:]] or [0]
+    slow_counts = [c for (_, counts), slow in zip(results, slow_per_process) for c in counts[:slow]] or [0]
+    print(f"訂閱者 {args.clients} (慢速 {sum(slow_per_process)}，{processes} 個程序)，"
+          f"發布 {len(publish_times)} 筆事件 ({args.rate * 2:.0f} 筆/秒)")
+    print(f"publish 耗時     p50 {np.percentile(publish_times, 50):.3f} / p99 {np.percentile(publish_times, 99):.3f} ms")
+    if latencies:
+        print(f"正常訂閱者延遲   p50 {np.percentile(latencies, 50):.1f} / p99 {np.percentile(latencies, 99):.1f} ms，"
+              f"平均收到 {np.mean(fast_counts):.0f} 筆")
+    print(f"慢速訂閱者       平均收到 {np.mean(slow_counts):.0f} 筆")
+    print(f"合併掉的事件     {stats['coalesced']} 筆 (已送出 {stats['sent']} 筆)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="辨識結果服務壓力測試")
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--slow", type=float, default=0.2, help="慢速訂閱者比例")
+    parser.add_argument("--rate", type=float, default=120, help="每秒改變幾次結果 (每次兩隻手各一筆)")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--processes", type=int, default=0, help="訂閱者程序數 (預設為 CPU 核心數)")
+    main(parser.parse_args())
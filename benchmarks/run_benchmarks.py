@@ -0,0 +1,263 @@
+"""端到端效能測試：不需要攝影機與視窗，以錄好的影片與關鍵點檔案重播
+
+用法 (在專案根目錄執行)：
+    python benchmarks/run_benchmarks.py                    # 執行並與 baseline.json 比較
+    python benchmarks/run_benchmarks.py --update-baseline  # 執行並把結果寫入 baseline.json
+    python benchmarks/run_benchmarks.py --record clip.mp4  # 由影片產生關鍵點檔案 (fixtures/clip.npz)
+    python benchmarks/run_benchmarks.py --synthesize       # 重新產生內建的合成關鍵點檔案 (fixtures/synthetic.npz)
+
+fixtures/ 資料夾中：
+    *.mp4 / *.avi 影片 → HandDetection.process_frame (數字 / 手勢模式、各偵測預設組合)
+    *.npz 關鍵點       → detect_numbers 與各推論後端的手勢分類
+        landmarks (幀數, 2, 21, 3) float32、hand_count (幀數,)、is_right (幀數, 2)
+手勢分類以設定檔 feature_set 的特徵組合 (與即時辨識相同) 產生模型輸入。
+
+專案內附 fixtures/synthetic.npz (固定亂數種子產生的合成關鍵點，不需要 Mediapipe)。
+baseline.json 與硬體和安裝的套件有關，不放進版本控制：第一次在目標機器 (或 CI 機器) 上量測前，
+先在基準版本執行一次 --update-baseline 建立，之後的執行才有比較對象。
+沒有 baseline、設定不在 baseline 中、或任何一組設定執行失敗時，結束代碼都不為 0。
+"""
+import argparse, glob, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+SYNTHETIC_PATH = os.path.join(FIXTURE_DIR, "synthetic.npz")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+WARMUP = 10  # 前幾次不計入 (模型初始化等)
+FIXTURE_ROUNDS = 20  # 關鍵點檔案重播的次數 (單次呼叫只有數十微秒，筆數太少時百分位數不穩定)
+
+def peak_rss_mb():
+    """目前程序的最高記憶體用量 (MB)"""
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        import psutil  # Windows 沒有 resource 模組
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+def replay_video(path):
+    """依序產生影片中的每一幀"""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"無法開啟影片: {path}")
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+    cap.release()
+
+def bench_process_frame(config):
+    from cogs.hand_detection import HandDetection
+    from cogs.adaptive_detection import AdaptiveDetector, PRESETS
+    from cogs import model_registry
+    detection = HandDetection()
+    detection.detector = AdaptiveDetector(detection.hands, **PRESETS[config["preset"]])
+    is_advanced_mode = config["mode"] == "gesture"
+    if is_advanced_mode:
+        model_registry.get_model()
+    # 影片邊讀邊測，解碼時間不計入，也不必把整段影片放在記憶體中
+    return (lambda frame=frame: detection.process_frame(frame, is_advanced_mode)
+            for frame in replay_video(config["path"]))
+
+def load_fixture(path):
+    """回傳每幀有手的 (關鍵點, 是否右手)，重複 FIXTURE_ROUNDS 次"""
+    data = np.load(path)
+    return [(data["landmarks"][i, :n], data["is_right"][i, :n])
+            for i, n in enumerate(data["hand_count"]) if n > 0] * FIXTURE_ROUNDS
+
+def bench_detect_numbers(config):
+    from cogs.landmark_features import detect_numbers
+    return [lambda l=landmarks, r=is_right: detect_numbers(l, r) for landmarks, is_right in load_fixture(config["path"])]
+
+def bench_predict_gesture(config):
+    from cogs.gesture_backend import load_backend
+    from cogs.landmark_features import extract_features
+    backend = load_backend(config["backend"])
+    return [lambda x=extract_features(landmarks, config["feature_set"]): backend.predict(x)
+            for landmarks, _ in load_fixture(config["path"])]
+
+BENCHMARKS = {
+    "process_frame":   bench_process_frame,
+    "detect_numbers":  bench_detect_numbers,
+    "predict_gesture": bench_predict_gesture,
+}
+
+def run_config(config):
+    """(獨立程序) 執行一組設定，回傳吞吐量、延遲百分位數與最高記憶體用量"""
+    os.chdir(ROOT)
+    times = []
+    for i, call in enumerate(BENCHMARKS[config["kind"]](config)):
+        start = time.perf_counter()
+        call()
+        if i >= WARMUP:
+            times.append(time.perf_counter() - start)
+    if not times:
+        raise ValueError(f"{config['name']} 的資料太少 (至少需要 {WARMUP + 1} 筆)")
+    times = np.array(times) * 1000
+    return {"items": len(times), "throughput": len(times) / (times.sum() / 1000),
+            "p50": float(np.percentile(times, 50)), "p95": float(np.percentile(times, 95)),
+            "p99": float(np.percentile(times, 99)), "peak_rss_mb": peak_rss_mb()}
+
+def find_configs():
+    from cogs.adaptive_detection import PRESETS
+    from cogs.config import get_setting
+    from cogs.gesture_backend import MODEL_PATHS
+    feature_set = get_setting("feature_set", "xy")  # 需與訓練模型時使用的特徵組合相同
+    configs = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.mp4")) + glob.glob(os.path.join(FIXTURE_DIR, "*.avi"))):
+        clip = os.path.basename(path)
+        for mode in ("number", "gesture"):
+            for preset in PRESETS:
+                configs.append({"name": f"process_frame/{clip}/{mode}/{preset}", "kind": "process_frame",
+                                "path": path, "mode": mode, "preset": preset})
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.npz"))):
+        fixture = os.path.basename(path)
+        configs.append({"name": f"detect_numbers/{fixture}", "kind": "detect_numbers", "path": path})
+        for backend, model_path in MODEL_PATHS.items():
+            if os.path.exists(os.path.join(ROOT, model_path)):
+                configs.append({"name": f"predict_gesture/{fixture}/{backend}/{feature_set}", "kind": "predict_gesture",
+                                "path": path, "backend": backend, "feature_set": feature_set})
+    return configs
+
+def record_fixture(video_path):
+    """以 Mediapipe 跑完影片，存成關鍵點檔案"""
+    import cv2
+    import mediapipe as mp
+    from cogs.landmark_features import landmarks_to_array
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    landmarks, hand_count, is_right = [], [], []
+    for frame in replay_video(video_path):
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        frame_landmarks = np.zeros((2, 21, 3), dtype=np.float32)
+        frame_is_right = np.zeros(2, dtype=bool)
+        n = 0
+        if results.multi_hand_landmarks:
+            found = landmarks_to_array(results.multi_hand_landmarks)[:2]
+            n = len(found)
+            frame_landmarks[:n] = found
+            frame_is_right[:n] = [h.classification[0].label == "Right" for h in results.multi_handedness[:n]]
+        landmarks.append(frame_landmarks)
+        hand_count.append(n)
+        is_right.append(frame_is_right)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    out_path = os.path.join(FIXTURE_DIR, os.path.splitext(os.path.basename(video_path))[0] + ".npz")
+    np.savez_compressed(out_path, landmarks=np.array(landmarks), hand_count=np.array(hand_count),
+                        is_right=np.array(is_right))
+    print(f"✅ 已儲存關鍵點檔案: {out_path} ({len(landmarks)} 幀)")
+
+def synthesize_fixture(frames=300, seed=0):
+    """產生合成的關鍵點檔案：張開的手逐幀隨機彎曲手指、緩慢移動，約一半的幀有兩隻手"""
+    rng = np.random.default_rng(seed)
+    # 手掌朝前的右手 (正規化座標，y 向下)：手腕、拇指 4 點、其餘四指各 4 點 (根部 → 指尖)
+    template = np.zeros((21, 3), dtype=np.float32)
+    template[1:5, 0] = 0.03 + np.arange(4) * -0.025
+    template[1:5, 1] = -0.03 - np.arange(4) * 0.02
+    for finger, x in enumerate((-0.045, -0.015, 0.015, 0.045)):
+        joints = slice(5 + finger * 4, 9 + finger * 4)
+        template[joints, 0] = x
+        template[joints, 1] = -0.08 - np.arange(4) * 0.03
+    landmarks = np.zeros((frames, 2, 21, 3), dtype=np.float32)
+    is_right = np.zeros((frames, 2), dtype=bool)
+    hand_count = np.where(rng.random(frames) < 0.5, 2, 1)
+    hand_count[rng.random(frames) < 0.1] = 0
+    for i in range(frames):
+        for h in range(hand_count[i]):
+            hand = template.copy()
+            for finger in np.flatnonzero(rng.random(4) < 0.5):  # 彎曲的手指：指尖折回第二關節下方
+                tip = 8 + finger * 4
+                hand[tip - 1:tip + 1, 1] = hand[tip - 3, 1] + 0.02
+            if rng.random() < 0.5:
+                hand[3:5, 0] = hand[2, 0] + 0.01  # 拇指收起
+            right = h == 0
+            if not right:
+                hand[:, 0] *= -1  # 左手為鏡像
+            drift = 0.1 * np.sin(i / 30 + h)
+            hand[:, 0] += (0.65 if right else 0.35) + drift
+            hand[:, 1] += 0.75
+            hand += rng.normal(0, 0.003, hand.shape).astype(np.float32)
+            landmarks[i, h], is_right[i, h] = hand, right
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    np.savez_compressed(SYNTHETIC_PATH, landmarks=landmarks, hand_count=hand_count, is_right=is_right)
+    print(f"✅ 已儲存合成關鍵點檔案: {SYNTHETIC_PATH} ({frames} 幀)")
+
+def compare(name, result, baseline, tolerance):
+    """與 baseline 比較，變慢超過 tolerance 或 baseline 中沒有這組設定時回傳 True"""
+    if name not in baseline:
+        print("   ⚠️ baseline 中沒有這組設定 (請以 --update-baseline 加入)")
+        return True
+    base = baseline[name]
+    slower = result["p50"] > base["p50"] * (1 + tolerance) or result["throughput"] < base["throughput"] * (1 - tolerance)
+    if slower:
+        print(f"   ⚠️ 比 baseline 慢：p50 {base['p50']:.3f} → {result['p50']:.3f} ms，"
+              f"吞吐量 {base['throughput']:.1f} → {result['throughput']:.1f} /s")
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="手勢辨識效能測試")
+    parser.add_argument("--record", metavar="VIDEO", help="由影片產生關鍵點檔案後結束")
+    parser.add_argument("--synthesize", action="store_true", help="重新產生合成關鍵點檔案後結束")
+    parser.add_argument("--update-baseline", "--save-baseline", dest="update_baseline", action="store_true",
+                        help="將這次結果寫入 baseline (在目標機器上執行)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="容許變慢的比例 (預設 15%%)")
+    parser.add_argument("--filter", default="", help="只執行名稱包含此字串的設定")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixture(args.record)
+        return
+    if args.synthesize:
+        synthesize_fixture()
+        return
+
+    configs = [c for c in find_configs() if args.filter in c["name"]]
+    if not configs:
+        print(f"❌ {FIXTURE_DIR} 中沒有影片或關鍵點檔案 (可用 --record 或 --synthesize 產生)")
+        sys.exit(1)
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf8") as f:
+            baseline = json.load(f)
+    elif not args.update_baseline:
+        print(f"❌ 找不到 {BASELINE_PATH}，請先在這台機器上以 --update-baseline 建立")
+        sys.exit(1)
+
+    results, regressions, failures = {}, [], []
+    for config in configs:
+        # 每組設定在全新的程序中執行，最高記憶體用量才不會互相影響
+        try:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_config, config).result()
+        except Exception as e:
+            print(f"❌ {config['name']} 執行失敗: {e}")
+            failures.append(config["name"])
+            continue
+        results[config["name"]] = result
+        print(f"{config['name']}: {result['throughput']:.1f} /s，p50 {result['p50']:.3f} / p95 {result['p95']:.3f} / "
+              f"p99 {result['p99']:.3f} ms，peak RSS {result['peak_rss_mb']:.0f} MB")
+        if not args.update_baseline and compare(config["name"], result, baseline, args.tolerance):
+            regressions.append(config["name"])
+
+    if args.update_baseline:
+        baseline.update(results)  # 執行失敗的設定不寫入，保留原本的數值
+        with open(BASELINE_PATH, "w", encoding="utf8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        print(f"✅ 已更新 baseline: {BASELINE_PATH} ({len(results)} 組設定)")
+    if failures:
+        print(f"❌ {len(failures)} 組設定執行失敗")
+    if regressions:
+        print(f"❌ {len(regressions)} 組設定比 baseline 慢或不在 baseline 中")
+    if failures or regressions:
+        sys.exit(1)
+    if not args.update_baseline:
+        print("✅ 沒有發現效能退步")
+
+if __name__ == '__main__':
+    main()
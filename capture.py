@@ -5,6 +5,8 @@ from tkinter import ttk
 from PIL import Image, ImageTk
 from tensorflow.keras.models import load_model
 import numpy as np
+from cogs.config import get_setting
+from cogs.landmark_features import landmarks_to_array, extract_features
 
 # 讀取設定檔案，包含攝影機來源等參數
 with open(".vscode/setting.json", 'r', encoding='utf8') as jfile:
@@ -13,6 +15,7 @@ with open(".vscode/setting.json", 'r', encoding='utf8') as jfile:
 # 載入手勢識別模型
 model = load_model("gesture_model/gesture_model.h5")
 gesture_labels = ["victory ✌️", "fist ✊", "ok 👌", "middle 🖕", "thumbs_up 👍", "heart 🫰"]
+feature_set = get_setting("feature_set", "xy")  # 需與訓練模型時使用的特徵組合相同
 
 # 定義攝影機來源，預設為 USB 攝影機 (0)，若無法開啟則使用設定檔中的串流來源
 video_sources = [0, jdata["video_source"]]
@@ -142,12 +145,8 @@ class App:
     
     def predict_gesture(self, hand_landmarks):
         """使用 AI 模型預測手勢"""
-        landmarks = []
-        for lm in hand_landmarks.landmark:
-            landmarks.extend([lm.x, lm.y])
-
-        # 轉換為 NumPy 陣列並進行預測
-        data = np.array(landmarks).reshape(1, 42)
+        # 轉換為模型輸入 (1, 特徵數) 並進行預測
+        data = extract_features(landmarks_to_array([hand_landmarks]), feature_set)
         prediction = self.model.predict(data)[0]
         
         # 取得機率最高的手勢
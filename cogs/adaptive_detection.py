@@ -0,0 +1,140 @@
+"""可調整的手部偵測：縮小影像、每 N 幀才偵測一次、以及依上一幀的手部範圍裁切 ROI
+
+設定檔 detection 區塊 (皆可省略)：
+    "detection": {"preset": "balanced", "scale": 0.75, "detect_every": 2,
+                  "roi_tracking": true, "roi_margin": 0.25, "stable_frames": 3, "rescan_every": 10,
+                  "max_num_hands": 2, "max_width": 640}
+preset 提供預設組合，其他欄位會覆寫 preset 的值；max_width 未設定時使用 capture 區塊的 inference_width。
+
+跳過的幀不做內插，直接沿用上一次偵測的關鍵點 (手移動時會停在舊位置，直到下一次偵測)。
+ROI 裁切的影像交給另一個靜態模式 (static_image_mode) 的偵測器處理，追蹤模式的偵測器只看整張影像，
+兩種座標不會混進同一份追蹤狀態。
+"""
+import cv2
+import numpy as np
+from cogs.config import get_setting
+from cogs.detector_backend import create_hands
+from cogs.landmark_features import landmarks_to_array
+
+# 準確度 ↔ 速度 的預設組合 (quality 等同原本每幀全解析度偵測)
+PRESETS = {
+    "quality":  {"scale": 1.0,  "detect_every": 1, "roi_tracking": False},
+    "balanced": {"scale": 0.75, "detect_every": 2, "roi_tracking": True},
+    "fast":     {"scale": 0.5,  "detect_every": 3, "roi_tracking": True},
+}
+
+class AdaptiveDetector:
+    def __init__(self, hands, scale=1.0, detect_every=1, roi_tracking=False, roi_margin=0.25, stable_frames=3,
+                 max_width=None, rescan_every=10, max_num_hands=2, roi_hands=None):
+        """
+        hands:         mp.solutions.hands.Hands 實例 (或 detector_backend 建立的偵測器)，只用來偵測整張影像
+        scale:         偵測前將影像縮小的比例
+        detect_every:  每 N 幀才真正偵測一次，中間的幀回傳上一次的關鍵點 (不內插)
+        roi_tracking:  追蹤穩定時只偵測上一幀手部外框附近的區域
+        roi_margin:    ROI 向外擴張的比例 (相對於外框大小)
+        stable_frames: 連續偵測到手幾幀後才開始使用 ROI
+        max_width:     偵測用影像的寬度上限 (擷取解析度較高時先縮小，顯示仍用原本的影像)
+        rescan_every:  追蹤的手少於 max_num_hands 時，每 N 次偵測改用整張影像 (找出 ROI 外新出現的手)
+        max_num_hands: 偵測器最多偵測的手數
+        roi_hands:     偵測 ROI 裁切影像的靜態模式偵測器，None 表示第一次用到 ROI 時自動建立
+        """
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.scale = scale
+        self.detect_every = max(1, int(detect_every))
+        self.roi_tracking = roi_tracking
+        self.roi_margin = roi_margin
+        self.stable_frames = stable_frames
+        self.max_width = max_width
+        self.rescan_every = max(1, int(rescan_every))
+        self.max_num_hands = max_num_hands
+        self.frame_count = 0
+        self.detect_count = 0     # 實際偵測的次數
+        self.tracked_hands = 0    # 上一次偵測到的手數
+        self.stable_count = 0     # 連續偵測到手的幀數
+        self.last_results = None
+        self.last_box = None      # 上一次所有手的外框 (x0, y0, x1, y1)，正規化座標
+        self.used_roi = False     # 上一次偵測是否只看 ROI (期間追蹤模式的偵測器沒看到任何影像)
+
+    @classmethod
+    def from_settings(cls, hands):
+        """依設定檔 detection 區塊建立"""
+        settings = dict(get_setting("detection", {}))
+        options = dict(PRESETS[settings.pop("preset", "quality")])
+        options.update(settings)
+        options.setdefault("max_width", get_setting("capture", {}).get("inference_width"))
+        if getattr(hands, "asynchronous", False):
+            options["roi_tracking"] = False  # 非同步後端的結果對應較早的影像，無法換算 ROI 座標
+        return cls(hands, **options)
+
+    def process(self, image):
+        """偵測 RGB 影像中的手，回傳的關鍵點座標一律相對於完整影像"""
+        self.frame_count += 1
+        if self.last_results is not None and self.frame_count % self.detect_every != 0:
+            return self.last_results  # 略過此幀，沿用上一次的關鍵點
+
+        self.detect_count += 1
+        roi = None
+        if self.roi_tracking and self.stable_count >= self.stable_frames:
+            # 手數還沒到上限時定期偵測整張影像，否則 ROI 外新出現的手永遠不會被發現
+            if self.tracked_hands >= self.max_num_hands or self.detect_count % self.rescan_every != 0:
+                roi = self._roi()
+        results = self._detect(image, roi)
+        if roi is not None and not results.multi_hand_landmarks:
+            # ROI 中追丟了，立刻改用整張影像重新偵測
+            results = self._detect(image, None)
+
+        self.tracked_hands = len(results.multi_hand_landmarks or ())
+        if results.multi_hand_landmarks:
+            self.stable_count += 1
+            points = landmarks_to_array(results.multi_hand_landmarks)[:, :, :2].reshape(-1, 2)
+            self.last_box = (*points.min(axis=0), *points.max(axis=0))
+        else:
+            self.stable_count = 0
+            self.last_box = None
+        self.last_results = results
+        return results
+
+    def _roi(self):
+        """上一幀的手部外框向外擴張 roi_margin，並限制在影像範圍內"""
+        x0, y0, x1, y1 = self.last_box
+        mx, my = (x1 - x0) * self.roi_margin, (y1 - y0) * self.roi_margin
+        return max(0.0, x0 - mx), max(0.0, y0 - my), min(1.0, x1 + mx), min(1.0, y1 + my)
+
+    def _detect(self, image, roi):
+        h, w = image.shape[:2]
+        if roi is not None:
+            x0, y0 = int(roi[0] * w), int(roi[1] * h)
+            x1, y1 = max(x0 + 1, int(roi[2] * w)), max(y0 + 1, int(roi[3] * h))
+            image = image[y0:y1, x0:x1]
+        scale = self.scale
+        if self.max_width:
+            scale = min(scale, self.max_width / w)
+        if scale != 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if roi is not None:
+            if self.roi_hands is None:
+                self.roi_hands = create_hands("solutions", static_image_mode=True)
+            self.used_roi = True
+            results = self.roi_hands.process(np.ascontiguousarray(image))
+        else:
+            if self.used_roi:
+                # 追蹤狀態停在開始用 ROI 之前的位置，重設後重新找手
+                self.hands.reset()
+                self.used_roi = False
+            results = self.hands.process(np.ascontiguousarray(image))
+
+        if roi is not None and results.multi_hand_landmarks:
+            # 將 ROI 內的正規化座標換算回完整影像的正規化座標
+            rx, ry, rw, rh = x0 / w, y0 / h, (x1 - x0) / w, (y1 - y0) / h
+            for hand in results.multi_hand_landmarks:
+                for lm in hand.landmark:
+                    lm.x = rx + lm.x * rw
+                    lm.y = ry + lm.y * rh
+        return results
+
+    def close(self):
+        """釋放自動建立的 ROI 偵測器 (hands 由呼叫端負責)"""
+        if self.roi_hands is not None:
+            self.roi_hands.close()
+            self.roi_hands = None
@@ -1,57 +1,184 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-from cogs.video import open_video_source
+from cogs.video import VideoSourceManager
 from cogs.ui import setup_ui
 from cogs.hand_detection import HandDetection
-import cv2
+from cogs.config import get_setting
+from cogs.pipeline import Pipeline
+from cogs.renderer import FrameRenderer
+from cogs.profiler import profiler
+from cogs.result_server import ResultServer
+from cogs.scene_filter import SceneFilter
+from cogs.clip_recorder import ClipRecorder
+from cogs.frame_bus import FrameBus, frame_bus_settings
+import time
 
 class App:
-    def __init__(self, window):
+    title = "🖐 手勢數字 & AI 手勢識別"
+
+    def __init__(self, window, start_time=None):
         # 初始化主視窗
         self.window = window
-        self.window.title("🖐 手勢數字 & AI 手勢識別")
+        self.window.title(self.title)
         self.window.configure(bg="#1e1e1e")
 
+        # 啟動時間 (用來計算首次畫面耗時)
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.first_paint = True
+
         # 初始化變數
+        self.setup_detection()
         self.is_advanced_mode = False  # 模式切換標誌
-        self.hand_detection = HandDetection()  # Mediapipe 手部偵測
-        self.cap = open_video_source(0)  # 開啟攝影機
-
-        # 根據攝影機影像大小設定視窗大小
-        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))  # 取得影像寬度
-        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))  # 取得影像高度
-        self.window.geometry(f"{self.width + 200}x{self.height + 50}")  # 加上額外空間以容納控制區域
+        self.width, self.height = 0, 0  # 收到第一張影像後才依影像大小設定視窗大小
+        self.result_texts = {}  # 目前顯示的結果文字，沒變就不更新 Label
 
         # 設定 UI
         self.ui_elements = setup_ui(window, self)  # 使用外部函數設定 UI
+        self.renderer = FrameRenderer(self.ui_elements["canvas"], get_setting("display_fps"))
+
+        # 辨識結果發布服務 (讓其他系統訂閱穩定結果的變化)
+        self.result_server = ResultServer.from_settings()
+        if self.result_server is not None:
+            self.add_listener(self.result_server.publish)
+
+        # 手勢觸發的片段記錄 (需要在推論執行緒拿到每一張影像，只支援單一程序、單一來源的 Pipeline)
+        self.clip_recorder = None
+        if isinstance(self.pipeline, Pipeline):
+            self.clip_recorder = ClipRecorder.from_settings()
+        elif get_setting("clip_recorder"):
+            print("⚠️ 影像匯流排 / 多攝影機模式不支援片段記錄，已停用 clip_recorder")
+        if self.clip_recorder is not None:
+            self.add_listener(self.clip_recorder.trigger)
+
+        # 啟動擷取 / 推論管線，Tk 主執行緒只負責顯示
+        self.pipeline.start()
+
+        # 效能資訊 (控制面板顯示 / Prometheus 端點)
+        self.perf_job = None
+        if get_setting("show_perf_overlay", False):
+            self.toggle_perf_overlay()
+        if get_setting("metrics_port"):
+            profiler.serve(get_setting("metrics_port"))
 
         # 啟動影像更新
         self.delay = 5
         self.update()
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def setup_detection(self):
+        """建立偵測器、影像來源與擷取 / 推論管線 (子類別可覆寫)"""
+        bus_settings = frame_bus_settings()
+        if bus_settings is None:
+            self.hand_detection = HandDetection()  # Mediapipe 手部偵測
+            self.cap = VideoSourceManager()  # 在背景開啟攝影機 (下一個來源預先待命)
+            self.pipeline = Pipeline(self.read_frame, self.process_frame)
+        else:
+            # 擷取與偵測在其他程序執行，影像經由共享記憶體傳遞；這裡只做平滑、通知與顯示
+            capture = get_setting("capture", {})
+            frame_size = bus_settings.get("frame_size") or (capture.get("width", 640), capture.get("height", 480))
+            self.hand_detection = HandDetection(detector_backend="remote")
+            self.cap = FrameBus(self.hand_detection, lambda: self.is_advanced_mode,
+                                detectors=bus_settings.get("detectors", 2), slots=bus_settings.get("slots"),
+                                frame_size=frame_size)
+            self.pipeline = self.cap
+        # 畫面沒變且沒有手時略過偵測 (影像匯流排模式的偵測在其他程序，不經過 process_frame)
+        self.scene_filter = SceneFilter.from_settings() if bus_settings is None else None
+
+    def add_listener(self, listener):
+        """註冊穩定結果改變時的通知函數"""
+        self.hand_detection.add_listener(listener)
+
+    def read_frame(self):
+        """(擷取執行緒) 從目前的攝影機讀取最新影像"""
+        if self.scene_filter is not None:
+            # 閒置時擷取執行緒只 grab 不解碼，每隔 poll_interval 才解碼一張
+            self.cap.set_interval(self.scene_filter.poll_interval)
+        return self.cap.read()
+
+    def process_frame(self, frame):
+        """(推論執行緒) 手部偵測與辨識，畫面沒變化時回傳 None (不更新畫面)"""
+        if self.scene_filter is not None:
+            with profiler.measure("scene_filter"):
+                process = self.scene_filter.should_process(frame, self.hand_detection.hands_present)
+            if not process:
+                if self.clip_recorder is not None:
+                    self.clip_recorder.record(frame)
+                return None
+        result = self.hand_detection.process_frame(frame, self.is_advanced_mode)
+        if self.clip_recorder is not None:
+            self.clip_recorder.record(frame, self.hand_detection.last_results)
+        return result
+
     def update(self):
-        ret, frame = self.cap.read()
-        if ret:
-            left_result, right_result, processed_frame = self.hand_detection.process_frame(frame, self.is_advanced_mode)
-            self.ui_elements["left_hand_text"].set(left_result)
-            self.ui_elements["right_hand_text"].set(right_result)
-
-            # 更新影像到 Canvas
-            image = Image.fromarray(processed_frame)
-            photo = ImageTk.PhotoImage(image=image)
-            if hasattr(self, "canvas_image"):
-                self.ui_elements["canvas"].delete(self.canvas_image)
-            self.canvas_image = self.ui_elements["canvas"].create_image(0, 0, image=photo, anchor=tk.NW)
-            self.ui_elements["canvas"].image = photo
-
-        self.window.after(self.delay, self.update)
+        result = self.pipeline.get_result()
+        if result is not None:
+            self.show_result(*result)
+
+        idle = self.scene_filter is not None and self.scene_filter.idle
+        self.window.after(50 if idle else self.delay, self.update)
+
+    def show_result(self, left_result, right_result, processed_frame):
+        """更新左右手結果文字與畫面，回傳畫面是否有畫出去 (超過顯示幀率上限時為 False)"""
+        self.set_result_text("left_hand_text", left_result)
+        self.set_result_text("right_hand_text", right_result)
+
+        # 根據攝影機影像大小設定視窗大小
+        height, width = processed_frame.shape[:2]
+        if (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            self.window.geometry(f"{self.width + 200}x{self.height + 50}")  # 加上額外空間以容納控制區域
+
+        # 更新影像到 Canvas (超過顯示幀率上限時略過)
+        with profiler.measure("render"):
+            rendered = self.renderer.render(processed_frame)
+        if rendered and self.first_paint:
+            self.first_paint = False
+            print(f"🚀 首次畫面耗時 {time.perf_counter() - self.start_time:.2f} 秒")
+            # 畫面出現後再於背景預先載入手勢模型
+            if get_setting("preload_model", True):
+                self.window.after_idle(self.load_model_async)
+        return rendered
+
+    def load_model_async(self, retry=False):
+        """在背景執行緒載入手勢模型 (retry=True 時重新嘗試之前失敗的載入)"""
+        self.hand_detection.load_model_async(retry)
+
+    def set_result_text(self, key, text):
+        """結果文字有變才更新，避免每幀都重繪 Label"""
+        if self.result_texts.get(key) != text:
+            self.result_texts[key] = text
+            self.ui_elements[key].set(text)
+
+    def toggle_perf_overlay(self):
+        """顯示 / 隱藏效能資訊"""
+        if self.perf_job is None:
+            self.ui_elements["perf_label"].pack(anchor="w", padx=5, pady=2)
+            self.update_perf_overlay()
+        else:
+            self.window.after_cancel(self.perf_job)
+            self.perf_job = None
+            self.ui_elements["perf_label"].pack_forget()
+
+    def update_perf_overlay(self):
+        """每 0.5 秒更新一次各階段耗時與管線 FPS / 佇列深度"""
+        pipeline = "\n".join(f"{stage:<9} {s['fps']:5.1f} fps  "
+                             + (f"queue {s['queue']}" if "queue" in s else f"drop {s['dropped']}")
+                             for stage, s in self.pipeline.stage_stats().items())
+        self.ui_elements["perf_text"].set(f"p50 / p95 / p99\n{profiler.format_text()}\n{pipeline}{self.cpu_usage_text()}")
+        self.perf_job = self.window.after(500, self.update_perf_overlay)
+
+    def cpu_usage_text(self):
+        """閒置 / 正常狀態各自的 CPU 使用率"""
+        if self.scene_filter is None:
+            return ""
+        usage = " / ".join(f"{state} {cpu:.0f}%" if cpu is not None else f"{state} -"
+                           for state, cpu in self.scene_filter.cpu_usage().items())
+        current = "idle" if self.scene_filter.idle else "active"
+        return f"\nCPU ({current})  {usage}"
 
     def switch_camera(self):
-        """切換攝影機"""
-        self.cap.release()
-        self.cap = open_video_source((self.cap.index + 1) % len(self.cap.sources))
+        """切換攝影機 (下一個來源已預先開啟，可立即切換)"""
+        self.cap.switch()
 
     def switch_mode(self):
         """切換模式"""
@@ -64,6 +191,7 @@ class App:
 
         # 根據模式更新左手和右手的標籤文字
         if self.is_advanced_mode:
+            self.load_model_async(retry=True)  # 第一次進入手勢模式時於背景載入模型 (之前失敗則重新嘗試)
             self.ui_elements["left_hand_label"].config(text="左手的手勢：")
             self.ui_elements["right_hand_label"].config(text="右手的手勢：")
         else:
@@ -72,6 +200,15 @@ class App:
 
     def on_closing(self):
         """釋放資源並關閉視窗"""
-        if self.cap.isOpened():
-            self.cap.release()
+        self.pipeline.stop()
+        if self.result_server is not None:
+            self.result_server.stop()
+        if self.clip_recorder is not None:
+            self.clip_recorder.stop()
+        profiler.dump(get_setting("perf_stats_path", "perf_stats.prom"))
+        for source, stats in self.cap.stats().items():
+            print(f"📷 {source}: 讀取延遲 {stats['latency_ms']:.1f} ms，丟棄 {stats['dropped']} 張")
+        if self.scene_filter is not None:
+            print(f"💤 略過 {self.scene_filter.skipped} 張靜止畫面，{self.cpu_usage_text().strip()}")
+        self.cap.release()
         self.window.destroy()
\ No newline at end of file
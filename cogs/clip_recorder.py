@@ -0,0 +1,156 @@
+"""手勢觸發的影片片段記錄：預先配置的環狀緩衝區保留最近幾秒的影像與關鍵點
+
+指定的數字 / 手勢成為穩定結果時，收集觸發前 pre_seconds 秒到觸發後 post_seconds 秒的影像，
+交給背景編碼執行緒寫成 MP4 與關鍵點檔案 (.npz)。推論執行緒只做記憶體複製，不碰磁碟；
+編碼還沒完成時的新觸發直接略過，不會排隊累積。所有緩衝區在開始時一次配置，之後不再增加記憶體。
+
+設定檔 clip_recorder 區塊 (沒有設定則不記錄)：
+    "clip_recorder": {"triggers": {"number": [5], "gesture": ["讚"]}, "pre_seconds": 5, "post_seconds": 2,
+                      "fps": 30, "frame_size": [1280, 720], "output_dir": "clips"}
+frame_size 省略時依第一張影像的大小配置，之後大小不同的影像會縮放到相同大小。
+
+關鍵點檔案內容：
+    times (N,) 時間戳記、landmarks (N, 2, 21, 3) float32、hand_labels (N, 2) int8 (0 無 / 1 Left / 2 Right)、
+    event 觸發事件 (JSON 字串)
+"""
+import json, os, threading, time
+import cv2
+import numpy as np
+from cogs.config import get_setting
+from cogs.landmark_features import landmarks_to_array
+
+HAND_CODES = {"Left": 1, "Right": 2}
+
+class ClipRecorder:
+    def __init__(self, triggers, pre_seconds=5, post_seconds=2, fps=30, frame_size=None,
+                 output_dir="clips", margin_seconds=1):
+        """
+        triggers:       {"number": [數字...], "gesture": [手勢名稱...]}
+        fps:            預估的影像幀率 (決定緩衝區張數)
+        margin_seconds: 緩衝區比片段多保留的秒數，讓編碼執行緒複製時不會被新影像覆蓋
+        """
+        self.triggers = {mode: set(values) for mode, values in triggers.items()}
+        self.fps = fps
+        self.pre_frames = int(pre_seconds * fps)
+        self.post_frames = int(post_seconds * fps)
+        self.window = self.pre_frames + self.post_frames
+        self.capacity = self.window + int(margin_seconds * fps)
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.frames = None  # (capacity, H, W, 3) uint8，配置後不再改變
+        self.export = None  # (window, H, W, 3) uint8，編碼執行緒使用的複本
+        self.seq = np.full(self.capacity, -1, dtype=np.int64)  # 每格目前存放的影像編號
+        self.times = np.zeros(self.capacity, dtype=np.float64)
+        self.landmarks = np.zeros((self.capacity, 2, 21, 3), dtype=np.float32)
+        self.hand_labels = np.zeros((self.capacity, 2), dtype=np.int8)
+        self.count = 0           # 已記錄的影像數 (下一張的編號)
+        self.pending = None      # 等待觸發後影像的片段 (事件, 起始編號, 結束編號)
+        self.saved = 0
+        self.skipped = 0         # 編碼忙碌中而略過的觸發次數
+        self.job = None
+        self.cond = threading.Condition()
+        self.running = True
+        if frame_size is not None:
+            self._allocate((frame_size[1], frame_size[0], 3))
+        self.thread = threading.Thread(target=self._encode_loop, name="clip-encoder", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def from_settings(cls):
+        """依設定檔建立，沒有設定時回傳 None"""
+        settings = get_setting("clip_recorder")
+        if not settings:
+            return None
+        return cls(**settings)
+
+    def _allocate(self, shape):
+        self.frames = np.zeros((self.capacity, *shape), dtype=np.uint8)
+        self.export = np.zeros((self.window, *shape), dtype=np.uint8)
+        total = (self.frames.nbytes + self.export.nbytes + self.landmarks.nbytes) / 1024 / 1024
+        print(f"🎞️ 片段記錄緩衝區：{self.capacity} 張 {shape[1]}x{shape[0]}，共 {total:.0f} MB")
+
+    def record(self, frame, results=None):
+        """(推論執行緒) 記錄一張 BGR 影像與 Mediapipe 結果 (沒有偵測時傳 None)"""
+        if self.frames is None:
+            self._allocate(frame.shape)
+        i = self.count % self.capacity
+        self.seq[i] = -1  # 寫入中，編碼執行緒複製到這格時會視為已覆蓋
+        slot = self.frames[i]
+        if frame.shape == slot.shape:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot, interpolation=cv2.INTER_AREA)
+
+        n = 0
+        if results is not None and results.multi_hand_landmarks:
+            hands = results.multi_hand_landmarks[:2]
+            n = len(hands)
+            landmarks_to_array(hands, out=self.landmarks[i])
+            for j, handLabel in enumerate(results.multi_handedness[:n]):
+                self.hand_labels[i, j] = HAND_CODES.get(handLabel.classification[0].label, 0)
+        self.hand_labels[i, n:] = 0
+        self.times[i] = time.time()
+        self.seq[i] = self.count
+        self.count += 1
+
+        if self.pending is not None and self.count >= self.pending[2]:
+            with self.cond:
+                self.job, self.pending = self.pending, None
+                self.cond.notify()
+
+    def trigger(self, event):
+        """HandDetection 的 listener：穩定結果符合設定的數字 / 手勢時開始收集片段"""
+        if event["value"] is None or event["value"] not in self.triggers.get(event["mode"], ()):
+            return
+        if self.pending is not None or self.job is not None:
+            self.skipped += 1  # 上一個片段還沒寫完，不排隊
+            return
+        start = max(0, self.count - self.pre_frames)
+        self.pending = (event, start, self.count + self.post_frames)
+
+    def _encode_loop(self):
+        while True:
+            with self.cond:
+                while self.running and self.job is None:
+                    self.cond.wait()
+                if self.job is None:
+                    return
+                event, start, end = self.job
+            try:
+                self._write_clip(event, start, end)
+            finally:
+                with self.cond:
+                    self.job = None
+
+    def _write_clip(self, event, start, end):
+        """(編碼執行緒) 先複製到 export，再寫成 MP4 與關鍵點檔案"""
+        numbers = np.arange(start, end)
+        index = numbers % self.capacity
+        n = len(index)
+        np.take(self.frames, index, axis=0, out=self.export[:n])
+        times, landmarks, hand_labels = self.times[index], self.landmarks[index], self.hand_labels[index]
+        valid = self.seq[index] == numbers  # 複製期間被新影像覆蓋的格子不寫入
+        if not valid.all():
+            print(f"⚠️ 片段中有 {int((~valid).sum())} 張影像在複製前被覆蓋")
+
+        name = time.strftime("%Y%m%d_%H%M%S", time.localtime(event["time"])) + f"_{event['hand']}_{event['value']}"
+        path = os.path.join(self.output_dir, name)
+        fps = (valid.sum() - 1) / (times[valid][-1] - times[valid][0]) if valid.sum() > 1 else self.fps
+        h, w = self.export.shape[1:3]
+        writer = cv2.VideoWriter(path + ".mp4", cv2.VideoWriter_fourcc(*"mp4v"), float(fps), (w, h))
+        for frame, ok in zip(self.export[:n], valid):
+            if ok:
+                writer.write(frame)
+        writer.release()
+        np.savez_compressed(path + ".npz", times=times[valid], landmarks=landmarks[valid],
+                            hand_labels=hand_labels[valid], event=json.dumps(event, ensure_ascii=False))
+        self.saved += 1
+        print(f"🎬 已儲存片段: {path}.mp4 ({int(valid.sum())} 張，{fps:.1f} fps)")
+
+    def stop(self):
+        """寫完正在編碼的片段後結束 (尚未收集完的片段直接捨棄)"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout=10)
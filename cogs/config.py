@@ -0,0 +1,12 @@
+import json, os
+
+# 讀取設定檔案 (.vscode/setting.json)；在 gesture_model 等子資料夾執行時改讀專案根目錄的設定檔
+SETTING_PATH = ".vscode/setting.json"
+if not os.path.exists(SETTING_PATH):
+    SETTING_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), SETTING_PATH)
+with open(SETTING_PATH, 'r', encoding='utf8') as jfile:
+    jdata = json.load(jfile)
+
+def get_setting(key, default=None):
+    """讀取設定值，設定檔沒有此項目時回傳預設值"""
+    return jdata.get(key, default)
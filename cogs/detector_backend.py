@@ -0,0 +1,114 @@
+"""手部偵測後端：舊版 mp.solutions.hands，或 MediaPipe Tasks HandLandmarker (LIVE_STREAM 非同步模式，CPU)
+
+兩種後端都提供 process(image) / reset() / close()，process 回傳與 mp.solutions.hands 相同結構的 results
+(multi_hand_landmarks 為 landmark_pb2 protobuf)，所以畫關鍵點、landmarks_to_array 等程式不需要修改。
+
+設定檔：
+    "detector_backend": "tasks"                                  # 預設 "solutions"
+    "hand_landmarker_path": "gesture_model/hand_landmarker.task"
+模型下載：https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task
+"""
+import threading, time
+from types import SimpleNamespace
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+from cogs.config import get_setting
+from cogs.profiler import profiler
+
+DETECTOR_BACKENDS = ("solutions", "tasks")
+HAND_LANDMARKER_PATH = "gesture_model/hand_landmarker.task"
+EMPTY_RESULTS = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+def to_solution_results(result):
+    """HandLandmarkerResult → 與 mp.solutions.hands 相同結構的 results"""
+    if not result.hand_landmarks:
+        return EMPTY_RESULTS
+    multi_hand_landmarks, multi_handedness = [], []
+    for landmarks, handedness in zip(result.hand_landmarks, result.handedness):
+        hand = landmark_pb2.NormalizedLandmarkList()
+        hand.landmark.extend(landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z) for lm in landmarks)
+        multi_hand_landmarks.append(hand)
+        label = classification_pb2.ClassificationList()
+        label.classification.add(index=handedness[0].index, score=handedness[0].score, label=handedness[0].category_name)
+        multi_handedness.append(label)
+    return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
+
+class TasksHands:
+    """以 HandLandmarker LIVE_STREAM 模式提供與 mp.solutions.hands.Hands 相同的介面
+
+    process 只把影像交給 MediaPipe 的背景執行緒就返回，回傳目前最新一次完成的偵測結果 (通常是前一幀)，
+    偵測因此與擷取、顯示重疊進行；MediaPipe 還在忙時會自行丟掉新影像。
+    """
+    asynchronous = True  # 回傳的結果可能對應較早的影像 (AdaptiveDetector 據此關閉 ROI)
+
+    def __init__(self, model_path=HAND_LANDMARKER_PATH, max_num_hands=2,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5):
+        vision = mp.tasks.vision
+        self.options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path,
+                                              delegate=mp.tasks.BaseOptions.Delegate.CPU),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_tracking_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result)
+        self.lock = threading.Lock()
+        self.landmarker = None
+        self.reset()
+
+    def reset(self):
+        """清除追蹤狀態 (重新建立 HandLandmarker)"""
+        self.close()
+        with self.lock:
+            self.latest = EMPTY_RESULTS
+            self.last_timestamp = 0
+            self.submitted = {}  # timestamp → 送出的時間，用來計算偵測延遲
+            self.completed = 0   # 完成偵測的影像數 (其餘被 MediaPipe 丟掉)
+        self.landmarker = mp.tasks.vision.HandLandmarker.create_from_options(self.options)
+
+    def process(self, image):
+        """送出 RGB 影像做非同步偵測，回傳最新一次完成的結果"""
+        with self.lock:
+            # LIVE_STREAM 模式要求時間戳記嚴格遞增 (毫秒)
+            timestamp = max(self.last_timestamp + 1, int(time.perf_counter() * 1000))
+            self.last_timestamp = timestamp
+            self.submitted[timestamp] = time.perf_counter()
+            latest = self.latest
+        self.landmarker.detect_async(mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(image)),
+                                     timestamp)
+        return latest
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """(MediaPipe 執行緒) 偵測完成"""
+        results = to_solution_results(result)
+        with self.lock:
+            start = self.submitted.pop(timestamp_ms, None)
+            # 比這張更早送出卻沒有結果的影像已被丟掉
+            for timestamp in [t for t in self.submitted if t < timestamp_ms]:
+                del self.submitted[timestamp]
+            self.latest = results
+            self.completed += 1
+        if start is not None:
+            profiler.record("landmarker", (time.perf_counter() - start) * 1000)
+
+    def close(self):
+        if self.landmarker is not None:
+            self.landmarker.close()
+            self.landmarker = None
+
+def create_hands(backend=None, static_image_mode=False):
+    """依設定檔 detector_backend 建立手部偵測器 (預設為影片 / 串流用的追蹤模式)
+
+    static_image_mode=True 時每張影像各自偵測、不沿用上一張的追蹤狀態 (只支援 solutions 後端)
+    """
+    backend = backend or get_setting("detector_backend", "solutions")
+    if backend == "solutions":
+        return mp.solutions.hands.Hands(static_image_mode=static_image_mode, max_num_hands=2,
+                                        min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    if backend == "tasks":
+        if static_image_mode:
+            raise ValueError("❌ tasks 偵測後端不支援 static_image_mode")
+        return TasksHands(get_setting("hand_landmarker_path", HAND_LANDMARKER_PATH))
+    raise ValueError(f"未知的偵測後端: {backend} (可用: {', '.join(DETECTOR_BACKENDS)})")
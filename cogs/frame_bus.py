@@ -0,0 +1,287 @@
+"""共享記憶體影像匯流排：擷取與手部偵測分散到多個程序
+
+擷取程序把影像 (RGB) 寫進 multiprocessing.shared_memory 中固定數量的格子，
+只透過佇列傳遞「格子編號」；偵測程序直接在共享記憶體上執行 Mediapipe 與分類 (不複製影像)，
+並在原地畫上關鍵點，只回傳關鍵點與分類結果等小資料。主程序 (Tk) 負責平滑、通知與顯示，
+顯示完才把格子還給擷取程序。影像不經過 pickle，偵測也不再和 Tk 搶同一個 GIL。
+
+格子的流向：free → 擷取程序寫入 → 偵測程序 → 主程序顯示 → free
+沒有空格子時擷取程序直接丟掉新影像，不會等待。
+
+設定檔 frame_bus 區塊 (沒有設定則使用單一程序的 Pipeline)：
+    "frame_bus": {"detectors": 2, "slots": 8, "frame_size": [640, 480]}
+"""
+import queue, time
+import multiprocessing as mp_proc
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from cogs import model_registry
+from cogs.config import get_setting
+from cogs.hand_detection import unique_handedness
+from cogs.landmark_features import landmarks_to_array, extract_features, detect_numbers
+from cogs.overlay import OverlayRenderer
+from cogs.pipeline import StageStats
+from cogs.video import VideoSourceManager, video_sources
+
+def frame_bus_settings():
+    """讀取 frame_bus 設定，未啟用時回傳 None"""
+    settings = get_setting("frame_bus", False)
+    if not settings:
+        return None
+    return settings if isinstance(settings, dict) else {}
+
+def queue_size(q):
+    """multiprocessing.Queue.qsize 在 macOS 上無法使用，此時回傳 0"""
+    try:
+        return q.qsize()
+    except NotImplementedError:
+        return 0
+
+def attach_slots(shm_name, shape):
+    """連上共享記憶體，回傳 (SharedMemory, (格子數, H, W, 3) 的 view)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+def capture_main(shm_name, shape, sources, source_index, free_slots, frame_queue, stop, captured, dropped, latency,
+                 replay):
+    """(擷取程序) 讀取影像寫入空格子；replay 為影片路徑時改為重複播放該影片 (效能測試用，會等待空格子)"""
+    shm, slots = attach_slots(shm_name, shape)
+    height, width = shape[1:3]
+    frames, manager = None, None
+    if replay:
+        cap = cv2.VideoCapture(replay)
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+        cap.release()
+    else:
+        manager = VideoSourceManager(sources, source_index.value)
+
+    seq = 0
+    while not stop.is_set():
+        if replay:
+            frame = frames[seq % len(frames)]
+        else:
+            if manager.index != source_index.value:
+                manager.switch(source_index.value)
+            ret, frame = manager.read()
+            latency.value = manager.current.latency
+            if not ret:
+                continue
+        try:
+            slot = free_slots.get(timeout=0.1) if replay else free_slots.get_nowait()
+        except queue.Empty:
+            if not replay:
+                dropped.value += 1  # 偵測或顯示跟不上，丟掉這張
+            continue
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=slots[slot])
+        frame_queue.put((slot, seq, time.time()))
+        seq += 1
+        captured.value = seq
+
+    if manager is not None:
+        manager.release()
+    del slots
+    shm.close()
+
+def detector_main(shm_name, shape, frame_queue, result_queue, mode, stop, static_image_mode, feature_set, draw):
+    """(偵測程序) 在共享記憶體的格子上偵測、分類並畫關鍵點，只回傳小資料"""
+    import mediapipe as mp
+    shm, slots = attach_slots(shm_name, shape)
+    mp_hands = mp.solutions.hands
+    hands = mp_hands.Hands(static_image_mode=static_image_mode, max_num_hands=2,
+                           min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    overlay = OverlayRenderer(draw)
+    landmark_buffer = np.empty((2, 21, 3), dtype=np.float32)
+    image = None
+
+    while not stop.is_set():
+        try:
+            slot, seq, timestamp = frame_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        start = time.perf_counter()
+        image = slots[slot]  # 直接使用共享記憶體，不複製
+        results = hands.process(image)
+        record = {"slot": slot, "seq": seq, "time": timestamp, "mode": bool(mode.value),
+                  "labels": [], "scores": [], "landmarks": None, "gestures": [], "model_failed": False}
+        if results.multi_hand_landmarks and results.multi_handedness:
+            landmarks = landmarks_to_array(results.multi_hand_landmarks, out=landmark_buffer)
+            handedness = unique_handedness(results.multi_handedness)
+            if record["mode"]:
+                model = model_registry.peek_model()
+                if model is None:
+                    model_registry.load_model_async()  # 載入失敗過就不再重試
+                    record["model_failed"] = model_registry.load_error() is not None
+                    gestures = None
+                else:
+                    predictions = model.predict(extract_features(landmarks, feature_set))
+                    top_indices = np.argmax(predictions, axis=1)
+                    gestures = [(int(i), float(p[i])) for i, p in zip(top_indices, predictions)]
+            else:
+                numbers = detect_numbers(landmarks, [c.label == "Right" for c in handedness])
+                gestures = [(int(n), 1.0) for n in numbers]
+            record.update(labels=[c.label for c in handedness], scores=[c.score for c in handedness],
+                          landmarks=landmarks.copy(), gestures=gestures)
+            overlay.draw(image, landmarks)
+        record["detect_ms"] = (time.perf_counter() - start) * 1000
+        result_queue.put(record)
+
+    hands.close()
+    del image, slots
+    shm.close()
+
+class FrameBus:
+    """與 Pipeline 相同的 start / stop / get_result / stage_stats 介面，
+    也提供 VideoSourceManager 的 switch / stats / release，App 可以直接替換使用
+    """
+    def __init__(self, hand_detection=None, get_mode=lambda: False, sources=video_sources, detectors=2,
+                 slots=None, frame_size=(640, 480), replay=None, draw=None):
+        """
+        hand_detection: detector_backend="remote" 的 HandDetection (平滑與通知)，只用 poll / release_slot 時可為 None
+        get_mode:       回傳目前是否為手勢模式的函數
+        slots:          共享記憶體格子數，預設為偵測程序數 × 2 + 3
+        replay:         影片路徑 (效能測試用，取代攝影機)
+        draw:           偵測程序是否在格子上畫關鍵點，None 表示依設定檔 draw_landmarks 決定
+        """
+        self.hand_detection = hand_detection
+        self.get_mode = get_mode
+        self.sources = sources
+        self.detectors = detectors
+        self.num_slots = slots or detectors * 2 + 3
+        width, height = frame_size
+        self.shape = (self.num_slots, height, width, 3)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self.slots = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+        self.free_slots = mp_proc.Queue()
+        for slot in range(self.num_slots):
+            self.free_slots.put(slot)
+        self.frame_queue = mp_proc.Queue()
+        self.result_queue = mp_proc.Queue()
+        self.stop_event = mp_proc.Event()
+        self.mode = mp_proc.Value("b", False)
+        self.source_index = mp_proc.Value("i", 0)
+        self.captured = mp_proc.Value("q", 0)
+        self.dropped = mp_proc.Value("q", 0)
+        self.latency = mp_proc.Value("d", 0.0)  # 擷取程序讀取影像的耗時 (毫秒)
+
+        # 只有一個偵測程序時影像依序送達，可以使用 Mediapipe 的追蹤模式
+        static_image_mode = detectors > 1
+        feature_set = get_setting("feature_set", "xy")
+        draw = get_setting("draw_landmarks", True) if draw is None else draw
+        self.processes = [mp_proc.Process(target=capture_main, name="bus-capture", daemon=True,
+                                          args=(self.shm.name, self.shape, sources, self.source_index, self.free_slots,
+                                                self.frame_queue, self.stop_event, self.captured, self.dropped, self.latency,
+                                                replay))]
+        self.processes += [mp_proc.Process(target=detector_main, name=f"bus-detector-{i}", daemon=True,
+                                           args=(self.shm.name, self.shape, self.frame_queue, self.result_queue,
+                                                 self.mode, self.stop_event, static_image_mode, feature_set, draw))
+                           for i in range(detectors)]
+        self.shown_slot = None  # 目前顯示中的格子 (下一次取得結果時才歸還)
+        self.last_seq = -1
+        self.received = 0
+        self.superseded = 0  # 同一次取得結果時被較新結果取代 (沒有顯示) 的張數
+        self.stats = {"detect": StageStats(), "render": StageStats()}
+        self.capture_fps = 0.0
+        self.last_captured = (time.perf_counter(), 0)  # 上一次計算擷取 FPS 時的 (時間, 張數)
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+
+    def poll(self, timeout=0):
+        """取出一筆偵測紀錄 (格子仍屬於呼叫者，用完要 release_slot)，逾時回傳 None"""
+        try:
+            record = self.result_queue.get(timeout=timeout) if timeout else self.result_queue.get_nowait()
+        except queue.Empty:
+            return None
+        self.received += 1
+        self.stats["detect"].tick()
+        return record
+
+    def release_slot(self, slot):
+        self.free_slots.put(slot)
+
+    def get_result(self):
+        """(Tk 主執行緒) 取出最新結果 (左手文字, 右手文字, 畫好關鍵點的 RGB 影像)，沒有新結果時回傳 None
+
+        多個偵測程序的結果可能不照順序到達，比目前顯示的影像還舊的直接丟掉。
+        """
+        self.mode.value = bool(self.get_mode())
+        latest = None
+        while True:
+            record = self.poll()
+            if record is None:
+                break
+            if record["seq"] <= self.last_seq or (latest is not None and record["seq"] < latest["seq"]):
+                self.release_slot(record["slot"])
+                self.superseded += 1
+                continue
+            if latest is not None:
+                self.release_slot(latest["slot"])
+                self.superseded += 1
+            latest = record
+        if latest is None:
+            return None
+
+        if self.shown_slot is not None:
+            self.release_slot(self.shown_slot)  # 上一張已經畫到 Canvas 上了
+        self.shown_slot, self.last_seq = latest["slot"], latest["seq"]
+        self.stats["render"].tick()
+
+        handedness = [SimpleNamespace(label=label, score=score) for label, score in zip(latest["labels"], latest["scores"])]
+        hand_results = self.hand_detection.apply_results(handedness, latest["landmarks"], latest["gestures"],
+                                                         latest["mode"], latest["model_failed"])
+        left_result, right_result = "未偵測", "未偵測"
+        for hand in hand_results:
+            if hand["hand"] == "Left":
+                left_result = hand["text"]
+            elif hand["hand"] == "Right":
+                right_result = hand["text"]
+        return left_result, right_result, self.slots[latest["slot"]]
+
+    def stage_stats(self):
+        """各段的 FPS 與佇列深度 (capture 為等待偵測的張數，detect 為等待顯示的張數，render 為沒被顯示就被取代的張數)"""
+        now, captured = time.perf_counter(), self.captured.value
+        last_time, last_captured = self.last_captured
+        if now - last_time >= 0.5:
+            self.capture_fps = (captured - last_captured) / (now - last_time)
+            self.last_captured = (now, captured)
+        pending = queue_size(self.result_queue)
+        return {
+            "capture": {"fps": self.capture_fps,          "queue": queue_size(self.frame_queue)},
+            "detect":  {"fps": self.stats["detect"].fps,  "queue": pending},
+            "render":  {"fps": self.stats["render"].fps,  "dropped": self.superseded},
+        }
+
+    def switch(self, index=None):
+        """切換擷取程序使用的來源 (預設為下一個)"""
+        self.source_index.value = (self.source_index.value + 1) % len(self.sources) if index is None else index
+
+    def stats(self):
+        """與 VideoSourceManager.stats 相同格式 (延遲由擷取程序寫入共享變數)"""
+        return {self.sources[self.source_index.value]: {"connected": self.captured.value > 0,
+                                                        "latency_ms": self.latency.value,
+                                                        "dropped": self.dropped.value}}
+
+    def stop(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+
+    def release(self):
+        """停止所有程序並釋放共享記憶體"""
+        self.stop()
+        del self.slots
+        self.shm.close()
+        self.shm.unlink()
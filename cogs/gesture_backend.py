@@ -0,0 +1,116 @@
+"""手勢模型推論後端
+
+- keras : 直接使用 gesture_model.h5 (需要 TensorFlow)
+- numpy : 使用匯出的 gesture_model.npz，以矩陣乘法計算前向傳播
+- tflite: 使用匯出的 gesture_model.tflite 與 TFLite 直譯器
+
+npz / tflite 檔案由 gesture_model/export_gesture_model.py 產生；
+int8 量化與剪枝後的版本由 gesture_model/compress_gesture_model.py 產生 (以設定檔 gesture_model_path 指定)。
+"""
+import numpy as np
+
+MODEL_PATHS = {
+    "keras":  "gesture_model/gesture_model.h5",
+    "numpy":  "gesture_model/gesture_model.npz",
+    "tflite": "gesture_model/gesture_model.tflite",
+}
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+ACTIVATIONS = {
+    "linear":  lambda x: x,
+    "relu":    lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh":    np.tanh,
+    "softmax": _softmax,
+}
+
+class KerasBackend:
+    """以 tf.keras 的 predict 推論 (原本的做法)"""
+    def __init__(self, model_path=MODEL_PATHS["keras"]):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+
+    def predict(self, data):
+        return self.model.predict(data)
+
+class NumpyBackend:
+    """以 NumPy 矩陣乘法計算 Dense 層的前向傳播"""
+    def __init__(self, model_path=MODEL_PATHS["numpy"]):
+        weights = np.load(model_path)
+        self.layers = [(weights[f"W{i}"], weights[f"b{i}"], ACTIVATIONS[str(weights[f"act{i}"])])
+                       for i in range(int(weights["num_layers"]))]
+
+    def predict(self, data):
+        x = np.asarray(data, dtype=np.float32)
+        for W, b, activation in self.layers:
+            x = activation(x @ W + b)
+        return x
+
+class TFLiteBackend:
+    """以 TFLite 直譯器推論 (優先使用 tflite_runtime，沒有時改用 TensorFlow)，支援 int8 量化模型"""
+    def __init__(self, model_path=MODEL_PATHS["tflite"]):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self.input_index = input_details["index"]
+        self.output_index = output_details["index"]
+        self.batch_size = input_details["shape"][0]
+        # 量化模型的輸入 / 輸出為整數，需要以 scale / zero_point 轉換
+        self.input_dtype = input_details["dtype"]
+        self.input_quant = input_details["quantization"]
+        self.output_quant = output_details["quantization"]
+
+    def predict(self, data):
+        data = np.asarray(data, dtype=np.float32)
+        if self.input_dtype != np.float32:
+            scale, zero_point = self.input_quant
+            info = np.iinfo(self.input_dtype)
+            data = np.clip(np.round(data / scale + zero_point), info.min, info.max).astype(self.input_dtype)
+        if data.shape[0] != self.batch_size:
+            # 手的數量改變時才重新配置輸入大小
+            self.interpreter.resize_tensor_input(self.input_index, data.shape)
+            self.interpreter.allocate_tensors()
+            self.batch_size = data.shape[0]
+        self.interpreter.set_tensor(self.input_index, data)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output_index)
+        if output.dtype != np.float32:
+            scale, zero_point = self.output_quant
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+BACKENDS = {
+    "keras":  KerasBackend,
+    "numpy":  NumpyBackend,
+    "tflite": TFLiteBackend,
+}
+
+def load_backend(name="keras", model_path=None):
+    """依名稱建立推論後端"""
+    if name not in BACKENDS:
+        raise ValueError(f"未知的推論後端: {name} (可用: {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_path or MODEL_PATHS[name])
+
+def export_numpy_weights(model, npz_path, compressed=False):
+    """將 Keras 模型中 Dense 層的權重與激活函數匯出成 npz (Dropout 推論時不作用，直接略過)
+
+    compressed=True 時以 zip 壓縮存檔 (剪枝後大量為 0 的權重會小很多)
+    """
+    arrays = {}
+    dense_layers = [layer for layer in model.layers if layer.get_weights()]
+    for i, layer in enumerate(dense_layers):
+        W, b = layer.get_weights()
+        arrays[f"W{i}"] = W.astype(np.float32)
+        arrays[f"b{i}"] = b.astype(np.float32)
+        arrays[f"act{i}"] = np.array(layer.get_config()["activation"])
+    arrays["num_layers"] = np.array(len(dense_layers))
+    (np.savez_compressed if compressed else np.savez)(npz_path, **arrays)
@@ -0,0 +1,64 @@
+"""每隻手的時間平滑：多數決 + 信心度遲滯，只有穩定結果改變時才需要更新畫面
+
+設定檔 smoothing 區塊 (設為 false 則關閉，每幀直接使用當下的結果)：
+    "smoothing": {"window": 5, "enter_threshold": 0.7, "exit_threshold": 0.6, "motion_threshold": 0.004}
+"""
+from collections import Counter, deque
+import numpy as np
+from cogs.config import get_setting
+
+class HandSmoother:
+    def __init__(self, window=5, enter_threshold=0.7, exit_threshold=0.6, motion_threshold=0.004):
+        """
+        window:           多數決使用最近幾次的結果
+        enter_threshold:  切換到新結果所需的平均信心度
+        exit_threshold:   維持目前結果所需的平均信心度 (低於此值變成「不確定」)
+        motion_threshold: 關鍵點移動量 (正規化座標) 小於此值時沿用上一次的分類結果
+        """
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.motion_threshold = motion_threshold
+        self.history = deque(maxlen=window)
+        self.last_landmarks = np.zeros((21, 3), dtype=np.float32)  # 上一次實際推論時的關鍵點
+        self.reset()
+
+    @classmethod
+    def from_settings(cls):
+        settings = get_setting("smoothing", {})
+        if settings is False:
+            return cls(window=1, exit_threshold=0.7, motion_threshold=0)
+        return cls(**settings)
+
+    def reset(self):
+        self.history.clear()
+        self.stable = None            # 目前穩定的結果 (None 表示不確定)
+        self.stable_confidence = 0.0  # 變成穩定結果當下的平均信心度
+        self.last_raw = None          # 上一次推論的 (結果, 信心度)
+
+    def is_still(self, landmarks):
+        """與上一次推論時相比關鍵點幾乎沒動，可以直接沿用 last_raw"""
+        return (self.last_raw is not None and
+                np.abs(landmarks - self.last_landmarks).max() < self.motion_threshold)
+
+    def remember(self, landmarks, value, confidence):
+        """記下這次實際推論的關鍵點與結果"""
+        self.last_landmarks[:] = landmarks
+        self.last_raw = (value, confidence)
+
+    def update(self, value, confidence):
+        """加入一次分類結果，回傳穩定結果是否改變"""
+        self.history.append((value, confidence))
+        candidate, count = Counter(v for v, _ in self.history).most_common(1)[0]
+        candidate_confidence = np.mean([c for v, c in self.history if v == candidate])
+
+        previous = self.stable
+        if candidate == self.stable:
+            if candidate_confidence < self.exit_threshold:
+                self.stable = None
+        elif count * 2 > len(self.history) and candidate_confidence >= self.enter_threshold:
+            self.stable, self.stable_confidence = candidate, float(candidate_confidence)
+        elif self.stable is not None:
+            stable_confidence = [c for v, c in self.history if v == self.stable]
+            if not stable_confidence or np.mean(stable_confidence) < self.exit_threshold:
+                self.stable = None
+        return self.stable != previous
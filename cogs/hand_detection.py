@@ -1,97 +1,328 @@
-import cv2, json
-import mediapipe as mp
+import cv2, json, time
+from types import SimpleNamespace
 import numpy as np
-from tensorflow.keras.models import load_model
+from cogs import model_registry
+from cogs.adaptive_detection import AdaptiveDetector
+from cogs.config import get_setting
+from cogs.detector_backend import create_hands
+from cogs.landmark_features import landmarks_to_array, extract_features, detect_numbers
+from cogs.gesture_smoothing import HandSmoother
+from cogs.motion_features import MotionClassifier, MotionHistory
+from cogs.overlay import OverlayRenderer
+from cogs.profiler import profiler
 
-model = load_model("gesture_model/gesture_model.h5")
-gesture_labels = ["victory ✌️", "fist ✊", "ok 👌", "middle 🖕", "thumbs_up 👍", "heart 🫰"]
+def load_gesture_labels():
+    """讀取手勢標籤"""
+    with open(".vscode/gesture_labels.json", "r", encoding='utf8') as f:
+        return json.load(f)
+
+def unique_handedness(multi_handedness):
+    """每隻手的分類 (label / score)；Mediapipe 偶爾會把兩隻手都標成同一邊，
+    此時把信心度較低的那隻改成另一邊，讓兩隻手各自使用自己的平滑與動態手勢狀態
+    """
+    handedness = [handLabel.classification[0] for handLabel in multi_handedness]
+    if len(handedness) == 2 and handedness[0].label == handedness[1].label:
+        weaker = 0 if handedness[0].score < handedness[1].score else 1
+        other = "Right" if handedness[weaker].label == "Left" else "Left"
+        handedness[weaker] = SimpleNamespace(label=other, score=handedness[weaker].score)
+    return handedness
+
+def loading_text(failed=False):
+    """模型還沒載入時顯示的文字；載入失敗時不再顯示「載入中」"""
+    return "模型載入失敗 ❌" if failed or model_registry.load_error() is not None else "模型載入中 ⏳"
+
+def format_gesture(gesture_labels, top_index, confidence):
+    """將手勢索引與信心度轉為「手勢 (信心度)」文字"""
+    if confidence >= 0.7:
+        return f"{gesture_labels[top_index]} ({confidence*100:.1f}%)"
+    else:
+        return "不確定 🤔"
+
+def smoothed_result(smoother, classification, is_advanced_mode, gesture_labels):
+    """依平滑後的穩定結果產生一隻手的結果 dict"""
+    if not is_advanced_mode:
+        value = smoother.stable
+        hand = {"value": value, "confidence": classification.score,
+                "text": str(value) if value is not None else "不確定 🤔"}
+    elif smoother.stable is None:
+        hand = {"value": None, "confidence": smoother.stable_confidence, "text": "不確定 🤔"}
+    else:
+        hand = {"value": gesture_labels[smoother.stable], "confidence": smoother.stable_confidence,
+                "text": format_gesture(gesture_labels, smoother.stable, smoother.stable_confidence)}
+    hand["hand"] = classification.label  # Left or Right
+    return hand
 
 class HandDetection:
-    def __init__(self):
+    def __init__(self, detector_backend=None, draw=None, source=None, classifier=None):
+        """
+        draw:       是否在 process_frame 的影像上畫關鍵點，None 表示依設定檔 draw_landmarks 決定
+        source:     來源編號 (多攝影機)，會加進通知事件的 "source" 欄位
+        classifier: 取代 classify_gestures 的手勢推論函數 (例如多來源合併推論的 ClassifierBatcher.classify)
+        """
         # 初始化 Mediapipe 和模型
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=False, max_num_hands=2,
-                                         min_detection_confidence=0.7, min_tracking_confidence=0.5)
-        self.mp_draw = mp.solutions.drawing_utils
-        self.model = load_model("gesture_model/gesture_model.h5")
-        with open(".vscode/gesture_labels.json", "r", encoding='utf8') as f:
-            self.gesture_labels = json.load(f)
+        if detector_backend == "remote":
+            # 由其他程序偵測 (見 frame_bus)，這裡只負責平滑與通知
+            self.hands, self.detector = None, None
+        else:
+            self.hands = create_hands(detector_backend)  # 預設由設定檔 detector_backend 決定
+            self.detector = AdaptiveDetector.from_settings(self.hands)  # 縮圖 / 跳幀 / ROI 設定
+        self.landmark_buffer = np.empty((2, 21, 3), dtype=np.float32)  # 預先配置的關鍵點陣列 (最多兩隻手)
+        self.feature_set = get_setting("feature_set", "xy")  # 需與訓練模型時使用的特徵組合相同
+        self.smoothers = {"Left": HandSmoother.from_settings(), "Right": HandSmoother.from_settings()}
+        self.smoothing_mode = None  # 平滑狀態對應的模式，切換模式時重設
+        self.listeners = []  # 穩定結果改變時呼叫的函數 (參數為事件 dict)
+        self.source = source
+        self.classifier = classifier or self.classify_gestures
+        self.hands_present = False  # 上一次偵測是否有手
+        self.last_results = None    # 上一次的 Mediapipe 結果
+        self.last_landmarks = None  # 上一次的關鍵點 (手數, 21, 3)，沒有手時為 None
+        self.overlay = OverlayRenderer.from_settings(draw)
+        self.gesture_labels = load_gesture_labels()
+        # 動態手勢 (手勢模式才啟用，沒有訓練好的模型時略過)
+        self.motion = MotionClassifier.from_settings()
+        self.histories = {label: MotionHistory(self.motion.window) for label in self.smoothers} if self.motion else {}
+        self.last_push = dict.fromkeys(self.smoothers)   # 各手上一次加入歷史的時間
+        self.motion_text = dict.fromkeys(self.smoothers)  # 各手最近辨識到的動態手勢 (名稱, 顯示到何時)
+
+    @property
+    def model(self):
+        """共用的手勢模型 (推論後端由設定檔 inference_backend 決定)，尚未載入時為 None"""
+        return model_registry.peek_model()
+
+    def load_model_async(self, retry=False):
+        """在背景執行緒載入手勢模型 (retry=True 時重新嘗試之前失敗的載入)"""
+        model_registry.load_model_async(retry=retry)
+
+    def reset(self):
+        """清除追蹤狀態 (換到另一段影片或串流時使用)"""
+        if self.hands is not None:
+            self.hands.reset()
+            self.detector.close()
+            self.detector = AdaptiveDetector.from_settings(self.hands)
+        for smoother in self.smoothers.values():
+            smoother.reset()
+        self._reset_motion()
+
+    def add_listener(self, listener):
+        """註冊穩定結果改變時的通知函數 (在呼叫 detect 的執行緒中執行)"""
+        self.listeners.append(listener)
 
     def process_frame(self, frame, is_advanced_mode):
         """處理影像並進行手勢辨識"""
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(image)
+        with profiler.measure("color"):
+            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results, hand_results = self.detect(image, is_advanced_mode)
 
         left_result, right_result = "未偵測", "未偵測"
+        for hand in hand_results:
+            if hand["hand"] == "Left":
+                left_result = hand["text"]
+            elif hand["hand"] == "Right":
+                right_result = hand["text"]
+
+        if self.overlay.enabled and self.last_landmarks is not None:
+            with profiler.measure("drawing"):
+                self.overlay.draw(image, self.last_landmarks)
+
+        return left_result, right_result, image
+
+    def detect(self, image, is_advanced_mode):
+        """偵測 RGB 影像中的手並辨識 (不畫圖)
+
+        回傳 (Mediapipe results, 每隻手的結果)，每隻手的結果為
+        {"hand": Left/Right, "value": 數字或手勢名稱 (不確定時為 None), "confidence": 信心度,
+         "text": 顯示文字, "changed": 穩定結果是否改變}
+        """
+        with profiler.measure("mediapipe"):
+            results = self.detector.process(image)
+        # 跳幀 (AdaptiveDetector) 與非同步後端 (TasksHands) 沒有新結果時會回傳同一個物件
+        fresh = results is not self.last_results
+        self.hands_present = bool(results.multi_hand_landmarks)
+        self.last_results = results
+        self._sync_mode(is_advanced_mode)
+
+        handedness, landmarks = [], None
+        self.last_landmarks = None
         if results.multi_hand_landmarks and results.multi_handedness:
-            for handLms, handLabel in zip(results.multi_hand_landmarks, results.multi_handedness):
-                label = handLabel.classification[0].label  # Left or Right
+            landmarks = landmarks_to_array(results.multi_hand_landmarks, out=self.landmark_buffer)
+            self.last_landmarks = landmarks
+            handedness = unique_handedness(results.multi_handedness)
+            smoothers = [self.smoothers[c.label] for c in handedness]
+            # 關鍵點幾乎沒動的手直接沿用上一次的分類結果，其他手才需要推論
+            moved = [i for i, smoother in enumerate(smoothers) if not smoother.is_still(landmarks[i])]
+            with profiler.measure("classify"):
                 if is_advanced_mode:
-                    result = self.predict_gesture(handLms)
+                    # 需要推論的手一起組成 (N, 42) 陣列，只做一次模型推論
+                    gestures = self.classifier(extract_features(landmarks[moved], self.feature_set)) if moved else []
                 else:
-                    result = self.detect_number(handLms, label == "Right")
+                    numbers = detect_numbers(landmarks[moved], [handedness[i].label == "Right" for i in moved])
+                    gestures = [(int(n), 1.0) for n in numbers]
+            if gestures is None:
+                # 模型還在背景載入中，先不阻塞畫面
+                return results, self._loading_results(handedness)
+            for i, raw in zip(moved, gestures):
+                smoothers[i].remember(landmarks[i], *raw)
+        hand_results = self._update_smoothers(handedness, is_advanced_mode)
+        self._update_motion(landmarks, hand_results, fresh)
+        return results, hand_results
 
-                if label == "Left":
-                    left_result = result
-                elif label == "Right":
-                    right_result = result
+    def detect_raw(self, image, is_advanced_mode):
+        """(離線處理) 對整張 RGB 影像偵測並辨識，不經過縮圖 / 跳幀 / ROI、平滑與靜止沿用
 
-                self.mp_draw.draw_landmarks(image, handLms, self.mp_hands.HAND_CONNECTIONS)
+        回傳每隻手的 {"hand", "value", "confidence"}；手勢模式的 value 為模型判斷的手勢名稱，
+        數字模式的 confidence 為左右手判斷的信心度。模型需先載入 (尚未載入時拋出 ValueError)
+        """
+        with profiler.measure("mediapipe"):
+            results = self.hands.process(image)
+        if not (results.multi_hand_landmarks and results.multi_handedness):
+            return []
+        landmarks = landmarks_to_array(results.multi_hand_landmarks, out=self.landmark_buffer)
+        handedness = unique_handedness(results.multi_handedness)
+        if is_advanced_mode:
+            gestures = self.classifier(extract_features(landmarks, self.feature_set))
+            if gestures is None:
+                raise ValueError("❌ 手勢模型尚未載入")
+            return [{"hand": c.label, "value": self.gesture_labels[index], "confidence": confidence}
+                    for c, (index, confidence) in zip(handedness, gestures)]
+        numbers = detect_numbers(landmarks, [c.label == "Right" for c in handedness])
+        return [{"hand": c.label, "value": int(n), "confidence": c.score} for c, n in zip(handedness, numbers)]
 
-        return left_result, right_result, image
+    def apply_results(self, handedness, landmarks, gestures, is_advanced_mode, model_failed=False):
+        """以其他程序算好的每隻手分類結果 (手勢索引或數字, 信心度) 更新平滑狀態，回傳每隻手的結果
 
-    
-    def detect_number(self, hand_landmarks, is_right):
-        """計算手比的數字 (前/後翻 + 左右手正確的拇指判斷)"""
-        count = 0
-        # 1. 食指～小指伸直判斷
-        finger_tips = [8, 12, 16, 20]
-        finger_pips = [6, 10, 14, 18]
-        for tip, pip in zip(finger_tips, finger_pips):
-            if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[pip].y:
-                count += 1
-
-        # 2. 掌面朝向偵測 (cross product)
-        w = hand_landmarks.landmark[0]   # Wrist
-        i = hand_landmarks.landmark[5]   # Index_MCP
-        p = hand_landmarks.landmark[17]  # Pinky_MCP
-        v1 = np.array([ i.x - w.x,  i.y - w.y ])
-        v2 = np.array([ p.x - w.x,  p.y - w.y ])
-        cross_z = v1[0]*v2[1] - v1[1]*v2[0]
-
-        # 右手、左手分別取不同條件
-        if is_right:
-            palm_facing = (cross_z > 0)   # 右手：cross_z>0 表示掌面朝前
-        else:
-            palm_facing = (cross_z < 0)   # 左手：cross_z<0 表示掌面朝前
+        handedness 為有 label / score 屬性的物件列表；gestures 為 None 表示模型還沒載入，
+        model_failed 表示該程序載入模型失敗 (見 frame_bus)
+        """
+        self._sync_mode(is_advanced_mode)
+        if gestures is None:
+            return self._loading_results(handedness, model_failed)
+        for classification, hand_landmarks, raw in zip(handedness, landmarks, gestures):
+            self.smoothers[classification.label].remember(hand_landmarks, *raw)
+        hand_results = self._update_smoothers(handedness, is_advanced_mode)
+        self._update_motion(landmarks, hand_results)
+        return hand_results
 
-        # 3. 拇指伸出判斷
-        thumb_tip = hand_landmarks.landmark[4]
-        thumb_ip  = hand_landmarks.landmark[3]
+    def _sync_mode(self, is_advanced_mode):
+        """切換模式時重設平滑狀態"""
+        if self.smoothing_mode != is_advanced_mode:
+            self.smoothing_mode = is_advanced_mode
+            for smoother in self.smoothers.values():
+                smoother.reset()
+            self._reset_motion()
 
-        if is_right:
-            # 右手：掌面朝前時 tip.x < ip.x；掌背朝前時反向
-            if (palm_facing     and thumb_tip.x < thumb_ip.x) \
-            or (not palm_facing and thumb_tip.x > thumb_ip.x):
-                count += 1
-        else:
-            # 左手：掌面朝前時 tip.x > ip.x；掌背朝前時反向
-            if (palm_facing     and thumb_tip.x > thumb_ip.x) \
-            or (not palm_facing and thumb_tip.x < thumb_ip.x):
-                count += 1
+    def _reset_motion(self):
+        for label, history in self.histories.items():
+            history.reset()
+            self.last_push[label] = None
+            self.motion_text[label] = None
+
+    def _update_motion(self, landmarks, hand_results, fresh=True):
+        """(手勢模式) 把各手的關鍵點加入動態手勢歷史，視窗填滿的手一起推論；
+        辨識到動態手勢時通知 listener (mode 為 "motion")，並清空該手的歷史，同一個動作不會重複觸發
+
+        fresh 為 False 表示偵測器沿用上一次的結果：不加入歷史 (重複的幀速度為 0，訓練資料中不會出現)，
+        下一個新結果的 dt 會涵蓋中間略過的時間
+        """
+        if not self.motion or not self.smoothing_mode:
+            return
+        now = time.perf_counter()
+        ready = []
+        seen = set()
+        for i, hand in enumerate(hand_results if fresh else ()):
+            label = hand["hand"]
+            seen.add(label)
+            history = self.histories[label]
+            last = self.last_push[label]
+            history.push(landmarks[i], now - last if last is not None else 1 / 30)
+            self.last_push[label] = now
+            if history.ready:
+                ready.append((hand, history))
+        for label, history in self.histories.items():
+            if fresh and label not in seen and history.count:
+                history.reset()  # 手離開畫面，軌跡中斷
+                self.last_push[label] = None
+
+        if ready:
+            with profiler.measure("motion"):
+                motions = self.motion.classify([history for _, history in ready])
+            for (hand, history), (name, confidence) in zip(ready, motions):
+                if name is None:
+                    continue
+                history.reset()
+                self.last_push[hand["hand"]] = None
+                self.motion_text[hand["hand"]] = (name, now + 1.0)
+                self._emit({"time": time.time(), "mode": "motion", "hand": hand["hand"], "value": name,
+                            "confidence": confidence})
+
+        # 最近一秒內辨識到的動態手勢附加在文字後面
+        for hand in hand_results:
+            shown = self.motion_text[hand["hand"]]
+            if shown is not None and now < shown[1]:
+                hand["text"] = f"{hand['text']} · {shown[0]}"
+
+    def _loading_results(self, handedness, failed=False):
+        text = loading_text(failed)
+        return [{"hand": c.label, "value": None, "confidence": 0.0, "text": text, "changed": False}
+                for c in handedness]
+
+    def _update_smoothers(self, handedness, is_advanced_mode):
+        """以各手最近一次的分類結果更新平滑狀態，穩定結果改變時通知 listener"""
+        hand_results = []
+        seen = set()
+        for classification in handedness:
+            smoother = self.smoothers[classification.label]
+            seen.add(classification.label)
+            changed = smoother.update(*smoother.last_raw)
+            hand = smoothed_result(smoother, classification, is_advanced_mode, self.gesture_labels)
+            hand["changed"] = changed
+            hand_results.append(hand)
+            if changed:
+                self._notify(hand)
 
-        return count
+        # 離開畫面的手重設狀態，並通知結果變為「未偵測」
+        for label, smoother in self.smoothers.items():
+            if label not in seen and (smoother.last_raw is not None):
+                was_stable = smoother.stable is not None
+                smoother.reset()
+                if was_stable:
+                    self._notify({"hand": label, "value": None, "confidence": 0.0, "text": "未偵測", "changed": True})
+        return hand_results
+
+    def _notify(self, hand):
+        self._emit({"time": time.time(), "mode": "gesture" if self.smoothing_mode else "number",
+                    "hand": hand["hand"], "value": hand["value"], "confidence": hand["confidence"]})
+
+    def _emit(self, event):
+        if self.source is not None:
+            event["source"] = self.source
+        for listener in self.listeners:
+            listener(event)
+
+    def detect_number(self, hand_landmarks, is_right):
+        """計算單一手比的數字"""
+        return int(detect_numbers(landmarks_to_array([hand_landmarks]), [is_right])[0])
 
     def predict_gesture(self, hand_landmarks):
-        """使用模型預測手勢"""
-        landmarks = []
-        for lm in hand_landmarks.landmark:
-            landmarks.extend([lm.x, lm.y])
-        data = np.array(landmarks).reshape(1, 42)
-        prediction = self.model.predict(data)[0]
-        top_index = np.argmax(prediction)
-        confidence = prediction[top_index]
-        if confidence >= 0.7:
-            return f"{self.gesture_labels[top_index]} ({confidence*100:.1f}%)"
-        else:
-            return "不確定 🤔"
\ No newline at end of file
+        """使用模型預測單一手的手勢"""
+        return self.predict_gestures([hand_landmarks])[0]
+
+    def predict_gestures(self, hand_landmarks_list):
+        """一次預測多隻手的手勢 (批次推論)，回傳顯示文字"""
+        gestures = self.classify_gestures(extract_features(landmarks_to_array(hand_landmarks_list), self.feature_set))
+        if gestures is None:
+            return [loading_text()] * len(hand_landmarks_list)
+        return [self.format_gesture(top_index, confidence) for top_index, confidence in gestures]
+
+    def classify_gestures(self, data):
+        """對 (N, 特徵數) 的模型輸入做一次推論，回傳每隻手的 (手勢索引, 信心度)；模型尚未載入 (或載入失敗) 時回傳 None"""
+        model = self.model
+        if model is None:
+            self.load_model_async()
+            return None
+        predictions = model.predict(data)
+        top_indices = np.argmax(predictions, axis=1)
+        return [(int(i), float(prediction[i])) for i, prediction in zip(top_indices, predictions)]
+
+    def format_gesture(self, top_index, confidence):
+        """將手勢索引與信心度轉為「手勢 (信心度)」文字"""
+        return format_gesture(self.gesture_labels, top_index, confidence)
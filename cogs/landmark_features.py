@@ -0,0 +1,76 @@
+"""手部關鍵點特徵：訓練、資料收集與即時辨識共用，確保特徵排列方式一致
+
+- landmarks_to_array: Mediapipe 結果 → (手數, 21, 3) float32 陣列
+- model_input:        關鍵點陣列 → 模型輸入 (手數, 42)，排列為 x0, y0, x1, y1, ...
+- extract_features:   依特徵組合 (FEATURE_SETS) 產生模型輸入，預設與 model_input 相同
+- detect_numbers:     一次計算所有手比的數字
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+FEATURE_SIZE = NUM_LANDMARKS * 2  # 模型輸入只用 (x, y)
+
+FINGER_TIPS = [8, 12, 16, 20]  # 食指～小指指尖
+FINGER_PIPS = [6, 10, 14, 18]  # 食指～小指第二關節
+
+def landmarks_to_array(multi_hand_landmarks, out=None):
+    """將所有手的關鍵點一次轉成 (手數, 21, 3) 的 float32 陣列
+
+    out 為預先配置的緩衝區 (最多手數, 21, 3)，回傳的是其中前 N 隻手的 view，
+    下一次呼叫會覆寫內容，需要保留時請自行 copy。
+    """
+    hands = multi_hand_landmarks or []
+    n = len(hands)
+    if out is None or len(out) < n:
+        out = np.empty((n, NUM_LANDMARKS, 3), dtype=np.float32)
+    if n:
+        out[:n] = np.fromiter((v for hand in hands for lm in hand.landmark for v in (lm.x, lm.y, lm.z)),
+                              dtype=np.float32, count=n * NUM_LANDMARKS * 3).reshape(n, NUM_LANDMARKS, 3)
+    return out[:n]
+
+def model_input(landmarks):
+    """(手數, 21, 3) → 模型輸入 (手數, 42)"""
+    return np.ascontiguousarray(landmarks[:, :, :2]).reshape(-1, FEATURE_SIZE)
+
+def wrist_relative(landmarks):
+    """以手腕為原點、手腕到中指根部的距離為單位的 (x, y)，不受手在畫面中的位置與遠近影響"""
+    xy = landmarks[:, :, :2] - landmarks[:, :1, :2]
+    scale = np.linalg.norm(xy[:, 9], axis=1)
+    return (xy / np.maximum(scale, 1e-6)[:, None, None]).reshape(-1, FEATURE_SIZE)
+
+# 模型可使用的特徵組合 (名稱 → 轉換函數)，設定檔 feature_set 需與訓練時相同
+FEATURE_SETS = {
+    "xy":       model_input,
+    "xyz":      lambda landmarks: np.ascontiguousarray(landmarks).reshape(-1, NUM_LANDMARKS * 3),
+    "xy_wrist": wrist_relative,
+}
+
+def extract_features(landmarks, feature_set="xy"):
+    """(手數, 21, 3) → 指定特徵組合的模型輸入"""
+    return FEATURE_SETS[feature_set](landmarks).astype(np.float32, copy=False)
+
+def detect_numbers(landmarks, is_right):
+    """計算每隻手比的數字 (前/後翻 + 左右手正確的拇指判斷)
+
+    landmarks: (手數, 21, 3)；is_right: (手數,) bool
+    """
+    is_right = np.asarray(is_right, dtype=bool)
+
+    # 1. 食指～小指伸直判斷 (指尖高於第二關節)
+    count = (landmarks[:, FINGER_TIPS, 1] < landmarks[:, FINGER_PIPS, 1]).sum(axis=1)
+
+    # 2. 掌面朝向偵測 (Wrist→Index_MCP 與 Wrist→Pinky_MCP 的外積)
+    v1 = landmarks[:, 5, :2] - landmarks[:, 0, :2]
+    v2 = landmarks[:, 17, :2] - landmarks[:, 0, :2]
+    cross_z = v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]
+    # 右手：cross_z>0 表示掌面朝前；左手：cross_z<0 表示掌面朝前
+    palm_facing = np.where(is_right, cross_z > 0, cross_z < 0)
+
+    # 3. 拇指伸出判斷
+    tip_left = landmarks[:, 4, 0] < landmarks[:, 3, 0]    # thumb_tip.x < thumb_ip.x
+    tip_right = landmarks[:, 4, 0] > landmarks[:, 3, 0]   # thumb_tip.x > thumb_ip.x
+    # 右手：掌面朝前時 tip.x < ip.x；掌背朝前時反向 / 左手則相反
+    thumb = np.where(is_right, np.where(palm_facing, tip_left, tip_right),
+                               np.where(palm_facing, tip_right, tip_left))
+
+    return count + thumb
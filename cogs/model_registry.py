@@ -0,0 +1,55 @@
+"""共用的手勢模型註冊表：模型只載入一次，而且等到需要時才載入 (TensorFlow 也延後匯入)"""
+import threading, time
+from cogs.config import get_setting
+from cogs.gesture_backend import load_backend
+
+_lock = threading.Lock()
+_models = {}
+_threads = {}
+_errors = {}  # 背景載入失敗的例外 (失敗後不再自動重試，避免每幀都重新載入)
+
+def _backend_name(name):
+    return name or get_setting("inference_backend", "keras")
+
+def get_model(name=None):
+    """取得共用模型，第一次呼叫時才載入 (會阻塞直到載入完成)"""
+    name = _backend_name(name)
+    with _lock:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = load_backend(name, get_setting("gesture_model_path"))
+            print(f"✅ 已載入手勢模型 ({name})，耗時 {time.perf_counter() - start:.2f} 秒")
+        return _models[name]
+
+def peek_model(name=None):
+    """模型已載入就回傳，否則回傳 None (不會阻塞)"""
+    return _models.get(_backend_name(name))
+
+def load_error(name=None):
+    """背景載入失敗時回傳例外，否則回傳 None"""
+    return _errors.get(_backend_name(name))
+
+def load_model_async(name=None, retry=False):
+    """在背景執行緒載入模型，重複呼叫不會重複載入；已經失敗過時只有 retry=True 才會重新嘗試"""
+    name = _backend_name(name)
+    with _lock:
+        if name in _models or name in _threads:
+            return _threads.get(name)
+        if name in _errors and not retry:
+            return None
+        _errors.pop(name, None)
+
+        def worker():
+            try:
+                get_model(name)
+            except Exception as e:
+                _errors[name] = e
+                print(f"載入手勢模型 {name} 時發生錯誤: {e}")
+            finally:
+                with _lock:
+                    _threads.pop(name, None)
+
+        thread = threading.Thread(target=worker, name=f"load-{name}", daemon=True)
+        _threads[name] = thread
+        thread.start()
+        return thread
@@ -0,0 +1,147 @@
+"""動態手勢 (揮手、滑動、畫圈) 的滑動視窗特徵：訓練與即時辨識共用
+
+每隻手一個 MotionHistory，每幀只計算新的一幀並更新累計值，不必重算整個視窗：
+- 每幀特徵 (FRAME_FEATURES 個)：手掌中心速度 (以手的大小正規化，換算成 1/30 秒的位移) 與 5 個指尖相對手腕的位置
+- 視窗累計值 (AGGREGATES 個)：淨位移 x / y、移動路徑長、轉向量 (相鄰速度的外積和，畫圈時持續同號)、水平方向反轉次數 (揮手)
+  加入新的一幀時加上它的貢獻、同時減掉被擠出視窗那一幀的貢獻
+
+環狀緩衝區每一列同時寫在 i 與 i + window 兩個位置，任何時候「最舊 → 最新」的視窗都是一段連續的 view，
+組成模型輸入時不需要重新排列。模型輸入為 window × FRAME_FEATURES + AGGREGATES 維。
+
+訓練序列以 (幀數, SEQUENCE_POINTS, 3) 儲存：前 21 列為關鍵點，最後一列為 (該幀時間, 0, 0)，
+訓練時以實際的幀間隔計算速度，與即時辨識使用量測到的 dt 相同。
+
+動態手勢模型由 gesture_model/train_gesture_model.py --motion 訓練，以 numpy 後端推論
+(設定檔 motion_model_path 指定模型，標籤檔為同一資料夾的 motion_labels.json)。
+"""
+import json, os
+import numpy as np
+from cogs.config import get_setting
+from cogs.gesture_backend import NumpyBackend
+
+PALM = [0, 5, 9, 13, 17]        # 手腕與四指根部，平均作為手掌中心
+TIPS = [4, 8, 12, 16, 20]       # 五個指尖
+FRAME_FEATURES = 2 + len(TIPS) * 2
+AGGREGATES = 5
+DEFAULT_WINDOW = 16
+FRAME_TIME = 1 / 30             # 速度換算成每 1/30 秒的位移，不受實際幀率影響
+LEAD_FRAMES = 2                 # 訓練序列在視窗前多記錄的幀數，只用來算最舊一幀的速度與轉向 (與即時辨識一致)
+SEQUENCE_POINTS = 22            # 訓練序列每幀 21 個關鍵點 + 1 列時間
+MOTION_MODEL_PATH = "gesture_model/motion_model.npz"
+NO_MOTION = "none"              # 訓練時「沒有動態手勢」的標籤
+
+def motion_input_size(window=DEFAULT_WINDOW):
+    return window * FRAME_FEATURES + AGGREGATES
+
+class MotionHistory:
+    """單一隻手最近 window 幀的特徵"""
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.rows = np.zeros((2 * window, FRAME_FEATURES), dtype=np.float32)  # 每列寫兩次，視窗永遠連續
+        self.contributions = np.zeros((window, AGGREGATES), dtype=np.float32)  # 每幀對累計值的貢獻
+        self.sums = np.zeros(AGGREGATES, dtype=np.float32)
+        self.features = np.zeros(motion_input_size(window), dtype=np.float32)  # 模型輸入 (重複使用)
+        self.reset()
+
+    def reset(self):
+        self.rows[:] = 0
+        self.contributions[:] = 0
+        self.sums[:] = 0
+        self.index = 0         # 下一幀要寫入的位置 (也是目前最舊的一幀)
+        self.count = 0
+        self.last_center = None
+        self.last_velocity = np.zeros(2, dtype=np.float32)
+
+    @property
+    def ready(self):
+        """視窗已經填滿，且最舊一幀的速度與轉向也已算好 (與訓練序列的特徵相同)"""
+        return self.count >= self.window + LEAD_FRAMES
+
+    def push(self, landmarks, dt=FRAME_TIME):
+        """加入一幀 (21, 3) 關鍵點；dt 為與上一幀相隔的秒數"""
+        xy = landmarks[:, :2]
+        center = xy[PALM].mean(axis=0)
+        scale = max(float(np.linalg.norm(xy[9] - xy[0])), 1e-6)  # 手腕到中指根部的距離
+        if self.last_center is None:
+            velocity = np.zeros(2, dtype=np.float32)
+        else:
+            velocity = (center - self.last_center) / scale * (FRAME_TIME / max(dt, 1e-3))
+        speed = float(np.hypot(*velocity))
+        turn = float(self.last_velocity[0] * velocity[1] - self.last_velocity[1] * velocity[0])
+        reversal = float(self.last_velocity[0] * velocity[0] < 0)
+
+        slot = self.index
+        row = self.rows[slot]
+        row[:2] = velocity
+        row[2:] = ((xy[TIPS] - xy[0]) / scale).ravel()
+        self.rows[slot + self.window] = row
+        contribution = (velocity[0], velocity[1], speed, turn, reversal)
+        self.sums += np.asarray(contribution, dtype=np.float32) - self.contributions[slot]
+        self.contributions[slot] = contribution
+
+        self.index = (slot + 1) % self.window
+        self.count += 1
+        self.last_center = center
+        self.last_velocity = velocity
+
+    def model_input(self):
+        """(window × FRAME_FEATURES + AGGREGATES,) 的模型輸入 (下一次呼叫會覆寫內容)"""
+        split = self.window * FRAME_FEATURES
+        self.features[:split] = self.rows[self.index:self.index + self.window].ravel()
+        self.features[split:] = self.sums
+        return self.features
+
+def pack_frame(landmarks, timestamp, out):
+    """把一幀 (21, 3) 關鍵點與時間寫進訓練序列的一列 out (SEQUENCE_POINTS, 3)"""
+    out[:21] = landmarks
+    out[21] = (timestamp, 0, 0)
+
+def sequence_features(sequences):
+    """(筆數, LEAD_FRAMES + window, SEQUENCE_POINTS, 3) 的訓練序列 → (筆數, 輸入維度) 特徵
+
+    以 MotionHistory 逐幀計算 (dt 為記錄時的實際幀間隔)，與即時辨識視窗填滿後的特徵完全相同
+    """
+    window = sequences.shape[1] - LEAD_FRAMES
+    history = MotionHistory(window)
+    out = np.empty((len(sequences), motion_input_size(window)), dtype=np.float32)
+    for i, sequence in enumerate(sequences):
+        history.reset()
+        times = sequence[:, 21, 0].astype(np.float64)
+        for j, frame in enumerate(sequence):
+            history.push(frame[:21], times[j] - times[j - 1] if j else FRAME_TIME)
+        out[i] = history.model_input()
+    return out
+
+class MotionClassifier:
+    """動態手勢模型 (numpy 後端) 與標籤，視窗長度由模型的輸入維度推得"""
+    def __init__(self, model_path=MOTION_MODEL_PATH, threshold=0.8):
+        self.backend = NumpyBackend(model_path)
+        with open(os.path.join(os.path.dirname(model_path), "motion_labels.json"), "r", encoding="utf8") as f:
+            self.labels = json.load(f)
+        self.threshold = threshold
+        input_size = self.backend.layers[0][0].shape[0]
+        self.window = (input_size - AGGREGATES) // FRAME_FEATURES
+        if motion_input_size(self.window) != input_size:
+            raise ValueError(f"❌ 動態手勢模型的輸入維度 {input_size} 與特徵格式不符")
+        self.batch = np.zeros((2, input_size), dtype=np.float32)
+
+    @classmethod
+    def from_settings(cls):
+        """依設定檔建立，模型不存在時回傳 None (只使用靜態手勢)"""
+        model_path = get_setting("motion_model_path", MOTION_MODEL_PATH)
+        if not model_path or not os.path.exists(model_path):
+            return None
+        return cls(model_path, get_setting("motion_threshold", 0.8))
+
+    def classify(self, histories):
+        """一次推論多個 MotionHistory (最多兩隻手)，回傳每個的 (動態手勢名稱, 信心度)；沒有明確動作時名稱為 None"""
+        n = len(histories)
+        for i, history in enumerate(histories):
+            self.batch[i] = history.model_input()
+        predictions = self.backend.predict(self.batch[:n])
+        top_indices = np.argmax(predictions, axis=1)
+        results = []
+        for i, prediction in zip(top_indices, predictions):
+            name, confidence = self.labels[i], float(prediction[i])
+            results.append((name if name != NO_MOTION and confidence >= self.threshold else None, confidence))
+        return results
@@ -0,0 +1,382 @@
+"""多攝影機同時辨識：所有來源同時擷取，共用一組手部偵測工作執行緒
+
+每個來源一條擷取執行緒，只保留最新一張尚未處理的影像；任一工作執行緒都可以處理任一來源，
+同一來源同一時間只會由一條工作執行緒處理 (平滑狀態不需要另外加鎖)。
+手勢模式下各工作執行緒的模型輸入會先合併，再做一次批次推論。
+
+設定檔 multi_camera 區塊 (設為 true 則使用預設值)：
+    "multi_camera": {"workers": 2, "tile_size": [480, 360], "max_batch": 16, "max_delay_ms": 2}
+"""
+import math, threading, time
+import cv2
+import numpy as np
+from cogs import model_registry
+from cogs.app import App
+from cogs.config import get_setting
+from cogs.hand_detection import HandDetection
+from cogs.overlay import OverlayRenderer
+from cogs.pipeline import StageStats
+from cogs.profiler import profiler
+from cogs.scene_filter import SceneFilter
+from cogs.video import VideoStream, video_sources
+
+def multi_camera_settings():
+    """讀取 multi_camera 設定，未啟用時回傳 None"""
+    settings = get_setting("multi_camera", False)
+    if not settings:
+        return None
+    return settings if isinstance(settings, dict) else {}
+
+class ClassifierBatcher:
+    """把多條工作執行緒 (多個來源) 的模型輸入合併成一次推論"""
+    def __init__(self, max_batch=16, max_delay=0.002, timeout=5.0):
+        """
+        max_batch: 湊滿這麼多隻手就立刻推論
+        max_delay: 收到第一筆輸入後最多再等幾秒讓其他來源的輸入進來
+        timeout: classify 最多等待幾秒 (推論卡住時不讓工作執行緒永遠等下去)
+        """
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.pending = []  # [(特徵陣列, 請求)]
+        self.batches = 0   # 推論次數
+        self.samples = 0   # 推論過的手數
+        self.cond = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="classifier-batcher", daemon=True)
+        self.thread.start()
+
+    def classify(self, features):
+        """(工作執行緒) 送出 (N, 特徵數) 的模型輸入並等待結果
+
+        回傳每隻手的 (手勢索引, 信心度)；模型尚未載入時回傳 None。
+        推論失敗時在這裡拋出同一個例外，等待超過 timeout 秒則拋出 ValueError
+        """
+        request = {"done": threading.Event(), "result": None, "error": None}
+        with self.cond:
+            if not self.running:
+                raise ValueError("❌ 合併推論已停止")
+            self.pending.append((features, request))
+            self.cond.notify_all()
+        if not request["done"].wait(self.timeout):
+            raise ValueError(f"❌ 等待合併推論超過 {self.timeout} 秒")
+        if request["error"] is not None:
+            raise request["error"]
+        return request["result"]
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                deadline = time.perf_counter() + self.max_delay
+                while self.running and sum(len(features) for features, _ in self.pending) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch, self.pending = self.pending, []
+            self._predict(batch)
+
+    def _predict(self, batch):
+        """推論一批輸入；失敗時把例外交給這一批的每個請求，批次執行緒繼續處理下一批"""
+        results = [None] * len(batch)
+        error = None
+        try:
+            model = model_registry.peek_model()
+            if model is None:
+                model_registry.load_model_async()
+            else:
+                # 耗時由各來源的 HandDetection 計入 classify (含等待合併的時間)
+                predictions = model.predict(np.concatenate([features for features, _ in batch]))
+                top_indices = np.argmax(predictions, axis=1)
+                gestures = [(int(i), float(prediction[i])) for i, prediction in zip(top_indices, predictions)]
+                # 依每筆請求的手數切回去
+                offsets = np.cumsum([0] + [len(features) for features, _ in batch])
+                results = [gestures[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+                self.batches += 1
+                self.samples += len(gestures)
+        except Exception as e:
+            error = e
+        finally:
+            for (_, request), result in zip(batch, results):
+                request["result"] = result
+                request["error"] = error
+                request["done"].set()
+
+    @property
+    def mean_batch(self):
+        """平均每次推論的手數"""
+        return self.samples / self.batches if self.batches else 0.0
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout=1)
+
+class MultiCameraEngine:
+    """多來源共用的辨識工作池：每個來源各有一個 HandDetection (追蹤、ROI、平滑與動態手勢狀態各自獨立)
+
+    同一來源的影像依序由同一個 HandDetection 處理，因此可以沿用 Mediapipe 的追蹤模式；
+    手勢推論改由 ClassifierBatcher 合併各來源的輸入後一次完成。
+    """
+    def __init__(self, num_sources, workers=2, max_batch=16, max_delay=0.002, scene_filter=True):
+        """scene_filter: 是否依設定檔 scene_filter 略過各來源的靜止畫面"""
+        self.num_sources = num_sources
+        self.batcher = ClassifierBatcher(max_batch, max_delay)
+        self.detections = [HandDetection(draw=False, source=i, classifier=self.batcher.classify)
+                           for i in range(num_sources)]
+        self.scene_filters = [SceneFilter.from_settings() if scene_filter else None for _ in range(num_sources)]
+        self.is_advanced_mode = False
+        self.frames = [None] * num_sources   # 每個來源最新、尚未處理的影像 (新影像直接覆蓋)
+        self.busy = [False] * num_sources    # 來源是否正由某條工作執行緒處理
+        self.results = [None] * num_sources  # 每個來源最新的 (每隻手的結果, RGB 影像, 關鍵點或 None)
+        self.versions = [0] * num_sources    # 每個來源的結果更新次數 (畫面只重畫有變的格子)
+        self.dropped = [0] * num_sources     # 還沒處理就被新影像覆蓋的張數
+        self.processed = 0
+        self.stats = [StageStats() for _ in range(num_sources)]
+        self.next_source = 0  # 輪流挑選來源，避免某個來源一直被搶先
+        self.cond = threading.Condition()
+        self.running = True
+        self.start_time = time.perf_counter()
+        self.threads = [threading.Thread(target=self._work, name=f"detector-{i}", daemon=True) for i in range(workers)]
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, source, frame):
+        """(擷取執行緒) 交付某個來源的最新 BGR 影像"""
+        with self.cond:
+            if self.frames[source] is not None:
+                self.dropped[source] += 1
+            self.frames[source] = frame
+            self.cond.notify()
+
+    def add_listener(self, listener):
+        """註冊穩定結果改變時的通知函數 (在工作執行緒中執行，事件含來源編號 source)"""
+        for detection in self.detections:
+            detection.add_listener(listener)
+
+    def latest(self, source):
+        """某個來源最新的 (每隻手的結果, RGB 影像, 關鍵點 (手數, 21, 3) 或 None)，還沒有結果時回傳 None"""
+        return self.results[source]
+
+    def wait_idle(self, timeout=None):
+        """等待所有已交付的影像處理完畢 (效能測試用)"""
+        end = None if timeout is None else time.perf_counter() + timeout
+        with self.cond:
+            while any(frame is not None for frame in self.frames) or any(self.busy):
+                remaining = None if end is None else end - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+    def throughput(self):
+        """啟動以來每秒處理的影像數 (所有來源合計)"""
+        elapsed = time.perf_counter() - self.start_time
+        return self.processed / elapsed if elapsed else 0.0
+
+    def _take(self):
+        """輪流挑一個有新影像且沒有在處理中的來源，停止時回傳 None"""
+        with self.cond:
+            while self.running:
+                for offset in range(self.num_sources):
+                    source = (self.next_source + offset) % self.num_sources
+                    if self.frames[source] is not None and not self.busy[source]:
+                        frame, self.frames[source] = self.frames[source], None
+                        self.busy[source] = True
+                        self.next_source = source + 1
+                        return source, frame
+                self.cond.wait(0.1)
+        return None
+
+    def _work(self):
+        while True:
+            job = self._take()
+            if job is None:
+                break
+            source, frame = job
+            try:
+                detection, scene_filter = self.detections[source], self.scene_filters[source]
+                if scene_filter is not None:
+                    with profiler.measure("scene_filter"):
+                        process = scene_filter.should_process(frame, detection.hands_present)
+                    if not process:
+                        continue  # 畫面沒變，沿用上一次的結果
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                _, hand_results = detection.detect(image, self.is_advanced_mode)
+                # 關鍵點等到縮放成格子大小後才畫 (見 GridComposer)
+                landmarks = None if detection.last_landmarks is None else detection.last_landmarks.copy()
+                self.results[source] = (hand_results, image, landmarks)
+                self.versions[source] += 1
+                self.stats[source].tick()
+            except Exception as e:
+                print(f"❌ 來源 {source} 辨識失敗: {e}")  # 這張略過，沿用上一次的結果
+            finally:
+                with self.cond:
+                    self.busy[source] = False
+                    self.processed += 1
+                    self.cond.notify_all()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.join(timeout=2)
+        self.batcher.stop()
+        for detection in self.detections:
+            detection.detector.close()
+            if hasattr(detection.hands, "close"):
+                detection.hands.close()
+
+class MultiCameraCapture:
+    """同時讀取所有來源，每個來源一條執行緒把最新影像交給工作池"""
+    def __init__(self, engine, sources=video_sources):
+        self.engine = engine
+        self.streams = [VideoStream(source) for source in sources]
+        self.running = True
+        self.threads = [threading.Thread(target=self._feed, args=(i,), name=f"feed-{i}", daemon=True)
+                        for i in range(len(self.streams))]
+        for thread in self.threads:
+            thread.start()
+
+    def _feed(self, index):
+        stream = self.streams[index]
+        while self.running:
+            ret, frame = stream.read()
+            if ret:
+                self.engine.submit(index, frame)
+
+    def stats(self):
+        """各來源的連線狀態、讀取延遲 (毫秒) 與丟棄張數"""
+        return {stream.source: {"connected": stream.opened.is_set(),
+                                "latency_ms": stream.latency,
+                                "dropped": stream.dropped}
+                for stream in self.streams}
+
+    def release(self):
+        self.running = False
+        for stream in self.streams:  # 先全部通知，再逐一等待
+            stream.stop()
+        for thread in self.threads:
+            thread.join(timeout=1)
+        for stream in self.streams:
+            stream.release()
+
+class GridComposer:
+    """把各來源的結果影像縮放後排進預先配置好的格狀畫面"""
+    def __init__(self, num_tiles, tile_size=(480, 360), overlay=None):
+        self.tile_w, self.tile_h = tile_size
+        self.overlay = overlay or OverlayRenderer.from_settings()
+        self.cols = math.ceil(math.sqrt(num_tiles))
+        self.rows = math.ceil(num_tiles / self.cols)
+        self.canvas = np.zeros((self.rows * self.tile_h, self.cols * self.tile_w, 3), dtype=np.uint8)
+
+    def compose(self, images, labels, selected=None, landmarks=None, tiles=None):
+        """images: 每個來源的 RGB 影像 (沒有影像時為 None)；landmarks: 每個來源的關鍵點；selected 的格子加上外框
+
+        tiles: 只重畫這些格子 (其他格子保留上一次的內容)，None 表示全部重畫
+        """
+        landmarks = landmarks or [None] * len(images)
+        for i in range(len(images)) if tiles is None else sorted(tiles):
+            image, label, hand_landmarks = images[i], labels[i], landmarks[i]
+            row, col = divmod(i, self.cols)
+            tile = self.canvas[row * self.tile_h:(row + 1) * self.tile_h, col * self.tile_w:(col + 1) * self.tile_w]
+            if image is None:
+                tile[:] = 0
+                continue
+            resized = cv2.resize(image, (self.tile_w, self.tile_h), interpolation=cv2.INTER_AREA)
+            with profiler.measure("drawing"):
+                self.overlay.draw(resized, hand_landmarks)
+            cv2.putText(resized, label, (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            if i == selected:
+                cv2.rectangle(resized, (0, 0), (self.tile_w - 1, self.tile_h - 1), (144, 238, 144), 3)
+            tile[:] = resized
+        return self.canvas
+
+class MultiCameraApp(App):
+    """格狀顯示所有來源；右側結果欄顯示目前選取的來源，切換攝影機改為切換選取的格子"""
+    title = "🖐 手勢數字 & AI 手勢識別 (多攝影機)"
+
+    def __init__(self, window, start_time=None, sources=video_sources):
+        self.sources = sources
+        super().__init__(window, start_time)
+
+    def setup_detection(self):
+        """所有來源同時擷取，交給共用的工作池辨識"""
+        settings = multi_camera_settings() or {}
+        self.selected = 0  # 右側結果欄顯示的來源
+        self.engine = MultiCameraEngine(len(self.sources), workers=settings.get("workers", 2),
+                                        max_batch=settings.get("max_batch", 16),
+                                        max_delay=settings.get("max_delay_ms", 2) / 1000)
+        self.pipeline = self.engine
+        self.cap = MultiCameraCapture(self.engine, self.sources)
+        self.grid = GridComposer(len(self.sources), tuple(settings.get("tile_size", (480, 360))))
+        self.shown_versions = [None] * len(self.sources)  # 畫面上各格子對應的結果版本
+        self.shown_selected = None
+        self.scene_filter = None  # 靜止畫面過濾在工作池中依來源分開進行
+
+    def add_listener(self, listener):
+        self.engine.add_listener(listener)
+
+    @property
+    def is_advanced_mode(self):
+        return self.engine.is_advanced_mode
+
+    @is_advanced_mode.setter
+    def is_advanced_mode(self, value):
+        self.engine.is_advanced_mode = value
+
+    def update(self):
+        """只有某個來源有新結果 (或選取的格子改變) 時才重畫對應的格子"""
+        versions = list(self.engine.versions)
+        tiles = {i for i, (version, shown) in enumerate(zip(versions, self.shown_versions)) if version != shown}
+        if self.selected != self.shown_selected:
+            tiles |= {self.selected} | ({self.shown_selected} if self.shown_selected is not None else set())
+        if tiles:
+            latest = [self.engine.latest(i) for i in range(len(self.sources))]
+            images = [result[1] if result is not None else None for result in latest]
+            landmarks = [result[2] if result is not None else None for result in latest]
+            labels = [f"#{i} {source}  {self.engine.stats[i].fps:.1f} fps" for i, source in enumerate(self.sources)]
+            left_result, right_result = "未偵測", "未偵測"
+            if latest[self.selected] is not None:
+                for hand in latest[self.selected][0]:
+                    if hand["hand"] == "Left":
+                        left_result = hand["text"]
+                    elif hand["hand"] == "Right":
+                        right_result = hand["text"]
+            canvas = self.grid.compose(images, labels, self.selected, landmarks, tiles)
+            if self.show_result(left_result, right_result, canvas):
+                # 因顯示幀率上限而沒畫出去時保留狀態，下一次再畫
+                self.shown_versions, self.shown_selected = versions, self.selected
+
+        self.window.after(self.delay, self.update)
+
+    def load_model_async(self, retry=False):
+        model_registry.load_model_async(retry=retry)
+
+    def update_perf_overlay(self):
+        """每 0.5 秒更新一次各階段耗時、各來源 FPS 與平均批次大小"""
+        sources = "\n".join(f"#{i:<8} {stats.fps:5.1f} fps  drop {self.engine.dropped[i]}"
+                            for i, stats in enumerate(self.engine.stats))
+        self.ui_elements["perf_text"].set(f"p50 / p95 / p99\n{profiler.format_text()}\n{sources}\n"
+                                          f"total     {self.engine.throughput():5.1f} fps  "
+                                          f"batch {self.engine.batcher.mean_batch:.1f}")
+        self.perf_job = self.window.after(500, self.update_perf_overlay)
+
+    def switch_camera(self):
+        """切換右側結果欄顯示的來源"""
+        self.selected = (self.selected + 1) % len(self.sources)
+
+    def on_closing(self):
+        """釋放資源並關閉視窗"""
+        print(f"⚙️ 合計 {self.engine.throughput():.1f} fps，平均批次 {self.engine.batcher.mean_batch:.1f} 隻手")
+        super().on_closing()
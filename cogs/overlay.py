@@ -0,0 +1,57 @@
+"""手部關鍵點疊圖：取代每隻手呼叫一次 mp_draw.draw_landmarks
+
+所有手的關鍵點 (手數, 21, 3) 一次換算成像素座標，連線依預先算好的索引陣列排成折線，
+整張圖只呼叫一次 cv2.polylines 畫骨架，關節點再以長度為 0 的粗線段 (圓頭) 一次畫完。
+在顯示用的影像上畫 (縮放之後)，線條粗細不受擷取解析度影響。
+
+設定檔 draw_landmarks 為 false 時不畫 (無畫面 / 效能測試)。
+"""
+import cv2
+import numpy as np
+from cogs.config import get_setting
+
+# 與 mp.solutions.hands.HAND_CONNECTIONS 相同的 21 條連線，整理成 6 條折線
+HAND_CHAINS = [
+    [0, 1, 2, 3, 4],       # 拇指
+    [0, 5, 6, 7, 8],       # 食指
+    [9, 10, 11, 12],       # 中指
+    [13, 14, 15, 16],      # 無名指
+    [0, 17, 18, 19, 20],   # 小指
+    [5, 9, 13, 17],        # 手掌
+]
+CHAIN_INDEX = np.concatenate(HAND_CHAINS)
+CHAIN_LENGTHS = [len(chain) for chain in HAND_CHAINS]
+
+class OverlayRenderer:
+    def __init__(self, enabled=True, line_color=(224, 224, 224), point_color=(0, 0, 255), thickness=2, radius=3):
+        """顏色以影像的色彩順序指定 (預設值與 mp_draw.draw_landmarks 相同)"""
+        self.enabled = enabled
+        self.line_color = line_color
+        self.point_color = point_color
+        self.thickness = thickness
+        self.radius = radius
+        self.scale = np.empty(2, dtype=np.float32)
+        self.chains = {}  # 手數 → 每條折線在 CHAIN_INDEX 排列後的切分位置 (快取)
+
+    @classmethod
+    def from_settings(cls, enabled=None):
+        """enabled 為 None 時依設定檔 draw_landmarks 決定"""
+        return cls(get_setting("draw_landmarks", True) if enabled is None else enabled)
+
+    def _splits(self, num_hands):
+        if num_hands not in self.chains:
+            self.chains[num_hands] = np.cumsum(CHAIN_LENGTHS * num_hands)[:-1]
+        return self.chains[num_hands]
+
+    def draw(self, image, landmarks):
+        """在影像上原地畫出 (手數, 21, 2 或 3) 的正規化關鍵點，回傳 image"""
+        if not self.enabled or landmarks is None or len(landmarks) == 0:
+            return image
+        h, w = image.shape[:2]
+        self.scale[:] = (w, h)
+        points = (landmarks[:, :, :2] * self.scale).astype(np.int32)
+        chains = np.split(points[:, CHAIN_INDEX].reshape(-1, 2), self._splits(len(points)))
+        cv2.polylines(image, chains, False, self.line_color, self.thickness)
+        joints = np.repeat(points.reshape(-1, 1, 2), 2, axis=1)  # 每個關節一條長度為 0 的線段
+        cv2.polylines(image, joints, False, self.point_color, self.radius * 2)
+        return image
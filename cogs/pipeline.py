@@ -0,0 +1,122 @@
+"""擷取 / 推論 / 顯示 三段式管線
+
+擷取執行緒讀取影像 → 推論執行緒做手部偵測與手勢辨識 → Tk 主執行緒只負責顯示。
+各段之間以「滿了就丟掉最舊資料」的佇列連接，取出時只拿最新一筆 (較舊的直接丟掉)，
+推論永遠處理最新的影像、畫面永遠顯示最新的結果。
+"""
+import threading, time
+from collections import deque
+
+class DropOldestQueue:
+    """有上限的佇列，放入時若已滿就丟掉最舊的資料"""
+    def __init__(self, maxsize=2):
+        self.items = deque(maxlen=maxsize)
+        self.dropped = 0  # 被丟掉的資料數
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """取出最舊的一筆資料，逾時回傳 None"""
+        with self.cond:
+            if not self.items:
+                self.cond.wait(timeout)
+            return self.items.popleft() if self.items else None
+
+    def get_nowait(self):
+        with self.cond:
+            return self.items.popleft() if self.items else None
+
+    def get_latest(self, timeout=0):
+        """取出最新的一筆資料並丟掉較舊的 (計入 dropped)，逾時 (timeout=0 為不等待) 回傳 None"""
+        with self.cond:
+            if not self.items and timeout != 0:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None
+            self.dropped += len(self.items) - 1
+            item = self.items.pop()
+            self.items.clear()
+            return item
+
+    def __len__(self):
+        return len(self.items)
+
+class StageStats:
+    """記錄某一段的處理速度 (FPS，以指數移動平均平滑)"""
+    def __init__(self, smoothing=0.9):
+        self.smoothing = smoothing
+        self.fps = 0.0
+        self.last = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last is not None and now > self.last:
+            fps = 1 / (now - self.last)
+            self.fps = fps if self.fps == 0 else self.fps * self.smoothing + fps * (1 - self.smoothing)
+        self.last = now
+
+class Pipeline:
+    def __init__(self, read_frame, process, maxsize=2):
+        """
+        read_frame: 回傳 (ret, frame) 的函數 (在擷取執行緒呼叫)
+        process:    frame → 結果 的函數 (在推論執行緒呼叫，回傳 None 時不送出結果)
+        """
+        self.read_frame = read_frame
+        self.process = process
+        self.frame_queue = DropOldestQueue(maxsize)   # 擷取 → 推論
+        self.result_queue = DropOldestQueue(maxsize)  # 推論 → 顯示
+        self.stats = {"capture": StageStats(), "inference": StageStats(), "render": StageStats()}
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        self.threads = [threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+                        threading.Thread(target=self._inference_loop, name="inference", daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=1)
+
+    def _capture_loop(self):
+        while self.running:
+            ret, frame = self.read_frame()
+            if not ret:
+                time.sleep(0.01)  # 讀取失敗 (例如切換攝影機中) 時稍等再試
+                continue
+            self.frame_queue.put(frame)
+            self.stats["capture"].tick()
+
+    def _inference_loop(self):
+        while self.running:
+            frame = self.frame_queue.get_latest(timeout=0.1)
+            if frame is None:
+                continue
+            result = self.process(frame)
+            if result is not None:  # 回傳 None 表示這張影像不需要更新畫面
+                self.result_queue.put(result)
+            self.stats["inference"].tick()
+
+    def get_result(self):
+        """(Tk 主執行緒) 取出最新結果，沒有新結果時回傳 None"""
+        result = self.result_queue.get_latest()
+        if result is not None:
+            self.stats["render"].tick()
+        return result
+
+    def stage_stats(self):
+        """各段的 FPS 與輸出佇列深度 (顯示沒有輸出佇列，改為回報沒被顯示就被取代的結果數)"""
+        return {
+            "capture":   {"fps": self.stats["capture"].fps,   "queue": len(self.frame_queue)},
+            "inference": {"fps": self.stats["inference"].fps, "queue": len(self.result_queue)},
+            "render":    {"fps": self.stats["render"].fps,    "dropped": self.result_queue.dropped},
+        }
@@ -0,0 +1,103 @@
+"""每個處理階段的耗時統計 (滾動視窗 p50 / p95 / p99)
+
+用法：
+    with profiler.measure("mediapipe"):
+        results = hands.process(image)
+
+結果可顯示在控制面板、結束時輸出成 Prometheus 文字格式，
+或在設定檔指定 metrics_port 後以 http://localhost:<port>/metrics 提供。
+"""
+import threading, time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# 擷取、色彩轉換、Mediapipe、畫關鍵點、分類、Tk 顯示
+STAGES = ("capture", "color", "mediapipe", "drawing", "classify", "render")
+
+class Profiler:
+    def __init__(self, window=300):
+        """window: 計算百分位數時使用最近幾筆資料"""
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.counts = {stage: 0 for stage in STAGES}
+        self.totals = {stage: 0.0 for stage in STAGES}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record(self, stage, ms):
+        """記錄一次耗時 (毫秒)"""
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.samples[STAGES[0]].maxlen)
+                self.counts[stage], self.totals[stage] = 0, 0.0
+            self.samples[stage].append(ms)
+            self.counts[stage] += 1
+            self.totals[stage] += ms
+
+    def summary(self):
+        """各階段的 p50 / p95 / p99 (毫秒)、累計次數與累計耗時"""
+        with self.lock:
+            snapshot = {stage: (list(samples), self.counts[stage], self.totals[stage])
+                        for stage, samples in self.samples.items()}
+        stats = {}
+        for stage, (samples, count, total) in snapshot.items():
+            if samples:
+                p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+                stats[stage] = {"p50": p50, "p95": p95, "p99": p99, "count": count, "sum": total}
+        return stats
+
+    def format_text(self):
+        """給控制面板顯示的文字"""
+        return "\n".join(f"{stage:<9} {s['p50']:6.1f} / {s['p95']:6.1f} / {s['p99']:6.1f} ms"
+                         for stage, s in self.summary().items())
+
+    def to_prometheus(self):
+        """Prometheus 文字格式 (summary)"""
+        lines = ["# HELP hand_stage_latency_ms Per-frame latency of each processing stage in milliseconds.",
+                 "# TYPE hand_stage_latency_ms summary"]
+        for stage, s in self.summary().items():
+            for key, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+                lines.append(f'hand_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {s[key]:.3f}')
+            lines.append(f'hand_stage_latency_ms_sum{{stage="{stage}"}} {s["sum"]:.3f}')
+            lines.append(f'hand_stage_latency_ms_count{{stage="{stage}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf8") as f:
+            f.write(self.to_prometheus())
+        print(f"📊 效能統計已輸出至 {path}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """在背景執行緒提供 /metrics"""
+        profiler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = profiler.to_prometheus().encode("utf8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # 不要每次請求都印 log
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        print(f"📊 效能統計：http://{host}:{port}/metrics")
+        return server
+
+# 整個程式共用的統計
+profiler = Profiler()
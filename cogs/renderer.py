@@ -0,0 +1,36 @@
+import tkinter as tk
+import time
+import numpy as np
+from PIL import Image, ImageTk
+
+class FrameRenderer:
+    """重複使用同一個 Canvas 影像物件與 PhotoImage，只在影像大小改變時才重新配置"""
+    def __init__(self, canvas, max_fps=None):
+        """max_fps: 顯示幀率上限 (與推論速度分開)，None 表示不限制"""
+        self.canvas = canvas
+        self.min_interval = 1 / max_fps if max_fps else 0.0
+        self.photo = None
+        self.canvas_image = None
+        self.size = None
+        self.last_render = 0.0
+
+    def render(self, frame):
+        """將 RGB 影像 (H, W, 3) 畫到 Canvas，因幀率上限而略過時回傳 False"""
+        now = time.perf_counter()
+        if now - self.last_render < self.min_interval:
+            return False
+        self.last_render = now
+
+        h, w = frame.shape[:2]
+        # frombuffer 直接共用 NumPy 的記憶體，不另外複製一份影像
+        image = Image.frombuffer("RGB", (w, h), np.ascontiguousarray(frame), "raw", "RGB", 0, 1)
+        if self.size != (w, h):
+            self.photo = ImageTk.PhotoImage(image=image)
+            if self.canvas_image is None:
+                self.canvas_image = self.canvas.create_image(0, 0, image=self.photo, anchor=tk.NW)
+            else:
+                self.canvas.itemconfig(self.canvas_image, image=self.photo)
+            self.size = (w, h)
+        else:
+            self.photo.paste(image)  # 原地更新像素
+        return True
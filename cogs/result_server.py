@@ -0,0 +1,150 @@
+"""辨識結果發布服務：TCP 連線，每行一筆 JSON (NDJSON)
+
+在背景執行緒跑 asyncio 事件迴圈，publish 只把事件丟進迴圈就返回，不會拖慢推論執行緒。
+每個連線各自保留「每隻手最新一筆」尚未送出的事件，連線太慢時舊事件直接被新事件取代 (合併)，
+送不完的資料不會無限累積。新連線會先收到目前每隻手的最新狀態。
+每個連線的傳送緩衝區 (asyncio transport 與 socket 的 SO_SNDBUF) 都設得很小 (write_buffer 位元組)，
+對方讀太慢時事件會留在合併用的 pending 中，而不是堆在緩衝區裡越積越舊。
+動態手勢 (mode 為 "motion") 是一次性的事件而不是狀態：與同一隻手的狀態分開合併 (每隻手只保留最新一個
+尚未送出的動態手勢)，也不列入新連線的初始狀態。
+
+設定檔 result_server 區塊 (設為埠號數字則只監聽本機)：
+    "result_server": {"host": "127.0.0.1", "port": 8765, "write_buffer": 4096}
+"""
+import asyncio, json, socket, threading
+from cogs.config import get_setting
+
+class ClientChannel:
+    """單一訂閱者：每個 key (來源 + 手別 + 狀態 / 動態手勢) 只保留最新一筆待送事件"""
+    def __init__(self, writer, write_buffer=4096):
+        self.writer = writer
+        self.write_buffer = write_buffer
+        self.pending = {}  # key → 尚未送出的事件 (已編碼)
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.coalesced = 0  # 還沒送出就被新事件取代的筆數
+        # 緩衝區超過 write_buffer 時 drain 才會等待，之後的新事件留在 pending 合併
+        writer.transport.set_write_buffer_limits(high=write_buffer, low=write_buffer // 2)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, write_buffer)
+
+    def push(self, key, line):
+        if key in self.pending:
+            self.coalesced += 1
+        self.pending[key] = line
+        self.ready.set()
+
+    async def run(self):
+        while True:
+            await self.ready.wait()
+            try:
+                # 上一批還沒送出去時先等待，期間的新事件會被合併
+                while self.writer.transport.get_write_buffer_size() > self.write_buffer:
+                    await self.writer.drain()
+            except ConnectionError:
+                return
+            self.ready.clear()
+            lines, self.pending = list(self.pending.values()), {}
+            self.writer.write(b"".join(lines))
+            self.sent += len(lines)
+            try:
+                await self.writer.drain()  # 對方讀太慢時在這裡等待，期間的新事件會被合併
+            except ConnectionError:
+                return
+
+class ResultServer:
+    def __init__(self, host="127.0.0.1", port=8765, write_buffer=4096):
+        """write_buffer: 每個連線的傳送緩衝區大小 (位元組)，越小合併得越早、延遲越低"""
+        self.host = host
+        self.port = port
+        self.write_buffer = write_buffer
+        self.clients = set()
+        self.latest = {}  # key → 最新事件 (給新連線的初始狀態)
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+        self.error = None  # 啟動失敗 (例如埠號已被使用) 時的例外
+        self.server = None
+        self.thread = threading.Thread(target=self._run, name="result-server", daemon=True)
+
+    @classmethod
+    def from_settings(cls):
+        """依設定檔建立並啟動服務，未設定時回傳 None"""
+        settings = get_setting("result_server")
+        if not settings:
+            return None
+        if not isinstance(settings, dict):
+            settings = {"port": settings}
+        return cls(**settings).start()
+
+    def start(self):
+        """啟動服務並等待開始監聽，無法監聽時拋出 ValueError"""
+        self.thread.start()
+        self.started.wait()
+        if self.error is not None:
+            self.thread.join(timeout=2)
+            raise ValueError(f"❌ 無法啟動辨識結果服務 {self.host}:{self.port}: {self.error}") from self.error
+        print(f"📡 辨識結果服務：tcp://{self.host}:{self.port}")
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]  # port=0 時改為實際使用的埠號
+        except Exception as e:
+            self.error = e
+            self.loop.close()
+            return
+        finally:
+            self.started.set()  # 成功或失敗都要讓 start() 返回
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        client = ClientChannel(writer, self.write_buffer)
+        for key, line in self.latest.items():
+            client.push(key, line)
+        self.clients.add(client)
+        sender = asyncio.ensure_future(client.run())
+        try:
+            # 訂閱者不需要傳資料，讀到 EOF 代表斷線
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    def publish(self, event):
+        """(任意執行緒) 發布一筆事件，可直接當作 HandDetection 的 listener"""
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf8")
+        motion = event["mode"] == "motion"
+        key = (event.get("source"), event["hand"], "motion" if motion else "state")
+        self.loop.call_soon_threadsafe(self._broadcast, key, line, not motion)
+
+    def _broadcast(self, key, line, is_state=True):
+        if is_state:  # 動態手勢不是狀態，不給新連線
+            self.latest[key] = line
+        for client in self.clients:
+            client.push(key, line)
+
+    def stats(self):
+        """目前連線數、已送出與被合併的事件數"""
+        clients = list(self.clients)
+        return {"clients": len(clients), "sent": sum(c.sent for c in clients),
+                "coalesced": sum(c.coalesced for c in clients)}
+
+    def stop(self):
+        if self.error is not None:
+            return
+        async def close():
+            self.server.close()
+            for client in list(self.clients):
+                client.writer.close()
+            await self.server.wait_closed()
+        if self.server is not None:
+            asyncio.run_coroutine_threadsafe(close(), self.loop).result(timeout=2)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
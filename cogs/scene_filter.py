@@ -0,0 +1,80 @@
+"""靜止畫面過濾：畫面沒變、上一次也沒有手時，略過手部偵測
+
+以縮小的灰階影像 (預設 32×24) 和上一次實際偵測的影像相比，平均差異低於門檻就略過。
+連續略過一段時間後進入閒置狀態，降低讀取影像的頻率；畫面一有變化立刻回到正常狀態。
+兩種狀態下的 CPU 使用率分開統計。
+
+設定檔 scene_filter 區塊 (設為 false 則關閉)：
+    "scene_filter": {"threshold": 4.0, "idle_after": 2.0, "idle_interval": 0.2}
+"""
+import time
+import cv2
+import numpy as np
+from cogs.config import get_setting
+
+STATES = ("active", "idle")
+
+class SceneFilter:
+    def __init__(self, threshold=4.0, idle_after=2.0, idle_interval=0.2, size=(32, 24)):
+        """
+        threshold:     縮圖平均灰階差異 (0~255) 超過此值才算畫面有變化
+        idle_after:    畫面持續沒變化幾秒後進入閒置狀態
+        idle_interval: 閒置時每隔幾秒才讀取一張影像
+        size:          比較用縮圖的大小 (寬, 高)
+        """
+        self.threshold = threshold
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.size = size
+        self.reference = None  # 上一次實際偵測的縮圖
+        self.thumb = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.last_change = time.perf_counter()
+        self.idle = False
+        self.skipped = 0
+        # 各狀態累計的 CPU 時間與經過時間 (秒)
+        self.cpu_time = dict.fromkeys(STATES, 0.0)
+        self.wall_time = dict.fromkeys(STATES, 0.0)
+        self.last_cpu, self.last_wall = time.process_time(), time.perf_counter()
+
+    @classmethod
+    def from_settings(cls):
+        """依設定檔建立，關閉時回傳 None"""
+        settings = get_setting("scene_filter", {})
+        if settings is False:
+            return None
+        return cls(**settings)
+
+    def should_process(self, frame, hands_present):
+        """frame: BGR 影像；hands_present: 上一次偵測是否有手"""
+        self._account()
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self.thumb)
+        now = time.perf_counter()
+        changed = (self.reference is None or
+                   cv2.absdiff(self.thumb, self.reference).mean() > self.threshold)
+        if hands_present or changed:
+            self.reference = self.thumb.copy()
+            self.last_change = now
+            self.idle = False
+            return True
+        self.skipped += 1
+        self.idle = now - self.last_change >= self.idle_after
+        return False
+
+    @property
+    def poll_interval(self):
+        """讀取下一張影像前要等待的秒數"""
+        return self.idle_interval if self.idle else 0.0
+
+    def _account(self):
+        """把上一次呼叫以來的 CPU / 經過時間記到目前的狀態"""
+        cpu, wall = time.process_time(), time.perf_counter()
+        state = "idle" if self.idle else "active"
+        self.cpu_time[state] += cpu - self.last_cpu
+        self.wall_time[state] += wall - self.last_wall
+        self.last_cpu, self.last_wall = cpu, wall
+
+    def cpu_usage(self):
+        """各狀態的平均 CPU 使用率 (%，以單一核心為 100%)，尚未進入過的狀態為 None"""
+        return {state: self.cpu_time[state] / self.wall_time[state] * 100 if self.wall_time[state] else None
+                for state in STATES}
@@ -27,11 +27,13 @@ def setup_ui(window, app):
     results_frame = ttk.Labelframe(control_frame, text="Results", style="TFrame")
     cam_frame     = ttk.Labelframe(control_frame, text="Camera",  style="TFrame")
     mode_frame    = ttk.Labelframe(control_frame, text="Mode",    style="TFrame")
+    perf_frame    = ttk.Labelframe(control_frame, text="Performance", style="TFrame")
     misc_frame    = ttk.Labelframe(control_frame, text="Others",  style="TFrame")
-    # 前三個區塊從上往下排列
+    # 前四個區塊從上往下排列
     results_frame.pack(fill="x", pady=5)
     cam_frame.pack(fill="x", pady=5)
     mode_frame.pack(fill="x", pady=5)
+    perf_frame.pack(fill="x", pady=5)
     # Others 區塊固定在底部
     misc_frame.pack(fill="x", side="bottom", pady=5)
 
@@ -58,6 +60,12 @@ def setup_ui(window, app):
     mode_button= ttk.Button(mode_frame, text="切換模式 (M)", style="Rounded.TButton", command=app.switch_mode)
     mode_button.pack(fill="x", padx=5, pady=5)
 
+    # 【Performance 區】顯示 / 隱藏各階段耗時 (p50 / p95 / p99)
+    perf_button = ttk.Button(perf_frame, text="效能資訊", style="Rounded.TButton", command=app.toggle_perf_overlay)
+    perf_button.pack(fill="x", padx=5, pady=5)
+    perf_text   = StringVar()
+    perf_label  = Label(perf_frame, textvariable=perf_text, justify="left", bg="#252526", fg="#9cdcfe", font=("Consolas",9))
+
     # 【Others 區】退出按鈕
     exit_button = ttk.Button(misc_frame, text="退出", style="Rounded.TButton", command=app.on_closing)
     exit_button.pack(fill="x", padx=5, pady=10, side="bottom")
@@ -68,5 +76,7 @@ def setup_ui(window, app):
         "right_hand_text":  right_hand_text,
         "mode_label":       mode_label,
         "left_hand_label":  left_hand_label,
-        "right_hand_label": right_hand_label
+        "right_hand_label": right_hand_label,
+        "perf_text":        perf_text,
+        "perf_label":       perf_label
     }
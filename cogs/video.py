@@ -1,19 +1,292 @@
-import cv2
-import json
+"""影像來源：開啟攝影機 / 串流，並依設定檔協商擷取模式
 
-# 讀取設定檔案
-with open(".vscode/setting.json", 'r', encoding='utf8') as jfile:
-    jdata = json.load(jfile)
+設定檔 capture 區塊 (皆可省略，省略時使用裝置預設模式)：
+    "capture": {"width": 1280, "height": 720, "fourcc": "MJPG", "fps": 60, "buffer_size": 1,
+                "probe": true, "min_width": 1280, "min_height": 720, "inference_width": 640}
+probe 為 true 時會實測本機攝影機支援的模式，選擇不低於 min_width × min_height 中 FPS 最高的一個
+(結果存在 .vscode/capture_modes.json，之後啟動不必重測)，否則套用 width / height / fourcc / fps。
+inference_width 為偵測使用的影像寬度 (見 AdaptiveDetector)，畫面仍以擷取解析度顯示。
+"""
+import cv2
+import json, os, threading, time
+from cogs.config import jdata, get_setting
+from cogs.profiler import profiler
 
 video_sources = [0, jdata["video_source"]]
 
+# 探測時嘗試的模式 (FOURCC 需在解析度之前設定)
+FOURCCS = ("MJPG", "YUYV")
+RESOLUTIONS = ((1920, 1080), (1280, 720), (960, 540), (640, 480))
+FRAME_RATES = (60, 30)
+PROBE_CACHE_PATH = ".vscode/capture_modes.json"
+
+def fourcc_to_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+def capture_mode(cap):
+    """裝置目前實際使用的模式"""
+    return {"fourcc": fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS)}
+
+def apply_mode(cap, mode):
+    """套用 fourcc / width / height / fps (有給的項目才設定)，回傳裝置實際接受的模式"""
+    if mode.get("fourcc"):
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*mode["fourcc"]))
+    if mode.get("width") and mode.get("height"):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, mode["width"])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, mode["height"])
+    if mode.get("fps"):
+        cap.set(cv2.CAP_PROP_FPS, mode["fps"])
+    return capture_mode(cap)
+
+def measure_fps(cap, frames=10, warmup=3):
+    """實際 grab 幾張影像量測 FPS (裝置回報的 CAP_PROP_FPS 常常不準)"""
+    for _ in range(warmup):
+        if not cap.grab():
+            return 0.0
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not cap.grab():
+            return 0.0
+    return frames / (time.perf_counter() - start)
+
+def probe_modes(cap, min_width=640, min_height=480):
+    """回傳裝置接受且不低於最低解析度的模式，依實測 FPS 由快到慢排序 (FPS 相近時解析度低的優先)"""
+    seen, modes = set(), []
+    for fourcc in FOURCCS:
+        for width, height in RESOLUTIONS:
+            if width < min_width or height < min_height:
+                continue
+            for fps in FRAME_RATES:
+                mode = apply_mode(cap, {"fourcc": fourcc, "width": width, "height": height, "fps": fps})
+                key = (mode["fourcc"], mode["width"], mode["height"], round(mode["fps"]))
+                if mode["width"] < min_width or mode["height"] < min_height or key in seen:
+                    continue
+                seen.add(key)
+                mode["measured_fps"] = measure_fps(cap)
+                modes.append(mode)
+    modes.sort(key=lambda m: (-round(m["measured_fps"] / 5), m["width"] * m["height"]))
+    return modes
+
+def negotiate_mode(cap, source, settings):
+    """探測 (或讀取快取) 後套用最快的模式，沒有符合條件的模式時回傳 None"""
+    cache = {}
+    if os.path.exists(PROBE_CACHE_PATH):
+        with open(PROBE_CACHE_PATH, "r", encoding="utf8") as f:
+            cache = json.load(f)
+    key = f"{source}@{settings.get('min_width', 640)}x{settings.get('min_height', 480)}"
+    if key not in cache:
+        print(f"🔍 探測攝影機 {source} 支援的擷取模式...")
+        cache[key] = probe_modes(cap, settings.get("min_width", 640), settings.get("min_height", 480))
+        with open(PROBE_CACHE_PATH, "w", encoding="utf8") as f:
+            json.dump(cache, f, indent=2)
+    if not cache[key]:
+        return None
+    return apply_mode(cap, cache[key][0])
+
+def configure_capture(cap, source):
+    """依設定檔 capture 區塊設定擷取模式與緩衝大小"""
+    settings = get_setting("capture", {})
+    is_network = isinstance(source, str)
+    buffer_size = settings.get("buffer_size", 1 if is_network else None)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    if is_network:
+        return  # 串流的解析度與格式由伺服器決定
+    mode = negotiate_mode(cap, source, settings) if settings.get("probe") else None
+    if mode is None:
+        mode = apply_mode(cap, settings)
+    print(f"🎥 攝影機 {source} 擷取模式: {mode['fourcc']} {mode['width']}x{mode['height']} @ {mode['fps']:.0f} fps")
+
 def open_video_source(index):
     """開啟指定的攝影機來源"""
     cap = cv2.VideoCapture(video_sources[index])
     if cap.isOpened():
         print(f"已開啟攝影機: {video_sources[index]}")
+        configure_capture(cap, video_sources[index])
         return cap
     else:
         cap.release()
         raise ValueError(f"無法開啟攝影機: {video_sources[index]}")
-    
\ No newline at end of file
+
+class VideoStream:
+    """單一影像來源：在背景執行緒開啟與持續讀取，只保留最新的一張影像
+
+    網路串流斷線時會以指數退避重新連線；持續讀取可以清空 OpenCV 的內部緩衝，
+    避免讀到過時的影像。待命 (standby) 時只 grab 不解碼，切換時可以立刻使用；
+    設定 interval 後兩次解碼之間也只 grab (畫面閒置時降低擷取的 CPU 用量)。
+    """
+    def __init__(self, source, active=True, max_backoff=30):
+        self.source = source
+        self.is_network = isinstance(source, str)
+        self.active = active
+        self.max_backoff = max_backoff
+        self.cap = None
+        self.frame = None
+        self.frame_id = 0         # 最新影像的編號
+        self.read_id = 0          # 上一次被取走的影像編號
+        self.dropped = 0          # 還沒被取走就被新影像覆蓋的張數
+        self.latency = 0.0        # 每次讀取影像的耗時 (毫秒，指數移動平均)
+        self.interval = 0.0       # 兩次解碼之間至少間隔的秒數 (0 表示每張都解碼)
+        self.last_decode = 0.0
+        self.cond = threading.Condition()
+        self.opened = threading.Event()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"video-{source}", daemon=True)
+        self.thread.start()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if cap.isOpened():
+            print(f"已開啟攝影機: {self.source}")
+            configure_capture(cap, self.source)
+            return cap
+        cap.release()
+        return None
+
+    def _run(self):
+        try:
+            self._read_loop()
+        finally:
+            # 由讀取執行緒自己釋放，不會在 grab / retrieve 進行中被其他執行緒 release
+            self.opened.clear()
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
+
+    def _read_loop(self):
+        backoff = 1
+        while self.running:
+            if self.cap is None:
+                self.cap = self._open()
+                if self.cap is None:
+                    print(f"無法開啟攝影機: {self.source}，{backoff} 秒後重試")
+                    self._sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                backoff = 1
+                self.opened.set()
+
+            start = time.perf_counter()
+            decode = self.active and start - self.last_decode >= self.interval
+            if decode:
+                ret, frame = self.cap.read()
+                self.last_decode = start
+            else:
+                ret, frame = self.cap.grab(), None  # 待命中 (或還沒到下一次解碼)：只清緩衝，不解碼
+            elapsed = (time.perf_counter() - start) * 1000
+            if not ret:
+                print(f"攝影機 {self.source} 讀取失敗，重新連線")
+                self.opened.clear()
+                self.cap.release()
+                self.cap = None
+                continue
+
+            self.latency = elapsed if self.latency == 0 else self.latency * 0.9 + elapsed * 0.1
+            if decode:
+                profiler.record("capture", elapsed)
+            if frame is not None:
+                with self.cond:
+                    if self.frame_id > self.read_id:
+                        self.dropped += 1
+                    self.frame = frame
+                    self.frame_id += 1
+                    self.cond.notify_all()
+
+    def _sleep(self, seconds):
+        """可被 release 中斷的等待"""
+        end = time.perf_counter() + seconds
+        while self.running and time.perf_counter() < end:
+            time.sleep(0.1)
+
+    def read(self, timeout=0.5):
+        """取得最新一張尚未讀過的影像，逾時回傳 (False, None)"""
+        with self.cond:
+            if self.frame_id == self.read_id:
+                self.cond.wait(timeout)
+            if self.frame_id == self.read_id:
+                return False, None
+            self.read_id = self.frame_id
+            return True, self.frame
+
+    def get(self, prop):
+        cap = self.cap
+        return cap.get(prop) if cap is not None else 0
+
+    def stop(self):
+        """通知讀取執行緒結束 (不等待)，攝影機由讀取執行緒結束時釋放"""
+        self.running = False
+
+    def release(self, timeout=2):
+        """通知讀取執行緒結束並等待；逾時的話執行緒仍會在讀完目前這張後自行釋放攝影機"""
+        self.stop()
+        self.thread.join(timeout)
+
+class VideoSourceManager:
+    """管理多個影像來源：目前來源之外，預先開啟下一個來源待命，讓切換攝影機不需等待"""
+    def __init__(self, sources=video_sources, index=0, standby=True):
+        self.sources = sources
+        self.index = index
+        self.standby = standby
+        self.streams = {}
+        self.lock = threading.Lock()
+        for stream in self._prepare():
+            stream.release()
+
+    def _prepare(self):
+        """確保目前來源在讀取、下一個來源待命，回傳已不需要的來源 (由呼叫端在鎖外 release)"""
+        keep = {self.index}
+        if self.standby and len(self.sources) > 1:
+            keep.add((self.index + 1) % len(self.sources))
+        closing = [self.streams.pop(i) for i in list(self.streams) if i not in keep]
+        for stream in closing:
+            stream.stop()
+        for i in keep:
+            if i not in self.streams:
+                self.streams[i] = VideoStream(self.sources[i], active=(i == self.index))
+            self.streams[i].active = (i == self.index)
+        return closing
+
+    @property
+    def current(self):
+        return self.streams[self.index]
+
+    def read(self):
+        with self.lock:
+            stream = self.current
+        return stream.read()
+
+    def get(self, prop):
+        return self.current.get(prop)
+
+    def set_interval(self, seconds):
+        """設定目前來源兩次解碼之間的間隔 (閒置時由 App 設定，0 表示全速)"""
+        with self.lock:
+            self.current.interval = seconds
+
+    def switch(self, index=None):
+        """切換到指定來源 (預設為下一個)"""
+        with self.lock:
+            self.index = (self.index + 1) % len(self.sources) if index is None else index
+            closing = self._prepare()
+        # 等待讀取執行緒結束時不持有鎖，read / set_interval 不會被卡住
+        for stream in closing:
+            stream.release()
+
+    def stats(self):
+        """各來源的連線狀態、讀取延遲 (毫秒) 與丟棄張數"""
+        return {stream.source: {"connected": stream.opened.is_set(),
+                                "latency_ms": stream.latency,
+                                "dropped": stream.dropped}
+                for stream in self.streams.values()}
+
+    def release(self):
+        with self.lock:
+            streams = list(self.streams.values())
+            self.streams.clear()
+        for stream in streams:  # 先全部通知，再逐一等待
+            stream.stop()
+        for stream in streams:
+            stream.release()
@@ -0,0 +1,124 @@
+"""訓練後壓縮：產生 int8 量化與剪枝版本的手勢模型，並與原本的 float 模型比較
+
+用法 (在 gesture_model 資料夾、train_gesture_model.py 之後執行)：
+    python compress_gesture_model.py --data gesture_store --sparsity 0.5
+
+輸出：
+    gesture_model_int8.tflite         int8 量化 (以訓練資料作為 representative dataset 校正)
+    gesture_model_pruned.npz          剪枝後的 NumPy 權重 (壓縮存檔，0 越多檔案越小)
+    gesture_model_pruned_int8.tflite  剪枝 + int8 量化
+    compress_report.json              各版本在驗證集上的準確率、與 float 模型的一致率、檔案大小與載入時間
+
+在 HandDetection 使用壓縮版本 (.vscode/setting.json)：
+    "inference_backend": "tflite", "gesture_model_path": "gesture_model/gesture_model_int8.tflite"
+"""
+import argparse, json, os, sys, time
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model, clone_model
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.config import get_setting
+from cogs.gesture_backend import load_backend, export_numpy_weights
+from cogs.landmark_features import extract_features
+from data_pipeline import load_arrays
+
+def to_int8_tflite(model, calibration, path):
+    """全整數 (int8) 量化，以 calibration 樣本估計每層的數值範圍"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([sample[None]] for sample in calibration)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+
+def prune(model, sparsity, X_train, y_train, epochs):
+    """依權重大小剪枝：有安裝 tensorflow_model_optimization 時邊剪邊微調，否則直接把最小的權重設為 0"""
+    try:
+        import tensorflow_model_optimization as tfmot
+    except ImportError:
+        tfmot = None
+
+    if tfmot is not None:
+        schedule = tfmot.sparsity.keras.ConstantSparsity(sparsity, begin_step=0, frequency=1)
+        pruned = tfmot.sparsity.keras.prune_low_magnitude(model, pruning_schedule=schedule)
+        pruned.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+        pruned.fit(X_train, y_train, epochs=epochs, batch_size=32, verbose=0,
+                   callbacks=[tfmot.sparsity.keras.UpdatePruningStep()])
+        return tfmot.sparsity.keras.strip_pruning(pruned)
+
+    print("⚠️ 未安裝 tensorflow_model_optimization，只做一次性的權重剪枝 (不微調)")
+    pruned = clone_model(model)
+    pruned.set_weights(model.get_weights())
+    for layer in pruned.layers:
+        weights = layer.get_weights()
+        if weights:
+            kernel = weights[0]
+            threshold = np.quantile(np.abs(kernel), sparsity)
+            weights[0] = np.where(np.abs(kernel) < threshold, 0, kernel)
+            layer.set_weights(weights)
+    return pruned
+
+def evaluate(path, backend_name, X_val, y_val, reference):
+    """回傳驗證集準確率、與 float 模型預測的一致率、檔案大小與載入時間"""
+    start = time.perf_counter()
+    backend = load_backend(backend_name, path)
+    load_seconds = time.perf_counter() - start
+    predicted = np.argmax(backend.predict(X_val), axis=1)
+    return {"path": path, "backend": backend_name,
+            "accuracy": float(np.mean(predicted == y_val)),
+            "agreement_with_float": float(np.mean(predicted == reference)),
+            "size_bytes": os.path.getsize(path), "load_seconds": load_seconds}
+
+def main():
+    parser = argparse.ArgumentParser(description="手勢模型量化與剪枝")
+    parser.add_argument("--data", default="gesture_store", help="手勢數據資料夾 (需與訓練時相同)")
+    parser.add_argument("--feature-set", default=get_setting("feature_set", "xy"),
+                        help="特徵組合 (需與訓練時相同，預設為設定檔 feature_set)")
+    parser.add_argument("--sparsity", type=float, default=0.5, help="剪枝比例")
+    parser.add_argument("--finetune-epochs", type=int, default=5, help="剪枝後微調的 epoch 數")
+    parser.add_argument("--calibration-samples", type=int, default=500)
+    args = parser.parse_args()
+
+    # 🔹 與訓練時相同的驗證集切分
+    landmarks, y, labels, val_mask = load_arrays(args.data)
+    with open("gesture_labels.json", "r") as f:
+        if json.load(f) != labels:
+            raise ValueError("❌ 資料的手勢標籤與 gesture_labels.json 不同，請確認 --data 與訓練時相同")
+    X = extract_features(landmarks, args.feature_set)
+    X_train, y_train, X_val, y_val = X[~val_mask], y[~val_mask], X[val_mask], y[val_mask]
+    calibration = X_train[np.random.default_rng(0).permutation(len(X_train))[:args.calibration_samples]]
+
+    model = load_model("gesture_model.h5")
+    reference = np.argmax(model.predict(X_val, verbose=0), axis=1)
+
+    # 🔹 int8 量化
+    to_int8_tflite(model, calibration, "gesture_model_int8.tflite")
+
+    # 🔹 剪枝 (NumPy 權重壓縮存檔) 以及剪枝 + int8 量化
+    pruned = prune(model, args.sparsity, X_train, tf.keras.utils.to_categorical(y_train, len(labels)),
+                   args.finetune_epochs)
+    export_numpy_weights(pruned, "gesture_model_pruned.npz", compressed=True)
+    to_int8_tflite(pruned, calibration, "gesture_model_pruned_int8.tflite")
+
+    # 🔹 與 float 模型比較
+    report = {"float": evaluate("gesture_model.h5", "keras", X_val, y_val, reference)}
+    if os.path.exists("gesture_model.npz"):
+        report["float_numpy"] = evaluate("gesture_model.npz", "numpy", X_val, y_val, reference)
+    report["int8"] = evaluate("gesture_model_int8.tflite", "tflite", X_val, y_val, reference)
+    report["pruned"] = evaluate("gesture_model_pruned.npz", "numpy", X_val, y_val, reference)
+    report["pruned_int8"] = evaluate("gesture_model_pruned_int8.tflite", "tflite", X_val, y_val, reference)
+    report["sparsity"] = args.sparsity
+
+    with open("compress_report.json", "w", encoding="utf8") as f:
+        json.dump(report, f, indent=2)
+    for name, r in report.items():
+        if isinstance(r, dict):
+            print(f"{name:<12} 準確率 {r['accuracy'] * 100:6.2f}%  與 float 一致 {r['agreement_with_float'] * 100:6.2f}%  "
+                  f"{r['size_bytes'] / 1024:8.1f} KB  載入 {r['load_seconds'] * 1000:7.1f} ms")
+    print("✅ Report saved as 'compress_report.json'.")
+
+if __name__ == '__main__':
+    main()
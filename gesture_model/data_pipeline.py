@@ -0,0 +1,149 @@
+"""串流式訓練資料讀取 (tf.data)
+
+資料來源可以是 CSV 資料夾或 landmark_store.py 的二進位資料集 (含 index.json 的資料夾)。
+
+CSV：每個 CSV 為一個 shard，逐行讀取、以有限大小的緩衝區打亂、平行解析並預先讀取下一批。
+訓練 / 驗證集依「每個檔案內的列號」切分，舊版 train_materials.py 每個 CSV 只收集一種手勢，
+因此每個手勢都會以相同比例切分 (分層抽樣)。
+二進位資料集：以 memory-map 逐個 chunk 讀取，依整體列號切分 (各手勢的比例近似相同)。
+"""
+import csv, os, sys
+import numpy as np
+import tensorflow as tf
+from landmark_store import LandmarkStore
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.landmark_features import FEATURE_SIZE, extract_features
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+def list_shards(data_folder):
+    """回傳資料夾中所有 CSV 檔 (依檔名排序)"""
+    return sorted(os.path.join(data_folder, f) for f in os.listdir(data_folder) if f.endswith(".csv"))
+
+def read_labels(files):
+    """逐行掃描所有 CSV 取得手勢名稱，回傳排序後的標籤 (與 LabelEncoder 相同順序)
+
+    一個 CSV 可能含有多種手勢，只看第一筆會漏掉其他標籤 (查表得到 -1，one-hot 變成全 0)。
+    """
+    labels = set()
+    for path in files:
+        with open(path, "r", encoding="utf8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            row = next(reader, None)
+            if header is None or row is None:
+                continue
+            if len(row) != FEATURE_SIZE + 1:
+                raise ValueError(f"❌ {path} 的特徵數量 {len(row) - 1} 與模型輸入 {FEATURE_SIZE} 不符")
+            labels.add(row[-1])
+            labels.update(row[-1] for row in reader if row)
+    return sorted(labels)
+
+def in_validation(index, val_fraction):
+    """依列號決定是否屬於驗證集 (乘上質數打散，避免連續收集的樣本集中在同一邊)"""
+    return (index * 7919) % 100 < int(val_fraction * 100)
+
+def make_dataset(files, labels, training, val_fraction=0.2, batch_size=32, shuffle_buffer=10000, seed=42):
+    """建立訓練 (training=True) 或驗證資料集，輸出 (特徵, one-hot 標籤) 批次"""
+    table = tf.lookup.StaticHashTable(
+        tf.lookup.KeyValueTensorInitializer(tf.constant(labels), tf.range(len(labels), dtype=tf.int64)), -1)
+
+    def read_shard(path):
+        rows = tf.data.TextLineDataset(path).skip(1).enumerate()  # 略過標題列
+        if training:
+            rows = rows.filter(lambda i, line: tf.logical_not(in_validation(i, val_fraction)))
+        else:
+            rows = rows.filter(lambda i, line: in_validation(i, val_fraction))
+        return rows.map(lambda i, line: line)
+
+    def parse(line):
+        fields = tf.io.decode_csv(line, record_defaults=[[0.0]] * FEATURE_SIZE + [[""]])
+        return tf.stack(fields[:-1]), tf.one_hot(table.lookup(fields[-1]), len(labels))
+
+    dataset = tf.data.Dataset.from_tensor_slices(files)
+    if training:
+        dataset = dataset.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+    # 同時從多個 shard 交錯讀取，讓每個批次都混合不同手勢
+    dataset = dataset.interleave(read_shard, cycle_length=min(len(files), 64), block_length=1,
+                                 num_parallel_calls=AUTOTUNE, deterministic=not training)
+    dataset = dataset.map(parse, num_parallel_calls=AUTOTUNE)
+    if training:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+def make_store_dataset(store, labels, training, val_fraction=0.2, batch_size=32, shuffle_buffer=10000, seed=42,
+                       feature_set="xy"):
+    """由二進位資料集建立訓練或驗證資料集 (chunk 以 memory-map 讀取)"""
+    feature_size = extract_features(np.zeros((1, 21, 3), dtype=np.float32), feature_set).shape[1]
+    remap = np.array([labels.index(label) for label in store.labels], dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    def generator():
+        offsets = store.offsets()
+        order = rng.permutation(len(offsets)) if training else range(len(offsets))
+        for i in order:
+            # 一次只開啟一個 chunk：取出需要的列 (複製) 後立刻釋放 memory-map，檔案描述子不會累積
+            features, meta = store.chunk(i)
+            mask = in_validation(np.arange(offsets[i], offsets[i] + len(features)), val_fraction) != training
+            batch = (extract_features(features[mask], feature_set), remap[meta["label"][mask]]) if mask.any() else None
+            del features, meta
+            if batch is not None:
+                yield batch
+
+    dataset = tf.data.Dataset.from_generator(generator, output_signature=(
+        tf.TensorSpec((None, feature_size), tf.float32), tf.TensorSpec((None,), tf.int64))).unbatch()
+    dataset = dataset.map(lambda x, y: (x, tf.one_hot(y, len(labels))), num_parallel_calls=AUTOTUNE)
+    if training:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+def load_datasets(data_folder, val_fraction=0.2, batch_size=32, shuffle_buffer=10000, seed=42, feature_set="xy"):
+    """回傳 (訓練資料集, 驗證資料集, 標籤)"""
+    if LandmarkStore.exists(data_folder):
+        store = LandmarkStore(data_folder)
+        labels = sorted(store.labels)
+        train_ds = make_store_dataset(store, labels, True, val_fraction, batch_size, shuffle_buffer, seed, feature_set)
+        val_ds = make_store_dataset(store, labels, False, val_fraction, batch_size, shuffle_buffer, seed, feature_set)
+        return train_ds, val_ds, labels
+
+    if feature_set != "xy":
+        raise ValueError("❌ CSV 只有 (x, y)，其他特徵組合請先用 landmark_store.py 轉換為二進位資料集")
+    files = list_shards(data_folder)
+    if not files:
+        raise ValueError(f"❌ {data_folder} 中沒有 CSV 檔")
+    labels = read_labels(files)
+    train_ds = make_dataset(files, labels, True, val_fraction, batch_size, shuffle_buffer, seed)
+    val_ds = make_dataset(files, labels, False, val_fraction, batch_size, shuffle_buffer, seed)
+    return train_ds, val_ds, labels
+
+def load_arrays(data_folder, max_samples=None, val_fraction=0.2):
+    """將資料整份載入記憶體 (超參數搜尋需要重複訓練多次時使用)
+
+    回傳 (關鍵點 (筆數, 21, 3), 標籤編號, 標籤, 驗證集遮罩)；CSV 沒有 z，補 0。
+    驗證集遮罩與 load_datasets 的切分相同 (CSV 依每個檔案內的列號，二進位資料集依整體列號)。
+    """
+    if LandmarkStore.exists(data_folder):
+        store = LandmarkStore(data_folder)
+        labels = sorted(store.labels)
+        remap = np.array([labels.index(label) for label in store.labels], dtype=np.int64)
+        landmarks = np.empty((len(store), *store.index["sample_shape"]), dtype=np.float32)
+        y = np.empty(len(store), dtype=np.int64)
+        for offset, (features, meta) in zip(store.offsets(), store.chunks()):
+            landmarks[offset:offset + len(features)] = features  # 逐個 chunk 複製，不同時開啟所有 memory-map
+            y[offset:offset + len(features)] = remap[meta["label"]]
+        rows = np.arange(len(y))
+    else:
+        import pandas as pd
+        shards = [pd.read_csv(path) for path in list_shards(data_folder)]
+        data = pd.concat(shards, ignore_index=True)
+        labels = sorted(data.iloc[:, -1].astype(str).unique())
+        landmarks = np.zeros((len(data), 21, 3), dtype=np.float32)
+        landmarks[:, :, :2] = data.iloc[:, :-1].to_numpy(dtype=np.float32).reshape(-1, 21, 2)
+        y = data.iloc[:, -1].astype(str).map({label: i for i, label in enumerate(labels)}).to_numpy()
+        rows = np.concatenate([np.arange(len(shard)) for shard in shards])  # 與 make_dataset 相同，依每個檔案內的列號
+    val_mask = in_validation(rows, val_fraction)
+    if max_samples and len(y) > max_samples:
+        keep = np.random.default_rng(0).choice(len(y), max_samples, replace=False)
+        landmarks, y, val_mask = landmarks[keep], y[keep], val_mask[keep]
+    return landmarks, y, labels, val_mask
@@ -0,0 +1,29 @@
+import os, sys
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.gesture_backend import export_numpy_weights, NumpyBackend, TFLiteBackend
+
+# 🔹 載入訓練好的 Keras 模型
+model = load_model("gesture_model.h5")
+
+# 🔹 匯出 NumPy 權重 (.npz)
+export_numpy_weights(model, "gesture_model.npz")
+
+# 🔹 匯出 TFLite 模型
+tflite_model = tf.lite.TFLiteConverter.from_keras_model(model).convert()
+with open("gesture_model.tflite", "wb") as f:
+    f.write(tflite_model)
+
+# 🔹 檢查各後端輸出是否與 Keras 一致
+data = np.random.default_rng(0).random((256, model.input_shape[1]), dtype=np.float32)
+expected = model(data, training=False).numpy()
+for name, backend in (("numpy", NumpyBackend("gesture_model.npz")), ("tflite", TFLiteBackend("gesture_model.tflite"))):
+    diff = np.abs(backend.predict(data) - expected).max()
+    if diff > 1e-5:
+        raise ValueError(f"❌ {name} 後端輸出與 Keras 不一致 (最大誤差 {diff:.2e})")
+    print(f"✅ {name} 後端與 Keras 一致 (最大誤差 {diff:.2e})")
+
+print("✅ Model exported as 'gesture_model.npz' and 'gesture_model.tflite'.")
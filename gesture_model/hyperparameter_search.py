@@ -0,0 +1,160 @@
+"""手勢 MLP 的超參數搜尋：在所有 CPU 核心上平行訓練各種模型，比較準確率與推論延遲
+
+用法 (在 gesture_model 資料夾執行)：
+    python hyperparameter_search.py --data gesture_store --min-accuracy 0.95
+    python hyperparameter_search.py --trials 20          # 隨機抽 20 組，不跑完整網格
+
+輸出：
+    search_results/results.csv      每個候選模型的結果
+    search_results/pareto_report.md 準確率 ↔ 延遲的 Pareto 前緣
+    search_results/<候選名稱>.npz    每個候選模型的 NumPy 權重 (複製為 gesture_model.npz 即可在即時辨識使用，
+                                     並將設定檔 feature_set 設為相同的特徵組合)
+"""
+import argparse, csv, itertools, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.config import get_setting
+from cogs.landmark_features import FEATURE_SETS, extract_features
+from cogs.gesture_backend import NumpyBackend, export_numpy_weights
+
+# 🔹 搜尋空間 (第一層寬度 × 層數：之後每層寬度減半，與原本 128 → 64 相同)
+FIRST_WIDTHS = [16, 32, 64, 128]
+DEPTHS = [1, 2, 3]
+DROPOUTS = [0.0, 0.1, 0.2]
+OUTPUT_DIR = "search_results"
+LATENCY_ROUNDS = 1000
+
+# 每個工作程序各自載入一份資料
+data = None
+
+def init_worker(data_folder, max_samples, val_fraction):
+    global data
+    import tensorflow as tf
+    # 每個程序只用一個執行緒，讓 N 個程序剛好用滿 N 個核心
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    from data_pipeline import load_arrays
+    landmarks, y, labels, val_mask = load_arrays(data_folder, max_samples, val_fraction)
+    data = {"landmarks": landmarks, "y": y, "labels": labels, "val_mask": val_mask}
+
+def candidates():
+    """完整網格"""
+    for first_width, depth, dropout, feature_set in itertools.product(FIRST_WIDTHS, DEPTHS, DROPOUTS, FEATURE_SETS):
+        widths = tuple(max(first_width >> i, 4) for i in range(depth))
+        yield {"name": f"{feature_set}_{'-'.join(map(str, widths))}_d{dropout}",
+               "widths": widths, "dropout": dropout, "feature_set": feature_set}
+
+def measure_latency(backend, x):
+    """回傳推論延遲中位數 (微秒)"""
+    backend.predict(x)
+    times = []
+    for _ in range(LATENCY_ROUNDS):
+        start = time.perf_counter()
+        backend.predict(x)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1e6)
+
+def evaluate(candidate, epochs, batch_size):
+    """(工作程序) 訓練一個候選模型，回傳準確率、參數量與延遲"""
+    from tensorflow.keras.utils import to_categorical
+    from train_gesture_model import build_model
+
+    X = extract_features(data["landmarks"], candidate["feature_set"])
+    y = to_categorical(data["y"], len(data["labels"]))
+    train, val = ~data["val_mask"], data["val_mask"]
+
+    start = time.perf_counter()
+    model = build_model(X.shape[1], y.shape[1], candidate["widths"], candidate["dropout"])
+    model.fit(X[train], y[train], epochs=epochs, batch_size=batch_size, verbose=0)
+    train_seconds = time.perf_counter() - start
+    _, accuracy = model.evaluate(X[val], y[val], verbose=0)
+
+    # 報告建議以 NumPy 後端部署，延遲也只以 NumPy 後端量測 (其他後端見報告說明)
+    npz_path = os.path.join(OUTPUT_DIR, candidate["name"] + ".npz")
+    export_numpy_weights(model, npz_path)
+    backend = NumpyBackend(npz_path)
+    return dict(candidate, widths="-".join(map(str, candidate["widths"])), accuracy=float(accuracy),
+                params=int(model.count_params()), train_seconds=train_seconds,
+                latency_1_us=measure_latency(backend, X[:1]),     # 單手
+                latency_2_us=measure_latency(backend, X[:2]),     # 雙手 (即時辨識的批次)
+                latency_64_us=measure_latency(backend, X[:64]))   # 大批次 (離線處理)
+
+def pareto_front(results):
+    """準確率越高、單手延遲越低越好；回傳沒有被其他模型同時勝過的候選 (依延遲排序)"""
+    front = [r for r in results
+             if not any(o["accuracy"] >= r["accuracy"] and o["latency_1_us"] <= r["latency_1_us"] and
+                        (o["accuracy"] > r["accuracy"] or o["latency_1_us"] < r["latency_1_us"]) for o in results)]
+    return sorted(front, key=lambda r: r["latency_1_us"])
+
+def write_report(results, min_accuracy):
+    fields = ["name", "feature_set", "widths", "dropout", "accuracy", "params",
+              "latency_1_us", "latency_2_us", "latency_64_us", "train_seconds"]
+    with open(os.path.join(OUTPUT_DIR, "results.csv"), "w", newline="", encoding="utf8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(sorted(results, key=lambda r: -r["accuracy"]))
+
+    front = pareto_front(results)
+    passing = [r for r in front if r["accuracy"] >= min_accuracy]
+    lines = ["# 手勢模型 準確率 ↔ 延遲 Pareto 前緣", "",
+             f"共 {len(results)} 個候選，準確率門檻 {min_accuracy * 100:.1f}%", "",
+             "延遲只以 NumPy 後端 (inference_backend 為 numpy) 量測，keras / tflite 後端的延遲不同，不能直接比較。", "",
+             "| 候選 | 特徵 | 隱藏層 | dropout | 準確率 | 參數量 | 單手 (µs) | 雙手 (µs) | 64 筆 (µs) |",
+             "|---|---|---|---|---|---|---|---|---|"]
+    for r in front:
+        mark = " ✅" if r["accuracy"] >= min_accuracy else ""
+        lines.append(f"| {r['name']}{mark} | {r['feature_set']} | {r['widths']} | {r['dropout']} | "
+                     f"{r['accuracy'] * 100:.2f}% | {r['params']} | {r['latency_1_us']:.1f} | "
+                     f"{r['latency_2_us']:.1f} | {r['latency_64_us']:.1f} |")
+    lines.append("")
+    if passing:
+        best = passing[0]
+        lines.append(f"建議使用 **{best['name']}**：達到門檻中延遲最低 (單手 {best['latency_1_us']:.1f} µs)。")
+        lines.append(f"將 `{OUTPUT_DIR}/{best['name']}.npz` 複製為 `gesture_model.npz`，"
+                     f"並在設定檔設定 `\"inference_backend\": \"numpy\"`、`\"feature_set\": \"{best['feature_set']}\"`。")
+    else:
+        lines.append("⚠️ 沒有候選達到準確率門檻。")
+    with open(os.path.join(OUTPUT_DIR, "pareto_report.md"), "w", encoding="utf8") as f:
+        f.write("\n".join(lines) + "\n")
+    return passing[0] if passing else None
+
+def main():
+    parser = argparse.ArgumentParser(description="手勢模型超參數搜尋")
+    parser.add_argument("--data", default="gesture_store", help="手勢數據資料夾 (二進位資料集或 CSV)")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--trials", type=int, default=None, help="隨機抽樣的候選數量 (預設跑完整網格)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--min-accuracy", type=float, default=0.95, help="準確率門檻")
+    parser.add_argument("--max-samples", type=int, default=None, help="最多使用幾筆資料")
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    args = parser.parse_args()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    backend = get_setting("inference_backend", "keras")  # 與 model_registry 的預設相同
+    if backend != "numpy":
+        print(f"⚠️ 延遲以 NumPy 後端量測，與目前設定的 {backend} 後端不同")
+    grid = list(candidates())
+    if args.trials and args.trials < len(grid):
+        grid = random.Random(42).sample(grid, args.trials)
+    print(f"📢 {len(grid)} 個候選，使用 {args.workers} 個程序")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.data, args.max_samples, args.val_fraction)) as pool:
+        futures = [pool.submit(evaluate, candidate, args.epochs, args.batch_size) for candidate in grid]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"✅ [{len(results)}/{len(grid)}] {result['name']}: {result['accuracy'] * 100:.2f}%，"
+                  f"單手 {result['latency_1_us']:.1f} µs")
+
+    best = write_report(results, args.min_accuracy)
+    print(f"📁 報告已存到 {OUTPUT_DIR}/pareto_report.md")
+    if best:
+        print(f"🎯 建議模型: {best['name']} ({best['accuracy'] * 100:.2f}%，單手 {best['latency_1_us']:.1f} µs)")
+
+if __name__ == '__main__':
+    main()
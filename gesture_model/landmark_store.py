@@ -0,0 +1,200 @@
+"""只會附加 (append-only) 的二進位關鍵點資料集
+
+資料夾結構：
+    index.json                  標籤、左右手名稱、每個 chunk 的檔名與筆數
+    chunk_000000.npy            float32 (筆數, 21, 3) 關鍵點
+    chunk_000000_meta.npy       每筆的 label / hand / session / timestamp
+
+收集時每累積 chunk_size 筆，或已累積 min_chunk 筆且距上次寫出超過 flush_interval 秒就寫出一個 chunk，
+程式當掉最多只會遺失最後一段；已寫出的 chunk 不會再被修改或覆寫 (compact 除外)。
+訓練時一次只以 memory-map 開啟一個 chunk，不必整份載入記憶體；
+每個 memory-map 都佔用一個檔案描述子，chunk 數量太多時可用 compact 合併。
+同一個資料夾一次只能有一個寫入者。
+
+將舊的 CSV 轉換為此格式 / 合併小 chunk：
+    python landmark_store.py convert gesture_data gesture_store
+    python landmark_store.py compact gesture_store
+"""
+import json, os, sys, time
+import numpy as np
+
+META_DTYPE = np.dtype([("label", np.int16), ("hand", np.int8), ("session", np.int64), ("timestamp", np.float64)])
+HANDS = ["Left", "Right"]  # hand 欄位 -1 表示未知
+
+def _chunk_name(root, number):
+    """還沒被使用的 chunk 檔名 (compact 之後編號可能已被占用)"""
+    while os.path.exists(os.path.join(root, f"chunk_{number:06d}.npy")):
+        number += 1
+    return f"chunk_{number:06d}"
+
+def _save_index(root, index):
+    tmp_path = os.path.join(root, "index.json.tmp")
+    with open(tmp_path, "w", encoding="utf8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(root, "index.json"))
+
+def _atomic_save(path, array):
+    """先寫到暫存檔再改名，避免寫到一半當掉留下損壞的檔案"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+class LandmarkStore:
+    """讀取資料集"""
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, "index.json"), "r", encoding="utf8") as f:
+            self.index = json.load(f)
+
+    @staticmethod
+    def exists(root):
+        return os.path.exists(os.path.join(root, "index.json"))
+
+    @property
+    def labels(self):
+        return self.index["labels"]
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self.index["chunks"])
+
+    def chunk(self, i, mmap=True):
+        """開啟第 i 個 chunk，回傳 (關鍵點, meta)，預設以 memory-map 開啟
+
+        memory-map 在陣列 (與其 view) 被釋放時才關閉檔案，呼叫端不要同時保留多個 chunk
+        """
+        mode = "r" if mmap else None
+        base = os.path.join(self.root, self.index["chunks"][i]["file"])
+        return np.load(base + ".npy", mmap_mode=mode), np.load(base + "_meta.npy", mmap_mode=mode)
+
+    def chunks(self, mmap=True):
+        """依序回傳每個 chunk 的 (關鍵點, meta)，一次只開啟一個 (不要把結果整個轉成 list)"""
+        for i in range(len(self.index["chunks"])):
+            yield self.chunk(i, mmap)
+
+    def offsets(self):
+        """每個 chunk 第一筆資料的整體列號 (不需開啟 chunk)"""
+        return np.cumsum([0] + [chunk["rows"] for chunk in self.index["chunks"]])[:-1]
+
+class LandmarkStoreWriter:
+    """附加寫入資料集"""
+    def __init__(self, root, session=None, chunk_size=4096, flush_interval=5.0, sample_shape=(21, 3), min_chunk=1024):
+        """
+        chunk_size:     緩衝區大小，累積這麼多筆就寫出
+        flush_interval: 已累積 min_chunk 筆時，距上次寫出超過幾秒就寫出 (避免產生大量小 chunk)
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        if LandmarkStore.exists(root):
+            self.index = LandmarkStore(root).index
+            if tuple(self.index["sample_shape"]) != tuple(sample_shape):
+                raise ValueError(f"❌ {root} 的資料形狀 {self.index['sample_shape']} 與 {list(sample_shape)} 不符")
+        else:
+            self.index = {"sample_shape": list(sample_shape), "labels": [], "hands": HANDS, "chunks": []}
+        self.session = int(time.time()) if session is None else session
+        self.flush_interval = flush_interval
+        self.min_chunk = min(min_chunk, chunk_size)
+        # 預先配置緩衝區，收集時不會一直配置新記憶體
+        self.features = np.empty((chunk_size, *sample_shape), dtype=np.float32)
+        self.meta = np.empty(chunk_size, dtype=META_DTYPE)
+        self.count = 0
+        self.total = sum(chunk["rows"] for chunk in self.index["chunks"])  # 含尚未寫出的總筆數
+        self.last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def label_id(self, label):
+        if label not in self.index["labels"]:
+            self.index["labels"].append(label)
+        return self.index["labels"].index(label)
+
+    def append(self, landmarks, label, hand=None, timestamp=None):
+        """加入一筆資料 (landmarks 形狀為 sample_shape；hand 為 "Left" / "Right" / None)"""
+        self.features[self.count] = landmarks
+        self.meta[self.count] = (self.label_id(label), HANDS.index(hand) if hand in HANDS else -1,
+                                 self.session, time.time() if timestamp is None else timestamp)
+        self.count += 1
+        self.total += 1
+        if self.count == len(self.features):
+            self.flush()
+        else:
+            self.maybe_flush()
+
+    def maybe_flush(self):
+        """已累積 min_chunk 筆且距離上次寫出超過 flush_interval 秒時寫出 (收集迴圈中可每幀呼叫)"""
+        if self.count >= self.min_chunk and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """把緩衝區寫成新的 chunk，並更新 index.json"""
+        self.last_flush = time.monotonic()
+        if self.count == 0:
+            return
+        name = _chunk_name(self.root, len(self.index["chunks"]))
+        _atomic_save(os.path.join(self.root, name + ".npy"), self.features[:self.count])
+        _atomic_save(os.path.join(self.root, name + "_meta.npy"), self.meta[:self.count])
+        self.index["chunks"].append({"file": name, "rows": self.count})
+        _save_index(self.root, self.index)
+        self.count = 0
+
+    def close(self):
+        self.flush()
+
+def convert_csv_to_store(csv_folder, store_root, chunk_size=4096):
+    """將 train_materials.py 舊版產生的 CSV (x0, y0, ..., x20, y20, 標籤) 轉換為二進位資料集 (z 補 0)"""
+    import pandas as pd
+    with LandmarkStoreWriter(store_root, session=0, chunk_size=chunk_size, flush_interval=float("inf")) as writer:
+        for file in sorted(f for f in os.listdir(csv_folder) if f.endswith(".csv")):
+            path = os.path.join(csv_folder, file)
+            timestamp = os.path.getmtime(path)
+            for df in pd.read_csv(path, chunksize=chunk_size):
+                landmarks = np.zeros((len(df), 21, 3), dtype=np.float32)
+                landmarks[:, :, :2] = df.iloc[:, :-1].to_numpy(dtype=np.float32).reshape(-1, 21, 2)
+                for sample, label in zip(landmarks, df.iloc[:, -1]):
+                    writer.append(sample, str(label), None, timestamp)
+            print(f"✅ {file} 轉換完成")
+    print(f"📁 共 {len(LandmarkStore(store_root))} 筆資料已存到【{store_root}】")
+
+def compact(store_root, chunk_size=65536):
+    """把小 chunk 依序合併成最多 chunk_size 筆的大 chunk (資料順序不變)
+
+    新 chunk 全部寫好後才替換 index.json，最後刪除舊檔案；過程中當掉時舊的 index 仍然有效。
+    """
+    store = LandmarkStore(store_root)
+    old_files = [chunk["file"] for chunk in store.index["chunks"]]
+    sample_shape = tuple(store.index["sample_shape"])
+    new_chunks, features, meta, rows = [], [], [], 0
+
+    def write():
+        name = _chunk_name(store_root, len(old_files) + len(new_chunks))
+        _atomic_save(os.path.join(store_root, name + ".npy"), np.concatenate(features).reshape(-1, *sample_shape))
+        _atomic_save(os.path.join(store_root, name + "_meta.npy"), np.concatenate(meta))
+        new_chunks.append({"file": name, "rows": rows})
+
+    for chunk_features, chunk_meta in store.chunks(mmap=False):
+        features.append(chunk_features)
+        meta.append(chunk_meta)
+        rows += len(chunk_meta)
+        if rows >= chunk_size:
+            write()
+            features, meta, rows = [], [], 0
+    if rows:
+        write()
+    _save_index(store_root, dict(store.index, chunks=new_chunks))
+    for name in old_files:
+        os.remove(os.path.join(store_root, name + ".npy"))
+        os.remove(os.path.join(store_root, name + "_meta.npy"))
+    print(f"✅ {len(old_files)} 個 chunk 合併為 {len(new_chunks)} 個")
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == "convert":
+        convert_csv_to_store(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) == 3 and sys.argv[1] == "compact":
+        compact(sys.argv[2])
+    else:
+        print("用法: python landmark_store.py convert <csv 資料夾> <資料集資料夾>\n"
+              "      python landmark_store.py compact <資料集資料夾>")
@@ -1,9 +1,13 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import json
+import json, os, sys
 from tensorflow.keras.models import load_model
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.config import get_setting
+from cogs.landmark_features import landmarks_to_array, extract_features
+
 # 🔹 載入訓練好的 AI 模型
 model = load_model("gesture_model.h5")
 
@@ -11,6 +15,9 @@ model = load_model("gesture_model.h5")
 with open("gesture_labels.json", "r") as f:
     gesture_labels = json.load(f)
 
+# 🔹 特徵組合 (需與訓練模型時相同，hyperparameter_search.py 的建議會寫在設定檔 feature_set)
+feature_set = get_setting("feature_set", "xy")
+
 # 🔹 設定攝影機（0 = USB 相機，1 = 其他相機）
 cap = cv2.VideoCapture(0)
 
@@ -21,11 +28,7 @@ mp_draw = mp.solutions.drawing_utils
 
 def predict_gesture(hand_landmarks):
     """使用 AI 模型預測手勢"""
-    landmarks = []
-    for lm in hand_landmarks.landmark:
-        landmarks.extend([lm.x, lm.y])
-
-    data = np.array(landmarks).reshape(1, 42)
+    data = extract_features(landmarks_to_array([hand_landmarks]), feature_set)
     prediction = model.predict(data)[0]
     top_index = np.argmax(prediction)
     confidence = prediction[top_index]
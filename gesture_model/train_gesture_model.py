@@ -1,66 +1,96 @@
-import os
-import pandas as pd
-# import numpy as np
-import json
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+import argparse, json, os, sys
+import numpy as np
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout
 from tensorflow.keras.utils import to_categorical
+from data_pipeline import load_datasets, load_arrays
 
-# 🔹 設定手勢數據資料夾
-data_folder = "gesture_data"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.config import get_setting
+from cogs.gesture_backend import export_numpy_weights
+from cogs.motion_features import LEAD_FRAMES, SEQUENCE_POINTS, sequence_features
 
-# 🔹 讀取所有 CSV 檔案
-all_files = [f for f in os.listdir(data_folder) if f.endswith(".csv")]
+def build_model(input_size, num_classes, widths=(128, 64), dropout=0.2):
+    """構建 MLP 神經網絡模型"""
+    layers = []
+    for i, width in enumerate(widths):
+        layers.append(Dense(width, activation="relu", input_shape=(input_size,)) if i == 0 else Dense(width, activation="relu"))
+        if dropout:
+            layers.append(Dropout(dropout))
+    layers.append(Dense(num_classes, activation="softmax"))  # 輸出層
+    model = Sequential(layers)
+    model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+    return model
 
-# 🔹 合併所有手勢數據
-data_list = []
-for file in all_files:
-    df = pd.read_csv(os.path.join(data_folder, file))
-    data_list.append(df)
+def train_motion_model(args):
+    """訓練動態手勢模型：motion_store 中的關鍵點序列 → MotionHistory 特徵 → 小型 MLP
 
-# 🔹 合併為一個 DataFrame
-data = pd.concat(data_list, ignore_index=True)
+    特徵在訓練前一次算好 (與即時辨識逐幀累計的結果相同)，模型匯出成 numpy 後端使用的 npz，
+    推論只需要兩次小矩陣乘法，與靜態手勢模型在同一個延遲範圍內。
+    """
+    sequences, y, labels, val = load_arrays(args.data)
+    if sequences.ndim != 4 or sequences.shape[2] != SEQUENCE_POINTS:
+        raise ValueError(f"❌ {args.data} 不是動態手勢序列 (形狀 {sequences.shape[1:]})，請用 train_materials.py 按 R 收集")
+    window = sequences.shape[1] - LEAD_FRAMES
+    x = sequence_features(sequences)
+    y_onehot = to_categorical(y, len(labels))
 
-# 🔹 分割特徵 (X) 和標籤 (y)
-X = data.iloc[:, :-1].values  # 取所有座標 (x, y)
-y = data.iloc[:, -1].values   # 取標籤
+    model = build_model(x.shape[1], len(labels), args.widths, args.dropout)
+    model.fit(x[~val], y_onehot[~val], epochs=args.epochs, batch_size=args.batch_size,
+              validation_data=(x[val], y_onehot[val]), shuffle=True)
+    loss, accuracy = model.evaluate(x[val], y_onehot[val])
+    print(f"🎯 Motion Test Accuracy: {accuracy * 100:.2f}% ({window} frames, {x.shape[1]} features)")
 
-# 🔹 轉換標籤為數字（不區分左右手）
-label_encoder = LabelEncoder()
-y = label_encoder.fit_transform(y)
+    model.save("motion_model.h5")
+    export_numpy_weights(model, "motion_model.npz")
+    with open("motion_labels.json", "w") as f:
+        json.dump(labels, f)
+    print("✅ Motion model saved as 'motion_model.h5' / 'motion_model.npz', labels as 'motion_labels.json'.")
 
-# 🔹 轉換為 One-hot 編碼
-y = to_categorical(y)
+def main():
+    parser = argparse.ArgumentParser(description="訓練手勢辨識模型")
+    parser.add_argument("--data", default="gesture_store", help="手勢數據資料夾 (二進位資料集或 CSV)")
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--shuffle-buffer", type=int, default=10000, help="打亂資料用的緩衝區大小 (筆)")
+    parser.add_argument("--feature-set", default=get_setting("feature_set", "xy"),
+                        help="特徵組合 (需與設定檔 feature_set 相同，預設即為設定檔的值)")
+    parser.add_argument("--widths", type=int, nargs="+", default=[128, 64], help="各隱藏層的寬度")
+    parser.add_argument("--dropout", type=float, default=0.2)
+    parser.add_argument("--motion", action="store_true",
+                        help="訓練動態手勢模型 (資料預設為 motion_store，寬度預設為 64 32)")
+    args = parser.parse_args()
 
-# 🔹 分割訓練集與測試集 (80% 訓練，20% 測試)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    if args.motion:
+        if args.data == parser.get_default("data"):
+            args.data = "motion_store"
+        if args.widths == parser.get_default("widths"):
+            args.widths = [64, 32]
+        train_motion_model(args)
+        return
 
-# 🔹 構建 MLP 神經網絡模型
-model = Sequential([
-    Dense(128, activation="relu", input_shape=(X.shape[1],)),
-    Dropout(0.2),
-    Dense(64, activation="relu"),
-    Dropout(0.2),
-    Dense(y.shape[1], activation="softmax")  # 輸出層
-])
+    # 🔹 以串流方式讀取手勢數據 (80% 訓練，20% 驗證，依手勢分層)
+    train_ds, val_ds, labels = load_datasets(args.data, batch_size=args.batch_size, shuffle_buffer=args.shuffle_buffer,
+                                             feature_set=args.feature_set)
 
-model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+    # 🔹 構建並訓練模型
+    model = build_model(train_ds.element_spec[0].shape[-1], len(labels), args.widths, args.dropout)
+    model.fit(train_ds, epochs=args.epochs, validation_data=val_ds)
 
-# 🔹 訓練模型
-model.fit(X_train, y_train, epochs=50, batch_size=32, validation_data=(X_test, y_test))
+    # 🔹 儲存模型
+    model.save("gesture_model.h5")
 
-# 🔹 儲存模型
-model.save("gesture_model.h5")
+    # 🔹 儲存標籤對應
+    with open("gesture_labels.json", "w") as f:
+        json.dump(labels, f)
 
-# 🔹 儲存標籤對應
-with open("gesture_labels.json", "w") as f:
-    json.dump(label_encoder.classes_.tolist(), f)
+    # 🔹 評估模型準確率
+    loss, accuracy = model.evaluate(val_ds)
+    print(f"🎯 Test Accuracy: {accuracy * 100:.2f}%")
 
-# 🔹 評估模型準確率
-loss, accuracy = model.evaluate(X_test, y_test)
-print(f"🎯 Test Accuracy: {accuracy * 100:.2f}%")
+    print("✅ Model training complete! Model saved as 'gesture_model.h5'.")
+    print("✅ Gesture labels saved as 'gesture_labels.json'.")
+    print("📢 Run 'export_gesture_model.py' to export the numpy / tflite inference backends.")
 
-print("✅ Model training complete! Model saved as 'gesture_model.h5'.")
-print("✅ Gesture labels saved as 'gesture_labels.json'.")
+if __name__ == '__main__':
+    main()
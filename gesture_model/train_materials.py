@@ -1,7 +1,12 @@
 import cv2
 import mediapipe as mp
-import pandas as pd
-import os
+import os, sys, time
+import numpy as np
+from landmark_store import LandmarkStoreWriter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cogs.landmark_features import landmarks_to_array
+from cogs.motion_features import DEFAULT_WINDOW, LEAD_FRAMES, SEQUENCE_POINTS, pack_frame
 
 # 🔹 設定攝影機（0 為 USB 攝影機，1 為次選）
 cap = cv2.VideoCapture(0)
@@ -14,18 +19,31 @@ mp_draw = mp.solutions.drawing_utils
 # 🔹 設定手勢名稱（請修改成你要收集的手勢）
 gesture_name = "palm"
 
-# 🔹 儲存資料的陣列
-collected_data = []
-
-# 🔹 創建存放資料的資料夾
-data_folder = "gesture_data"
-if not os.path.exists(data_folder):
-    os.makedirs(data_folder)
+# 🔹 附加寫入二進位資料集 (邊收集邊寫入，不會覆寫之前收集的資料)
+data_folder = "gesture_store"
+writer = LandmarkStoreWriter(data_folder)
+collected = 0
+
+# 🔹 動態手勢 (揮手、滑動、畫圈)：按 R 後連續記錄 sequence_length 幀第一隻手的關鍵點
+#    也要收集一些名稱為 "none" 的一般動作，模型才分得出「沒有動態手勢」
+motion_name = "swipe_left"
+sequence_length = LEAD_FRAMES + DEFAULT_WINDOW  # 視窗長度 (模型輸入) 由此決定
+motion_folder = "motion_store"
+# 一筆序列比單幀大得多、收集得也慢，緩衝區與最小 chunk 都小一些
+motion_writer = LandmarkStoreWriter(motion_folder, chunk_size=256, min_chunk=32,
+                                    sample_shape=(sequence_length, SEQUENCE_POINTS, 3))
+sequence = np.empty((sequence_length, SEQUENCE_POINTS, 3), dtype=np.float32)  # 每幀關鍵點 + 時間
+sequence_start = 0.0
+sequence_frames = None  # 記錄中的幀數 (None 表示沒有在記錄)
+sequence_hand = None
+recorded = 0
 
 print(f"📢 Collecting gesture [{gesture_name}], press 'S' to save, 'Q' to quit.")
+print(f"📢 Press 'R' to record a {sequence_length}-frame motion [{motion_name}].")
 
 while True:
     ret, frame = cap.read()
+    frame_time = time.perf_counter()  # 記錄實際的幀間隔，訓練時以此計算速度
     if not ret:
         print("❌ Failed to capture image")
         break
@@ -34,17 +52,30 @@ while True:
     rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     result = hands.process(rgb_image)
 
+    # 記錄動態手勢序列 (中途手離開畫面就放棄這一筆)
+    if sequence_frames is not None:
+        if result.multi_hand_landmarks:
+            pack_frame(landmarks_to_array(result.multi_hand_landmarks[:1])[0], frame_time - sequence_start,
+                       sequence[sequence_frames])
+            sequence_frames += 1
+            if sequence_frames == sequence_length:
+                motion_writer.append(sequence, motion_name, sequence_hand)
+                recorded += 1
+                sequence_frames = None
+                print(f"✅ Saved motion {recorded} ({motion_name})")
+        else:
+            sequence_frames = None
+            print("⚠️ Hand lost, motion discarded")
+        if sequence_frames is not None:
+            cv2.putText(frame, f"Recording {sequence_frames}/{sequence_length}", (10, 80),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+
     # 如果有偵測到手
     if result.multi_hand_landmarks:
         for hand_landmarks in result.multi_hand_landmarks:
             mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-            # 提取 21 個關鍵點 (x, y)
-            landmarks = []
-            for lm in hand_landmarks.landmark:
-                landmarks.extend([lm.x, lm.y])
-
-            cv2.putText(frame, f"Collected: {len(collected_data)}", (10, 50),
+            cv2.putText(frame, f"Collected: {collected}", (10, 50),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
 
     # 顯示即時影像
@@ -55,24 +86,32 @@ while True:
     key = cv2.waitKey(1)
     if key == ord('s'):
         if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                landmarks = []
-                for lm in hand_landmarks.landmark:
-                    landmarks.extend([lm.x, lm.y])
-
-                collected_data.append(landmarks + [gesture_name])
-                print(f"✅ Saved data {len(collected_data)} ({gesture_name})")
+            # 提取 21 個關鍵點 (x, y, z)，與辨識時使用相同的特徵模組
+            landmarks = landmarks_to_array(result.multi_hand_landmarks)
+            for sample, handedness in zip(landmarks, result.multi_handedness):
+                writer.append(sample, gesture_name, handedness.classification[0].label)
+                collected += 1
+                print(f"✅ Saved data {collected} ({gesture_name})")
+
+    elif key == ord('r'):
+        if result.multi_hand_landmarks and sequence_frames is None:
+            sequence_frames = 0
+            sequence_start = frame_time
+            sequence_hand = result.multi_handedness[0].classification[0].label
 
     elif key == ord('q'):
         break
 
+    writer.maybe_flush()
+    motion_writer.maybe_flush()
+
 # 釋放攝影機 & 關閉視窗
 cap.release()
 cv2.destroyAllWindows()
 
-# 儲存為 CSV
-csv_path = os.path.join(data_folder, f"{gesture_name}.csv")
-df = pd.DataFrame(collected_data)
-df.to_csv(csv_path, index=False)
+# 寫出尚未寫入的資料
+writer.close()
+motion_writer.close()
 
-print(f"📁 {gesture_name}.csv saved to 【{data_folder}】! Total {len(collected_data)} samples.")
+print(f"📁 {collected} samples of [{gesture_name}] appended to 【{data_folder}】! Total {writer.total} samples.")
+print(f"📁 {recorded} motions of [{motion_name}] appended to 【{motion_folder}】! Total {motion_writer.total} motions.")
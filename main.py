@@ -1,9 +1,13 @@
+import time
+START_TIME = time.perf_counter()  # 程式啟動時間，用來量測首次畫面耗時
+
 import tkinter as tk
 import os
 import importlib
 
 # 從 cogs 資料夾匯入 App 類別
 from cogs.app import App
+from cogs.multi_camera import MultiCameraApp, multi_camera_settings
 
 def load_extensions():
     """載入所有指令檔案 (cogs 資料夾中的 .py 檔案)"""
@@ -25,5 +29,8 @@ if __name__ == '__main__':
     load_extensions()
     # 啟動主應用程式
     root = tk.Tk()
-    App(root)
+    if multi_camera_settings() is not None:
+        MultiCameraApp(root, start_time=START_TIME)  # 所有攝影機同時辨識
+    else:
+        App(root, start_time=START_TIME)
     root.mainloop()